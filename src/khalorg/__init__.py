@@ -1,6 +1,7 @@
 from argparse import Namespace
+from collections.abc import Iterable
 
-from khalorg import logger
+from khalorg import logger, memprofile
 from khalorg.cli import get_parser
 
 
@@ -8,4 +9,18 @@ def main():
     """Command line interface."""
     args: Namespace = get_parser().parse_args()
     logger.setup(level=args.loglevel, logfile=args.logfile)
-    print(args.func(**vars(args)))
+    if args.memprofile:
+        memprofile.start()
+
+    try:
+        output: str | Iterable[str] = args.func(**vars(args))
+        if isinstance(output, str):
+            print(output)
+        else:
+            for line in output:
+                print(line)
+    finally:
+        command: str = args.func.__name__.removesuffix("_command")
+        memprofile.stop(
+            f"khalorg {command}", memprofile.get_report_path(args.logfile)
+        )
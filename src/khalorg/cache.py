@@ -0,0 +1,116 @@
+"""On-disk cache of the output of `khal list`."""
+
+import hashlib
+import logging
+import os
+from pathlib import Path
+
+LIST_CACHE_SIZE: int = 64
+CACHE_SUFFIX: str = ".txt"
+
+
+def get_cache_key(*parts: str) -> str:
+    """
+    Returns a file name safe key for `parts`.
+
+    Args:
+    ----
+        parts: the values that determine the cached result
+
+    Returns
+    -------
+        the key
+    """
+    return hashlib.sha1("\0".join(parts).encode()).hexdigest()
+
+
+class ListCache:
+    """
+    Stores the output of `khal list` on disk, using one file per key.
+
+    A hit updates the modification time of the file, such that the least
+    recently used entries are evicted first once the cache holds more than
+    `size` entries.
+
+    Attributes
+    ----------
+        directory: the directory that contains the entries
+        size: the maximum number of entries
+    """
+
+    def __init__(self, directory: Path, size: int = LIST_CACHE_SIZE):
+        """
+        Init.
+
+        Args:
+        ----
+            directory: the directory that contains the entries
+            size: the maximum number of entries
+        """
+        self.directory: Path = directory
+        self.size: int = size
+
+    def get(self, key: str) -> str | None:
+        """
+        Returns the entry of `key`.
+
+        Args:
+        ----
+            key: the key, see `get_cache_key`
+
+        Returns
+        -------
+            the cached text, or None if `key` is not cached.
+        """
+        path: Path = self._get_path(key)
+        try:
+            text: str = path.read_text()
+            os.utime(path)
+        except OSError:
+            return None
+        logging.debug(f"Using cached khal list output: {path}")
+        return text
+
+    def put(self, key: str, text: str) -> None:
+        """
+        Stores `text` as the entry of `key`, and evicts the least recently
+        used entries.
+
+        Args:
+        ----
+            key: the key, see `get_cache_key`
+            text: the text to cache
+        """
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path: Path = self._get_path(key)
+        temporary: Path = path.with_suffix(f".{os.getpid()}.tmp")
+        temporary.write_text(text)
+        temporary.replace(path)
+        self._evict()
+
+    def _evict(self) -> None:
+        """Removes the least recently used entries that exceed the size."""
+        entries: list[tuple[int, Path]] = []
+        for path in self.directory.glob(f"*{CACHE_SUFFIX}"):
+            try:
+                entries.append((path.stat().st_mtime_ns, path))
+            except OSError:
+                continue
+
+        entries.sort(reverse=True)
+        for _, path in entries[self.size :]:
+            path.unlink(missing_ok=True)
+
+    def _get_path(self, key: str) -> Path:
+        """
+        Returns the path of the entry of `key`.
+
+        Args:
+        ----
+            key: the key
+
+        Returns
+        -------
+            the path
+        """
+        return self.directory / f"{key}{CACHE_SUFFIX}"
@@ -4,7 +4,16 @@ from pathlib import Path
 from os.path import join
 
 from khalorg import paths
-from khalorg.commands import delete, edit, list_command, new, sync
+from khalorg.commands import (
+    delete,
+    edit,
+    import_command,
+    list_command,
+    new,
+    sync,
+    sync_routes,
+    watch,
+)
 from khalorg.helpers import get_khalorg_format
 
 
@@ -20,10 +29,12 @@ def get_parser() -> ArgumentParser:
     parent: ArgumentParser = ArgumentParser(**ParserInfo.parent)
     parent.add_argument("--loglevel", **Args.loglevel)
     parent.add_argument("--logfile", **Args.logfile)
+    parent.add_argument("--memprofile", **Args.memprofile)
     subparsers = parent.add_subparsers(required=True)
 
     child_new: ArgumentParser = subparsers.add_parser("new", **ParserInfo.new)
     child_new.add_argument("calendar", **Args.calendar)
+    child_new.add_argument("--output", **Args.output)
     child_new.set_defaults(func=new)
 
     child_list: ArgumentParser = subparsers.add_parser(
@@ -33,6 +44,8 @@ def get_parser() -> ArgumentParser:
     child_list.add_argument("calendar", **Args.calendar)
     child_list.add_argument("start", **Args.start)
     child_list.add_argument("stop", **Args.stop)
+    child_list.add_argument("--output", **Args.output_list)
+    child_list.add_argument("--cache", **Args.cache)
     child_list.set_defaults(func=list_command)
 
     child_edit: ArgumentParser = subparsers.add_parser(
@@ -40,14 +53,24 @@ def get_parser() -> ArgumentParser:
     )  # noqa
     child_edit.add_argument("--edit-dates", **Args.edit_dates)
     child_edit.add_argument("calendar", **Args.calendar)
+    child_edit.add_argument("--output", **Args.output)
     child_edit.set_defaults(func=edit)
 
     child_delete: ArgumentParser = subparsers.add_parser(
         "delete", **ParserInfo.delete
     )  # noqa
     child_delete.add_argument("calendar", **Args.calendar)
+    child_delete.add_argument("--output", **Args.output)
     child_delete.set_defaults(func=delete)
 
+    child_import: ArgumentParser = subparsers.add_parser(
+        "import", **ParserInfo.import_command
+    )  # noqa
+    child_import.add_argument("calendar", **Args.calendar)
+    child_import.add_argument("paths", **Args.ics_paths)
+    child_import.add_argument("--output", **Args.output)
+    child_import.set_defaults(func=import_command)
+
     child_sync: ArgumentParser = subparsers.add_parser(
         "sync", **ParserInfo.sync
     )  # noqa
@@ -56,14 +79,53 @@ def get_parser() -> ArgumentParser:
     child_sync.add_argument("--stop", **Args.stop_sync)
     child_sync.add_argument("--edit-dates", **Args.edit_dates)
     child_sync.add_argument("--state-dir", **Args.state_dir)
+    child_sync.add_argument("--state-layout", **Args.state_layout)
     child_sync.add_argument("--conflict-resolution", **Args.conflict_resolution)
     child_sync.add_argument("--delete-on-sync", **Args.delete_on_sync)
     child_sync.add_argument("--filetags", **Args.filetags)
     child_sync.add_argument("--dry-run", **Args.dry_run)
+    child_sync.add_argument("--force", **Args.force)
     child_sync.add_argument("calendar", **Args.calendar)
     child_sync.add_argument("org_file", **Args.org_file)
     child_sync.set_defaults(func=sync)
 
+    child_routes: ArgumentParser = subparsers.add_parser(
+        "sync-routes", **ParserInfo.sync_routes
+    )  # noqa
+    child_routes.add_argument("--format", **Args.format)
+    child_routes.add_argument("--start", **Args.start)
+    child_routes.add_argument("--stop", **Args.stop_sync)
+    child_routes.add_argument("--edit-dates", **Args.edit_dates)
+    child_routes.add_argument("--state-dir", **Args.state_dir)
+    child_routes.add_argument(
+        "--conflict-resolution", **Args.conflict_resolution
+    )
+    child_routes.add_argument("--delete-on-sync", **Args.delete_on_sync)
+    child_routes.add_argument("--dry-run", **Args.dry_run)
+    child_routes.add_argument("config", **Args.routes_config)
+    child_routes.set_defaults(func=sync_routes)
+
+    child_watch: ArgumentParser = subparsers.add_parser(
+        "watch", **ParserInfo.watch
+    )  # noqa
+    child_watch.add_argument("--format", **Args.format)
+    child_watch.add_argument("--start", **Args.start)
+    child_watch.add_argument("--stop", **Args.stop_sync)
+    child_watch.add_argument("--edit-dates", **Args.edit_dates)
+    child_watch.add_argument("--state-dir", **Args.state_dir)
+    child_watch.add_argument("--state-layout", **Args.state_layout)
+    child_watch.add_argument(
+        "--conflict-resolution", **Args.conflict_resolution
+    )
+    child_watch.add_argument("--delete-on-sync", **Args.delete_on_sync)
+    child_watch.add_argument("--filetags", **Args.filetags)
+    child_watch.add_argument("--dry-run", **Args.dry_run)
+    child_watch.add_argument("--debounce", **Args.debounce)
+    child_watch.add_argument("--interval", **Args.interval)
+    child_watch.add_argument("calendar", **Args.calendar)
+    child_watch.add_argument("org_file", **Args.org_file)
+    child_watch.set_defaults(func=watch)
+
     return parent
 
 
@@ -104,16 +166,40 @@ class ParserInfo:
         description=_read_static_txt("description_delete_command.txt"),
     )
 
+    import_command: dict = dict(
+        prog="khalorg import",
+        description=_read_static_txt("description_import_command.txt"),
+    )
+
     sync: dict = dict(
         formatter_class=RawDescriptionHelpFormatter,
         prog="khalorg sync",
         description=_read_static_txt("description_sync_command.txt"),
     )
 
+    sync_routes: dict = dict(
+        formatter_class=RawDescriptionHelpFormatter,
+        prog="khalorg sync-routes",
+        description=_read_static_txt("description_sync_routes_command.txt"),
+    )
+
+    watch: dict = dict(
+        formatter_class=RawDescriptionHelpFormatter,
+        prog="khalorg watch",
+        description=_read_static_txt("description_watch_command.txt"),
+    )
+
 
 class Args:
     """Arguments for the ArgumentParser.add_argument methods."""
 
+    cache: dict = dict(
+        action="store_true",
+        help=(
+            "Reuse the output of khal of a previous call with the same "
+            "arguments, as long as the calendar did not change"
+        ),
+    )
     calendar: dict = dict(type=str, help="Set the name of the khal calendar.")
     conflict_resolution: dict = dict(
         type=str,
@@ -123,6 +209,14 @@ class Args:
         ),
         default="khal",
     )
+    debounce: dict = dict(
+        type=float,
+        default=1.0,
+        help=(
+            "Number of seconds without changes that is waited for before "
+            "syncing (default: 1.0)"
+        ),
+    )
     delete_on_sync: dict = dict(
         action="store_true",
         help=(
@@ -143,6 +237,20 @@ class Args:
         ),
     )
 
+    force: dict = dict(
+        action="store_true",
+        help=(
+            "Sync even if the org file and the calendar did not change since "
+            "the last sync that found nothing to do"
+        ),
+    )
+
+    ics_paths: dict = dict(
+        type=Path,
+        nargs="+",
+        help="The .ics files, or directories containing .ics files.",
+    )
+
     loglevel: dict = dict(
         required=False,
         default="INFO",
@@ -151,10 +259,49 @@ class Args:
             "(default), INFO, DEBUG"
         ),
     )
+    interval: dict = dict(
+        type=float,
+        default=5.0,
+        help=(
+            "Polling interval in seconds, used when inotify is not available "
+            "(default: 5.0)"
+        ),
+    )
     logfile: dict = dict(
         type=str, default=paths.log_file, help="The path to the log file."
     )
+    memprofile: dict = dict(
+        action="store_true",
+        help=(
+            "Record the peak memory and the top allocation sites of each "
+            "phase of the command. The report is written next to the log "
+            "file, with the extension .memprofile."
+        ),
+    )
     org_file: dict = dict(type=Path, help="The path to the org file.")
+    output: dict = dict(
+        type=str,
+        choices=["text", "jsonl"],
+        default="text",
+        help=(
+            "Print the output of the command (text), or print the result of "
+            "each org item as a JSON object per line (jsonl) (default: text)"
+        ),
+    )
+    output_list: dict = dict(
+        type=str,
+        choices=["text", "jsonl"],
+        default="text",
+        help=(
+            "Print the items in the org format (text), or print each item as "
+            "a JSON object per line (jsonl) (default: text)"
+        ),
+    )
+
+    routes_config: dict = dict(
+        type=Path,
+        help="The path to the config that defines the routes.",
+    )
 
     start: dict = dict(
         type=str,
@@ -175,6 +322,17 @@ class Args:
         help="The path to the log file.",
     )
 
+    state_layout: dict = dict(
+        type=str,
+        choices=["file", "sharded"],
+        default="file",
+        help=(
+            "Store the sync state as one org file (file), or as compressed "
+            "shards of which only the changed ones are rewritten (sharded) "
+            "(default: file)"
+        ),
+    )
+
     stop: dict = dict(
         type=str, default="1d", nargs="?", help="End date (default: 1d)"
     )
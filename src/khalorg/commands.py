@@ -1,25 +1,59 @@
+import json
 import logging
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from typing import Iterator, TypedDict
 
+import orgparse
+from khal.controllers import Event
+from khal.icalendar import split_ics
+
+from khalorg import memprofile, paths
+from khalorg.cache import ListCache, get_cache_key
 from khalorg.helpers import get_khalorg_format
 from khalorg.khal.args import DeleteArgs, EditArgs, KhalArgs, NewArgs
-from khalorg.khal.calendar import Calendar, CalendarProperties
+from khalorg.khal.calendar import (
+    MAX_LIST_WORKERS,
+    Calendar,
+    CalendarProperties,
+    EventWriter,
+    get_calendar,
+)
 from khalorg.khal.checker import EventChecker, EventChecks
-from khalorg.khal.helpers import get_khal_format
+from khalorg.khal.helpers import find_ics_files, get_khal_format, get_now
 from khalorg.org.agenda_items import (
+    EmptyOrgItemError,
     OrgAgendaFile,
     OrgAgendaItem,
+    collapse_occurrences,
 )
+from khalorg.routes import Router, get_route_state_file, load_routes
+from khalorg.rrule import ical_rrule_is_supported
+from khalorg.state import ShardedState
 from khalorg.synchronization import (
     ConflictResolution,
+    StateLayout,
     SyncContext,
+    get_changed_uids,
+    get_fingerprint_path,
+    get_state_items,
+    get_sync_fingerprint,
+    get_sync_state,
     load_sync_agenda,
-    pull_khal_changes,
-    push_org_changes,
-    remove_deleted_items,
+    sync_items,
     write_sync_files,
 )
+from khalorg.watcher import ChangeMonitor
+
+
+class ItemResult(TypedDict):
+    """The result of a command for one org item, see `--output jsonl`."""
+
+    title: str
+    uid: str | None
+    status: str
+    errors: list[str]
 
 
 def list_command(
@@ -27,31 +61,52 @@ def list_command(
     khalorg_format: str | None = None,
     start: str = "today",
     stop: str = "1d",
+    output: str = "text",
+    cache: bool = False,
     **_,
-) -> str:
+) -> str | Iterator[str]:
     """
     Lists khal agenda items to org format.
 
+    If `output` is "jsonl", the items are not formatted. Instead, a JSON
+    object is generated for each item by OrgAgendaItem.as_dict, such that the
+    lines can be streamed by the caller.
+
     Args:
     ----
         calendar: name of the khal calendar
         start: start date (default: today)
         stop: end date (default: 1d)
+        output: text or jsonl
+        cache: reuse the output of `khal list` of a previous call, as long as
+            the calendar did not change, see ListCache.
 
     Returns
     -------
-        stdout of the `khal list` command after post processing
+        stdout of the `khal list` command after post processing, or a
+        generator of JSON Lines.
 
     """
-    khalorg_format = khalorg_format or get_khalorg_format()
-    agenda = _list(calendar=calendar, start=start, stop=stop)
-    return format(agenda, khalorg_format)
+    list_cache: ListCache | None = (
+        ListCache(Path(paths.list_cache_dir)) if cache else None
+    )
+    with memprofile.phase("list khal"):
+        agenda = _list(
+            calendar=calendar, start=start, stop=stop, cache=list_cache
+        )
+    if output == "jsonl":
+        return (json.dumps(x.as_dict()) for x in agenda.items)
+
+    with memprofile.phase("format"):
+        khalorg_format = khalorg_format or get_khalorg_format()
+        return format(agenda, khalorg_format)
 
 
 def _list(
-    calendar: str,
+    calendar: str | Calendar,
     start: str = "today",
     stop: str = "1d",
+    cache: ListCache | None = None,
     **_,
 ) -> OrgAgendaFile:
     """
@@ -59,36 +114,135 @@ def _list(
 
     Args:
     ----
-        calendar: name of the khal calendar
+        calendar: name of the khal calendar or a Calendar object
         start: start date (default: today)
         stop: end date (default: 1d)
+        cache: the cache of the output of `khal list`, if any.
 
     Returns
     -------
         List of OrgAgendaFile
 
+    """
+    khal_calendar: Calendar = get_calendar(calendar)
+    key: str | None = (
+        _get_list_cache_key(khal_calendar, start, stop) if cache else None
+    )
+    text: str | None = cache.get(key) if cache and key else None
+    if text is None:
+        text = _list_text(khal_calendar, start, stop)
+        if cache and key:
+            cache.put(key, text)
+
+    # The ranges are parsed at once, such that large outputs can be parsed
+    # in parallel by OrgAgendaFile.from_str.
+    org_items: str = collapse_occurrences(text)
+    agenda: OrgAgendaFile = OrgAgendaFile.from_str(org_items, occurrences=True)
+    agenda.apply_rrules()
+    return agenda
+
+
+def _get_list_cache_key(
+    khal_calendar: Calendar, start: str, stop: str
+) -> str | None:
+    """
+    Returns the key of the `khal list` output in the ListCache.
+
+    The key consists of the calendar, the resolved date range, the khal
+    format, and the change tag of the calendar. The change tag is read before
+    khal is called, such that a change during the call invalidates the entry.
+
+    Args:
+    ----
+        khal_calendar: the khal calendar
+        start: start date
+        stop: end date
+
+    Returns
+    -------
+        the key, or None if the output cannot be cached.
+
+    """
+    tag: str | None = khal_calendar.change_tag
+    resolved: tuple | None = khal_calendar.resolve_range(start, stop)
+    if tag is None or resolved is None:
+        return None
+    return get_cache_key(
+        khal_calendar.name,
+        *(x.isoformat() for x in resolved),
+        get_khal_format(),
+        tag,
+    )
+
+
+def _list_text(khal_calendar: Calendar, start: str, stop: str) -> str:
+    """
+    Lists the khal agenda items in org format, using several `khal list`
+    calls for a large date range.
+
+    Args:
+    ----
+        khal_calendar: the khal calendar
+        start: start date
+        stop: end date
+
+    Returns
+    -------
+        the combined stdout of the `khal list` commands
+
+    """
+    ranges: list[tuple[str, str]] = khal_calendar.split_range(start, stop)
+
+    texts: list[str]
+    if len(ranges) == 1:
+        texts = [_list_range(khal_calendar, start, stop)]
+    else:
+        logging.debug(f"Listing {len(ranges)} date ranges in parallel")
+        workers: int = min(len(ranges), MAX_LIST_WORKERS)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            texts = list(
+                executor.map(lambda x: _list_range(khal_calendar, *x), ranges)
+            )
+    return "\n".join(texts)
+
+
+def _list_range(khal_calendar: Calendar, start: str, stop: str) -> str:
+    """
+    Lists the khal agenda items of one date range in org format.
+
+    Args:
+    ----
+        khal_calendar: the khal calendar
+        start: start date
+        stop: end date
+
+    Returns
+    -------
+        stdout of the `khal list` command
+
     """
     args: KhalArgs = KhalArgs()
-    args["-a"] = calendar
+    args["-a"] = khal_calendar.name
     args["-f"] = get_khal_format()
     args["start"] = start
     args["stop"] = stop
 
-    khal_calendar: Calendar = Calendar(calendar)
-    org_items: str = khal_calendar.list_command(args.as_list())
-    agenda: OrgAgendaFile = OrgAgendaFile.from_str(org_items)
-    agenda.apply_rrules()
-    return agenda
+    return khal_calendar.list_command(args.as_list())
 
 
-def new(calendar: str, **kwargs) -> str:
+def new(
+    calendar: str | Calendar,
+    writer: EventWriter | None = None,
+    output: str = "text",
+    **kwargs,
+) -> str:
     """
-    Creates a new calendar item in a Khal calendar.
+    Creates new calendar items in a Khal calendar.
 
-    It does this, by parsing an org agenda item, that is supplied through
-    stdin, into a list of command line arguments. These arguments are used to
+    It does this, by parsing the org agenda items, that are supplied through
+    stdin, into lists of command line arguments. These arguments are used to
     invoke the `khal new` command by calling Calendar.new_item. Alternatively,
-    the org item can be supplied through the keyword arg `org`. The command
+    the org items can be supplied through the keyword arg `org`. The command
     line interface of khal (i.e., `khal new`) was used instead of using the
     underlying functions, because these functions are not readily exposed.
     Furthermore, by using the command line interface, the `khalorg new` command
@@ -98,37 +252,165 @@ def new(calendar: str, **kwargs) -> str:
     using the Calendar.edit command. These properties cannot be added through
     the `khal new` command, so this is a workaround.
 
+    All items are checked at once by EventChecker.is_valid_many. Their
+    properties are written by one EventWriter, such that the khal db is
+    updated once for all items.
+
     Args:
     ----
-        calendar: name of the khal calendar.
-        until: Stop an event repeating on this date.
+        calendar: name of the khal calendar or a Calendar object, which is
+        shared by the commands that are run.
+        writer: optionally, an EventWriter that writes the properties of the
+        events. The caller is responsible for closing it.
+        output: "text" returns the stdout of `khal new`, "jsonl" returns an
+        ItemResult per org item as JSON Lines.
         org: omit the stdin and send the input as an argument
 
     Returns
     -------
-        stdout of the `khal new` command
+        stdout of the `khal new` command, or the results as JSON Lines.
 
     """
     org = kwargs.get("org", "") or sys.stdin.read()
+    calendar = get_calendar(calendar)
 
     checker: EventChecker = EventChecker()
     checker.remove(EventChecks.UID)
 
-    agenda_item: OrgAgendaItem = OrgAgendaItem()
-    agenda_item.load_from_str(org)
-    agenda_item.properties["UID"] = ""  # UID must be empty for new item
+    with memprofile.phase("load org"):
+        items: list[OrgAgendaItem] = _load_items(org)
+    for item in items:
+        item.properties["UID"] = ""  # UID must be empty for new item
+
+    batch_writer: EventWriter = writer or EventWriter(calendar)
+    with memprofile.phase("check"):
+        messages: list[str] = checker.is_valid_many(calendar, items)
+    created: set[tuple[str, tuple]] = set()
+    results: list[ItemResult] = []
+    stdout: list[str] = []
+
+    with memprofile.phase("new"):
+        for item, message in zip(items, messages):
+            # The items in `org` are not part of the snapshot of the checker.
+            key: tuple[str, tuple] = (item.title, item.timestamps_key[:1])
+            if not message and key in created:
+                message = EventChecker.MESSAGE_DUPLICATE
+
+            if message:
+                logging.critical(message)
+                results.append(_get_result(item, None, "skipped", message))
+                continue
+
+            stdout.append(_new(calendar, item))
+            events: list[Event] = _edit_events(
+                calendar, item, edit_dates=True, writer=batch_writer
+            )
+            if events:
+                created.add(key)
+                results.append(_get_result(item, events[0].uid, "created"))
+            else:
+                message = Calendar.MESSAGE_EDIT.format(0)
+                results.append(_get_result(item, None, "failed", message))
+
+    if writer is None:
+        with memprofile.phase("write"):
+            _add_write_errors(results, batch_writer.close())
+
+    return _format_results(results, "".join(stdout), output)
+
+
+def _load_items(org: str) -> list[OrgAgendaItem]:
+    """
+    Loads an agenda item for each top-level heading of the org document `org`.
+    Sub-headings are part of their top-level heading, and are not loaded as
+    separate items.
 
-    message: str = checker.is_valid(calendar, agenda_item)
-    if not message:
-        stdout: str = _new(calendar, agenda_item)
-        _edit(calendar, agenda_item, edit_dates=True)
-        return stdout
-    else:
-        logging.critical(message)
-        return ""
+    Args:
+    ----
+        org: org document
+
+    Returns
+    -------
+        the agenda items
+
+    Raises
+    ------
+        EmptyOrgItemError: if `org` does not contain an agenda item.
+
+    """
+    nodes = orgparse.loads(org)
+    items: list[OrgAgendaItem] = [
+        OrgAgendaItem.from_node(x) for x in nodes.children
+    ]
+    if not items:
+        raise EmptyOrgItemError(OrgAgendaItem.MESSAGE_INVALID_NODE)
+    return items
+
+
+def _get_result(
+    item: OrgAgendaItem,
+    uid: str | None,
+    status: str,
+    message: str = "",
+) -> ItemResult:
+    """
+    Returns the ItemResult of `item`.
+
+    Args:
+    ----
+        item: the org agenda item
+        uid: the UID of the khal event
+        status: created, edited, deleted, skipped, or failed
+        message: the error messages, separated by newlines
+
+    Returns
+    -------
+        the result
+
+    """
+    errors: list[str] = message.split("\n") if message else []
+    return ItemResult(title=item.title, uid=uid, status=status, errors=errors)
 
 
-def _new(calendar: str, agenda_item: OrgAgendaItem) -> str:
+def _add_write_errors(
+    results: list[ItemResult], errors: dict[str, Exception]
+) -> None:
+    """
+    Marks the results of events that could not be written as failed.
+
+    Args:
+    ----
+        results: the results of the items
+        errors: the errors by UID, see EventWriter.flush
+
+    """
+    for result in results:
+        if result["uid"] in errors:
+            result["status"] = "failed"
+            result["errors"].append(repr(errors[result["uid"]]))
+
+
+def _format_results(results: list[ItemResult], text: str, output: str) -> str:
+    """
+    Returns `text`, or the `results` as JSON Lines if `output` is "jsonl".
+
+    Args:
+    ----
+        results: the results of the items
+        text: the output of the command
+        output: text or jsonl
+
+    Returns
+    -------
+        the output
+
+    """
+    if output == "jsonl":
+        return "\n".join(json.dumps(x) for x in results)
+    return text
+
+
+def _new(calendar: str | Calendar, agenda_item: OrgAgendaItem) -> str:
     """
     Adds `agenda_item` as an agenda item in khal `calendar`.
 
@@ -137,62 +419,135 @@ def _new(calendar: str, agenda_item: OrgAgendaItem) -> str:
 
     Args:
     ----
-        calendar: the name of the khal calendar
+        calendar: the name of the khal calendar or a Calendar object
         agenda_item: org agenda item
 
     Returns
     -------
        stdout of `khal new`.
     """
-    khal_calendar: Calendar = Calendar(calendar)
+    khal_calendar: Calendar = get_calendar(calendar)
 
     args: NewArgs = NewArgs()
-    args["-a"] = calendar
+    args["-a"] = khal_calendar.name
     args.load_from_org(agenda_item)
     logging.debug(f"Khal new args are: {args.as_list()}")
 
     return khal_calendar.new_item(args.as_list())
 
 
-def edit(calendar: str, edit_dates: bool = False, **kwargs) -> str:
+def edit(
+    calendar: str | Calendar,
+    edit_dates: bool = False,
+    writer: EventWriter | None = None,
+    output: str = "text",
+    **kwargs,
+) -> str:
     """
-    Edit an existing khal agenda item.
+    Edit existing khal agenda items.
 
     An existing khal agenda item is edited by supplying an org file with the
     desired properties. Empty fields are interpreted as being actual empty and
     are thus not ignored.
 
     The org file can be supplied through stdin or through the `org` keyword
-    argument.
+    argument. If it contains multiple agenda items, all of them are edited.
+    Their events are looked up at once by Calendar.get_events_by_uid, and
+    written by one EventWriter, such that the khal db is updated once. An item
+    whose UID was already edited in the same batch is skipped, as its event
+    would be written twice at the same time.
 
     Ensure the correct UID is available in the UID properties otherwise the
     corresponding event cannot be found.
 
     Args:
     ----
-        calendar: the name of the calendar.
+        calendar: the name of the calendar or a Calendar object.
         edit_dates: If set to True, the org time stamp and its recurrence are
         also edited.
+        writer: optionally, an EventWriter that writes the edited events. The
+        caller is responsible for closing it.
+        output: "text" returns an empty str, "jsonl" returns an ItemResult
+        per org item as JSON Lines.
         **_:
+
+    Returns
+    -------
+        an empty str, or the results as JSON Lines.
     """
     org = kwargs.get("org", "") or sys.stdin.read()
+    calendar = get_calendar(calendar)
 
     checker: EventChecker = EventChecker()
     checker.remove(EventChecks.DUPLICATE)
 
-    agenda_item: OrgAgendaItem = OrgAgendaItem()
-    agenda_item.load_from_str(org)
+    with memprofile.phase("load org"):
+        items: list[OrgAgendaItem] = _load_items(org)
+    with memprofile.phase("check"):
+        messages: list[str] = checker.is_valid_many(calendar, items)
+    with memprofile.phase("find events"):
+        found: dict[str, list[Event]] = _get_events_by_uid(
+            calendar, items, messages
+        )
 
-    message: str = checker.is_valid(calendar, agenda_item)
-    if not message:
-        return _edit(calendar, agenda_item, edit_dates)
-    else:
-        logging.critical(message)
-        return ""
+    batch_writer: EventWriter = writer or EventWriter(calendar)
+    edited: set[str] = set()
+    results: list[ItemResult] = []
+    with memprofile.phase("edit"):
+        for item, message in zip(items, messages):
+            if not message and item.uid in edited:
+                message = EventChecker.MESSAGE_DUPLICATE_UID
+
+            if message:
+                logging.critical(message)
+                results.append(_get_result(item, item.uid, "skipped", message))
+                continue
+
+            edited.add(item.uid)
+            events: list[Event] = _edit_events(
+                calendar, item, edit_dates, batch_writer, found[item.uid]
+            )
+            if events:
+                results.append(_get_result(item, item.uid, "edited"))
+            else:
+                message = Calendar.MESSAGE_EDIT.format(0)
+                results.append(_get_result(item, item.uid, "failed", message))
+
+    if writer is None:
+        with memprofile.phase("write"):
+            _add_write_errors(results, batch_writer.close())
+
+    return _format_results(results, "", output)
+
+
+def _get_events_by_uid(
+    calendar: Calendar, items: list[OrgAgendaItem], messages: list[str]
+) -> dict[str, list[Event]]:
+    """
+    Returns the events of the `items` that passed their checks, i.e., whose
+    message is empty.
+
+    Args:
+    ----
+        calendar: the khal calendar
+        items: the org agenda items
+        messages: the messages of EventChecker.is_valid_many
+
+    Returns
+    -------
+        the events, using the UID as key, see Calendar.get_events_by_uid.
+    """
+    uids: list[str] = [
+        item.uid for item, message in zip(items, messages) if not message
+    ]
+    return calendar.get_events_by_uid(uids)
 
 
 def _edit(
-    calendar: str, agenda_item: OrgAgendaItem, edit_dates: bool = False
+    calendar: str | Calendar,
+    agenda_item: OrgAgendaItem,
+    edit_dates: bool = False,
+    writer: EventWriter | None = None,
 ) -> str:
     """
     Edits `agenda_item` that corresponds to an existing agenda item in a
@@ -202,62 +557,228 @@ def _edit(
 
     Args:
     ----
-        calendar: the name of the khal calendar
+        calendar: the name of the khal calendar or a Calendar object
         agenda_item: org agenda item
         edit_dates: If set to True, the org time stamp and its recurrence are
         also edited.
+        writer: optionally, an EventWriter that writes the edited event.
 
     Returns
     -------
        stdout of `khal new`.
     """
-    khal_calendar: Calendar = Calendar(calendar)
+    _edit_events(calendar, agenda_item, edit_dates, writer)
+    return ""
+
+
+def _edit_events(
+    calendar: str | Calendar,
+    agenda_item: OrgAgendaItem,
+    edit_dates: bool = False,
+    writer: EventWriter | None = None,
+    events: list[Event] | None = None,
+) -> list[Event]:
+    """
+    Same as `_edit`, but the events that were found are returned. The events
+    of `agenda_item` can be supplied through `events`, see Calendar.edit.
+
+    Returns
+    -------
+       the khal events that match `agenda_item`.
+    """
+    khal_calendar: Calendar = get_calendar(calendar)
 
     args: EditArgs = EditArgs()
     args.load_from_org(agenda_item)
-    khal_calendar.edit(CalendarProperties(**args), edit_dates)
-    return ""
+    return khal_calendar.edit(
+        CalendarProperties(**args), edit_dates, writer, events
+    )
 
 
-def delete(calendar: str, **kwargs) -> str:
-    """TODO
+def delete(calendar: str | Calendar, output: str = "text", **kwargs) -> str:
+    """
+    Deletes the khal events of the org agenda items in the org document that
+    is supplied through stdin or through the `org` keyword argument.
 
-    Args:
-        calendar:
-        **kwargs:
+    The events of all items are looked up at once by
+    Calendar.get_events_by_uid, and the khal db is committed once.
 
-    Returns:
+    Args:
+    ----
+        calendar: the name of the calendar or a Calendar object.
+        output: "text" returns an empty str, "jsonl" returns an ItemResult
+        per org item as JSON Lines.
+        **kwargs: `org` omits the stdin
 
+    Returns
+    -------
+        an empty str, or the results as JSON Lines.
     """
     org = kwargs.get("org", "") or sys.stdin.read()
+    calendar = get_calendar(calendar)
 
     checker: EventChecker = EventChecker([EventChecks.UID])
-    agenda_item: OrgAgendaItem = OrgAgendaItem()
-    agenda_item.load_from_str(org)
+    with memprofile.phase("load org"):
+        items: list[OrgAgendaItem] = _load_items(org)
+    with memprofile.phase("check"):
+        messages: list[str] = checker.is_valid_many(calendar, items)
+    with memprofile.phase("find events"):
+        found: dict[str, list[Event]] = _get_events_by_uid(
+            calendar, items, messages
+        )
 
-    message: str = checker.is_valid(calendar, agenda_item)
-    if not message:
-        return _delete(calendar, agenda_item)
-    else:
-        logging.critical(message)
-        return ""
+    results: list[ItemResult] = []
+    with memprofile.phase("delete"), calendar.at_once():
+        for item, message in zip(items, messages):
+            if message:
+                logging.critical(message)
+                results.append(_get_result(item, item.uid, "skipped", message))
+            elif _delete_events(calendar, item, found[item.uid]):
+                results.append(_get_result(item, item.uid, "deleted"))
+            else:
+                message = Calendar.MESSAGE_DELETE.format(0)
+                results.append(_get_result(item, item.uid, "failed", message))
 
+    return _format_results(results, "", output)
 
-def _delete(calendar: str, agenda_item: OrgAgendaItem) -> str:
-    """TODO.
+
+def _delete(calendar: str | Calendar, agenda_item: OrgAgendaItem) -> str:
+    """
+    Deletes the khal event of `agenda_item`, using its UID.
 
     Args:
-        calendar:
-        agenda_item:
+    ----
+        calendar: the name of the khal calendar or a Calendar object
+        agenda_item: org agenda item
 
     Returns
     -------
+        an empty str
+    """
+    _delete_events(calendar, agenda_item)
+    return ""
+
 
+def _delete_events(
+    calendar: str | Calendar,
+    agenda_item: OrgAgendaItem,
+    events: list[Event] | None = None,
+) -> list[Event]:
+    """
+    Same as `_delete`, but the deleted events are returned. The events of
+    `agenda_item` can be supplied through `events`, see Calendar.delete.
+
+    Returns
+    -------
+        the events of the deleted series.
     """
     args: DeleteArgs = DeleteArgs()
     args.load_from_org(agenda_item)
+    khal_calendar: Calendar = get_calendar(calendar)
+    return khal_calendar.delete(CalendarProperties(**args), events)
+
+
+def import_command(
+    calendar: str, paths: list[Path], output: str = "text", **_
+) -> str:
+    """
+    Imports the events of .ics files into a khal calendar.
+
+    In contrast to `khalorg new`, the events are not converted to org items
+    and `khal new` is not used. Instead, they are written to the vdir of the
+    calendar by an EventWriter, such that the khal db is updated once. The
+    UIDs of the events are preserved, and an existing event with the same UID
+    is overwritten. This includes an event of an earlier file, as the writes
+    of one UID are done in order. Events with an unsupported RRULE are
+    skipped.
+
+    Args:
+    ----
+        calendar: name of the khal calendar
+        paths: .ics files, or directories that contain .ics files
+        output: "text" returns an empty str, "jsonl" returns an ItemResult
+        per event as JSON Lines.
+
+    Returns
+    -------
+        an empty str, or the results as JSON Lines.
+    """
     khal_calendar: Calendar = Calendar(calendar)
-    return khal_calendar.delete(CalendarProperties(**args))
+    writer: EventWriter = EventWriter(khal_calendar)
+    results: list[ItemResult] = []
+    with memprofile.phase("import"):
+        for path in find_ics_files(paths):
+            results.extend(_import_file(khal_calendar, writer, path))
+
+    with memprofile.phase("write"):
+        _add_write_errors(results, writer.close())
+    imported: int = sum(x["status"] == "imported" for x in results)
+    logging.info(f"Imported {imported} of {len(results)} events")
+    return _format_results(results, "", output)
+
+
+def _import_file(
+    calendar: Calendar, writer: EventWriter, path: Path
+) -> list[ItemResult]:
+    """
+    Submits the events of the .ics file at `path` to `writer`.
+
+    Args:
+    ----
+        calendar: the khal calendar
+        writer: the EventWriter of `calendar`
+        path: path to an .ics file
+
+    Returns
+    -------
+        the result of each event, or a failed result for the file if it
+        cannot be read. An event that cannot be parsed gets a failed result,
+        after which the next event is imported.
+    """
+    locale: dict = calendar.config["locale"]
+    try:
+        vevents: list[str] = split_ics(
+            path.read_text(), default_timezone=locale["default_timezone"]
+        )
+    except Exception as error:  # icalendar does not have a base exception
+        logging.error(f"Reading {path} failed: {error!r}")
+        result: ItemResult = ItemResult(
+            title=str(path), uid=None, status="failed", errors=[repr(error)]
+        )
+        return [result]
+
+    results: list[ItemResult] = []
+    for index, ics in enumerate(vevents):
+        try:
+            event: Event = Event.fromString(
+                ics, locale=locale, calendar=calendar.name
+            )
+            result = ItemResult(
+                title=event.summary, uid=event.uid, status="imported", errors=[]
+            )
+            supported: bool = ical_rrule_is_supported(
+                event.recurpattern, event.start
+            )
+        except Exception as error:  # icalendar does not have a base exception
+            logging.error(f"Reading event {index} of {path} failed: {error!r}")
+            result = ItemResult(
+                title=f"{path}: event {index}",
+                uid=None,
+                status="failed",
+                errors=[repr(error)],
+            )
+            results.append(result)
+            continue
+
+        if not supported:
+            logging.critical(f"{event.uid}: {EventChecker.MESSAGE_RRULE}")
+            result["status"] = "skipped"
+            result["errors"].append(EventChecker.MESSAGE_RRULE)
+        else:
+            writer.submit(event, insert=True)
+        results.append(result)
+
+    return results
 
 
 def sync(
@@ -272,11 +793,20 @@ def sync(
     dry_run: bool = False,
     filetags: list[str] | None = None,
     khalorg_format: str | None = None,
+    state_layout: StateLayout | str = StateLayout.FILE,
+    force: bool = False,
     **_,
 ) -> str:
     """
     Syncs events between a khal calendar and an org file.
 
+    A sync that changes nothing stores a fingerprint of its inputs, see
+    `get_sync_fingerprint`. The next sync is skipped if the fingerprint did
+    not change, unless `force` is set. A sync that changes the org file or
+    the calendar removes the fingerprint, such that the next sync is a full
+    sync again. This way, a change that was made while syncing is not
+    missed.
+
     Args:
     ----
         calendar: name of the khal calendar
@@ -291,28 +821,55 @@ def sync(
             the sources. WARNING: if you delete your local file, it will
             remove all the events in the remote!!!
         dry_run: Doesn't do any action, it just prints what it would do
+        state_layout: store the sync state as one org file (file), or as
+            compressed shards of which only the changed ones are rewritten
+            (sharded).
+        force: Sync even if nothing changed since the last sync that found
+            nothing to do.
 
     Returns
     -------
     empty string
 
     """
-    try:
-        conflict_resolution = ConflictResolution(conflict_resolution)
-    except ValueError as error:
-        raise ValueError(
-            f"The value {conflict_resolution} of conflict resolution is not "
-            "valid, please use khal or org"
-        ) from error
-
+    conflict_resolution = _get_conflict_resolution(conflict_resolution)
     khal_calendar = Calendar(calendar)
-    sync_format: str = khalorg_format or get_khalorg_format()
-    state_file = state_dir / f"{calendar}.org"
-    filetags = filetags or []
+    state_file = get_sync_state(
+        state_dir, calendar, _get_state_layout(state_layout)
+    )
+
+    fingerprint_file = get_fingerprint_path(state_dir, calendar)
+    settings: dict = dict(
+        calendar=calendar,
+        org_file=str(org_file.resolve()),
+        edit_dates=edit_dates,
+        conflict_resolution=conflict_resolution.value,
+        delete_on_sync=delete_on_sync,
+        filetags=filetags or [],
+        khalorg_format=khalorg_format or get_khalorg_format(),
+    )
+    fingerprint = get_sync_fingerprint(
+        org_file, state_file, khal_calendar, start, stop, settings
+    )
+    if (
+        not force
+        and fingerprint is not None
+        and fingerprint_file.exists()
+        and fingerprint_file.read_text() == fingerprint
+    ):
+        logging.info(
+            "Nothing changed since the last sync, skipping. Use --force to "
+            "sync anyway."
+        )
+        return ""
+
+    with memprofile.phase("load org"):
+        org_agenda = load_sync_agenda(org_file)
+    with memprofile.phase("load state"):
+        state_agenda = load_sync_agenda(state_file)
+    with memprofile.phase("list khal"):
+        khal_agenda = _list(calendar=khal_calendar, start=start, stop=stop)
 
-    org_agenda = load_sync_agenda(org_file)
-    state_agenda = load_sync_agenda(state_file)
-    khal_agenda = _list(calendar=calendar, start=start, stop=stop)
     context = SyncContext(
         calendar=calendar,
         khal_calendar=khal_calendar,
@@ -320,32 +877,501 @@ def sync(
         state_agenda=state_agenda,
         khal_agenda=khal_agenda,
         dry_run=dry_run,
+        writer=None if dry_run else EventWriter(khal_calendar),
     )
-    processed_uids = push_org_changes(
+    failed_uids = _sync(
         context=context,
+        org_file=org_file,
+        state_file=state_file,
         edit_dates=edit_dates,
         conflict_resolution=conflict_resolution,
-        new_command=new,
-        edit_command=edit,
+        delete_on_sync=delete_on_sync,
+        khalorg_format=khalorg_format or get_khalorg_format(),
+        filetags=filetags or [],
     )
-    pull_khal_changes(
-        context=context,
-        processed_uids=processed_uids,
-    )
-    if delete_on_sync:
-        remove_deleted_items(
+
+    if not dry_run:
+        new_fingerprint = get_sync_fingerprint(
+            org_file, state_file, khal_calendar, start, stop, settings
+        )
+        if (
+            not failed_uids
+            and new_fingerprint is not None
+            and new_fingerprint == fingerprint
+        ):
+            fingerprint_file.write_text(new_fingerprint)
+        else:
+            fingerprint_file.unlink(missing_ok=True)
+
+    # return empty string so that nothing is shown in the CLI
+    return ""
+
+
+def _get_conflict_resolution(
+    value: ConflictResolution | str,
+) -> ConflictResolution:
+    """
+    Returns `value` as a ConflictResolution.
+
+    Args:
+    ----
+        value: khal or org
+
+    Returns:
+    -------
+        the conflict resolution
+
+    """
+    try:
+        return ConflictResolution(value)
+    except ValueError as error:
+        raise ValueError(
+            f"The value {value} of conflict resolution is not "
+            "valid, please use khal or org"
+        ) from error
+
+
+def _get_state_layout(value: StateLayout | str) -> StateLayout:
+    """
+    Returns `value` as a StateLayout.
+
+    Args:
+    ----
+        value: file or sharded
+
+    Returns:
+    -------
+        the state layout
+
+    """
+    try:
+        return StateLayout(value)
+    except ValueError as error:
+        raise ValueError(
+            f"The value {value} of state layout is not valid, please use "
+            "file or sharded"
+        ) from error
+
+
+def _sync(
+    context: SyncContext,
+    org_file: Path,
+    state_file: Path | ShardedState,
+    edit_dates: bool,
+    conflict_resolution: ConflictResolution,
+    delete_on_sync: bool,
+    khalorg_format: str,
+    filetags: list[str],
+) -> set[str]:
+    """
+    Runs the synchronization that is described by `context`.
+
+    Args:
+    ----
+        context: the agendas and settings of the run
+        org_file: path to the org file
+        state_file: path to the state file, or the sharded state
+        edit_dates: see `sync`
+        conflict_resolution: see `sync`
+        delete_on_sync: see `sync`
+        khalorg_format: the format of the org and state files
+        filetags: see `sync`
+
+    Returns
+    -------
+        the UIDs of the events that could not be written to khal.
+
+    """
+    with memprofile.phase("sync"):
+        sync_items(
             context=context,
-            processed_uids=processed_uids,
+            edit_dates=edit_dates,
+            conflict_resolution=conflict_resolution,
+            delete_on_sync=delete_on_sync,
+            new_command=new,
+            edit_command=edit,
             delete_command=delete,
         )
-    if not dry_run:
-        write_sync_files(
-            org_file=org_file,
-            state_file=state_file,
-            org_agenda=org_agenda,
-            khalorg_format=sync_format,
-            filetags=filetags,
-        )
+        failed_uids = set(context.writer.close()) if context.writer else set()
+    if not context.dry_run:
+        with memprofile.phase("write"):
+            write_sync_files(
+                org_file=org_file,
+                state_file=state_file,
+                org_agenda=context.org_agenda,
+                khalorg_format=khalorg_format,
+                filetags=filetags,
+                state_items=(
+                    get_state_items(context, failed_uids)
+                    if failed_uids
+                    else None
+                ),
+            )
+    return failed_uids
+
+
+def sync_routes(
+    config: Path,
+    state_dir: Path,
+    start: str = "today",
+    stop: str = "90d",
+    edit_dates: bool = False,
+    conflict_resolution: ConflictResolution | str = ConflictResolution.KHAL,
+    delete_on_sync: bool = False,
+    dry_run: bool = False,
+    khalorg_format: str | None = None,
+    **_,
+) -> str:
+    """
+    Syncs several khal calendars and org files, following the routes in
+    `config`, see `load_routes`.
+
+    One calendar can be synced with several org files, and several calendars
+    with one org file. Each calendar is listed once, and each org file is
+    loaded once. The items are split per calendar and org file, see Router,
+    after which each part is synced as by `sync`. An event that is already
+    part of an org file, or of its state, stays in that org file. Finally,
+    each org file is written once.
+
+    Args:
+    ----
+        config: path to the routes config
+        state_dir: the state of each org file is stored in its `routes`
+            directory.
+        others: see `sync`
+
+    Returns
+    -------
+    empty string
+
+    """
+    conflict_resolution = _get_conflict_resolution(conflict_resolution)
+    sync_format: str = khalorg_format or get_khalorg_format()
+    router = Router(load_routes(config))
+    calendars: dict[str, Calendar] = {x: Calendar(x) for x in router.calendars}
+    state_files: dict[Path, Path] = {
+        x: get_route_state_file(state_dir, x) for x in router.org_files
+    }
+
+    with memprofile.phase("load org"):
+        org_agendas = {x: load_sync_agenda(x) for x in router.org_files}
+    with memprofile.phase("load state"):
+        state_agendas = {
+            x: load_sync_agenda(y) for x, y in state_files.items()
+        }
+    with memprofile.phase("list khal"):
+        khal_agendas = {
+            x: _list(calendar=y, start=start, stop=stop)
+            for x, y in calendars.items()
+        }
+
+    routed = _RoutedItems(router, org_agendas, state_agendas, khal_agendas)
+    writers: dict[str, EventWriter] = (
+        {} if dry_run else {x: EventWriter(y) for x, y in calendars.items()}
+    )
+    contexts: dict[tuple[str, Path], SyncContext] = {}
+    with memprofile.phase("sync"):
+        for calendar, org_file in router.pairs:
+            org_items, state_items, khal_items = routed.get(calendar, org_file)
+            context = SyncContext(
+                calendar=calendar,
+                khal_calendar=calendars[calendar],
+                org_agenda=_get_agenda(org_items),
+                state_agenda=_get_agenda(state_items),
+                khal_agenda=_get_agenda(khal_items),
+                dry_run=dry_run,
+                writer=writers.get(calendar),
+            )
+            sync_items(
+                context=context,
+                edit_dates=edit_dates,
+                conflict_resolution=conflict_resolution,
+                delete_on_sync=delete_on_sync,
+                new_command=new,
+                edit_command=edit,
+                delete_command=delete,
+            )
+            contexts[(calendar, org_file)] = context
+        failed_uids: set[str] = set()
+        for writer in writers.values():
+            failed_uids.update(writer.close())
+
+    if dry_run:
+        return ""
+
+    with memprofile.phase("write"):
+        for org_file in router.org_files:
+            parts = [y for x, y in contexts.items() if x[1] == org_file]
+            items = routed.get_unrouted(org_file)
+            items += [x for part in parts for x in part.org_agenda.items]
+            state_items: list[OrgAgendaItem] | None = None
+            if failed_uids:
+                state_items = routed.get_unrouted(org_file)
+                for part in parts:
+                    state_items += get_state_items(part, failed_uids)
+                state_items = routed.sort(org_file, state_items)
+
+            write_sync_files(
+                org_file=org_file,
+                state_file=state_files[org_file],
+                org_agenda=_get_agenda(routed.sort(org_file, items)),
+                khalorg_format=sync_format,
+                filetags=router.get_filetags(org_file),
+                state_items=state_items,
+            )
 
     # return empty string so that nothing is shown in the CLI
     return ""
+
+
+def _get_agenda(items: list[OrgAgendaItem]) -> OrgAgendaFile:
+    """
+    Returns an agenda that contains `items`.
+
+    Args:
+    ----
+        items: the items
+
+    Returns
+    -------
+        the agenda
+
+    """
+    agenda: OrgAgendaFile = OrgAgendaFile.from_str("")
+    agenda.items = items
+    return agenda
+
+
+class _RoutedItems:
+    """
+    The org, state, and khal items of each calendar and org file.
+
+    Attributes
+    ----------
+        router: decides on the route of each item
+    """
+
+    def __init__(
+        self,
+        router: Router,
+        org_agendas: dict[Path, OrgAgendaFile],
+        state_agendas: dict[Path, OrgAgendaFile],
+        khal_agendas: dict[str, OrgAgendaFile],
+    ) -> None:
+        """
+        Init.
+
+        Args:
+        ----
+            router: decides on the route of each item
+            org_agendas: the agenda of each org file
+            state_agendas: the state of each org file
+            khal_agendas: the agenda of each calendar
+        """
+        self.router: Router = router
+        self._parts: dict[tuple[str, Path], tuple[list, list, list]] = {
+            x: ([], [], []) for x in router.pairs
+        }
+        self._unrouted: dict[Path, list[OrgAgendaItem]] = {}
+        self._positions: dict[Path, dict[str | int, int]] = {}
+
+        known: dict[tuple[str, str], Path] = {}
+        for org_file in router.org_files:
+            org_items = org_agendas[org_file].items
+            self._unrouted[org_file] = self._split(org_file, org_items, 0)
+            self._split(org_file, state_agendas[org_file].items, 1)
+            self._positions[org_file] = {
+                x.uid or id(x): i for i, x in enumerate(org_items)
+            }
+            for (calendar, path), part in self._parts.items():
+                if path == org_file:
+                    known.update(
+                        ((calendar, x.uid), path)
+                        for x in part[0] + part[1]
+                        if x.uid
+                    )
+
+        for calendar, agenda in khal_agendas.items():
+            for item in agenda.items:
+                path: Path | None = known.get(
+                    (calendar, str(item.uid))
+                ) or router.get_org_file(item, calendar)
+                if path is not None:
+                    self._parts[(calendar, path)][2].append(item)
+
+    def _split(
+        self, org_file: Path, items: list[OrgAgendaItem], index: int
+    ) -> list[OrgAgendaItem]:
+        """
+        Adds `items` of `org_file` to their part, where `index` is 0 for org
+        items and 1 for state items.
+
+        Returns
+        -------
+            the items without a route, which are kept as is.
+        """
+        unrouted: list[OrgAgendaItem] = []
+        for item in items:
+            calendar: str | None = self.router.get_calendar(item, org_file)
+            if calendar is None:
+                unrouted.append(item)
+            else:
+                self._parts[(calendar, org_file)][index].append(item)
+        return unrouted
+
+    def get(self, calendar: str, org_file: Path) -> tuple[list, list, list]:
+        """
+        Returns the org, state, and khal items of `calendar` and `org_file`.
+        """
+        return self._parts[(calendar, org_file)]
+
+    def get_unrouted(self, org_file: Path) -> list[OrgAgendaItem]:
+        """Returns a copy of the items of `org_file` that have no route."""
+        return list(self._unrouted[org_file])
+
+    def sort(
+        self, org_file: Path, items: list[OrgAgendaItem]
+    ) -> list[OrgAgendaItem]:
+        """
+        Sorts `items` in the order of `org_file`, where new items are placed
+        at the end.
+        """
+        positions: dict[str | int, int] = self._positions[org_file]
+        end: int = len(positions)
+
+        def get_position(item: OrgAgendaItem) -> int:
+            return positions.get(id(item), positions.get(item.uid or "", end))
+
+        return sorted(items, key=get_position)
+
+
+def watch(
+    calendar: str,
+    org_file: Path,
+    state_dir: Path,
+    start: str = "today",
+    stop: str = "90d",
+    edit_dates: bool = False,
+    conflict_resolution: ConflictResolution | str = ConflictResolution.KHAL,
+    delete_on_sync: bool = False,
+    dry_run: bool = False,
+    filetags: list[str] | None = None,
+    khalorg_format: str | None = None,
+    state_layout: StateLayout | str = StateLayout.FILE,
+    debounce: float = 1.0,
+    interval: float = 5.0,
+    **_,
+) -> str:
+    """
+    Syncs a khal calendar and an org file each time one of them changes.
+
+    First, a full sync is done. Next, the org file and the vdir of the
+    calendar are watched. After a change, only the items whose UID was added,
+    changed, or removed are synced. The agendas are kept in memory, such that
+    only the side that changed needs to be loaded again.
+
+    Args:
+    ----
+        calendar: name of the khal calendar
+        org_file: path to the org file
+        debounce: number of seconds without changes that is waited for before
+            syncing.
+        interval: polling interval in seconds, if inotify is not available.
+        others: see `sync`
+
+    Returns
+    -------
+    empty string
+
+    """
+    conflict_resolution = _get_conflict_resolution(conflict_resolution)
+    khal_calendar = Calendar(calendar)
+    state_file = get_sync_state(
+        state_dir, calendar, _get_state_layout(state_layout)
+    )
+    sync_format: str = khalorg_format or get_khalorg_format()
+    filetags = filetags or []
+
+    with memprofile.phase("load org"):
+        org_agenda = load_sync_agenda(org_file)
+    with memprofile.phase("load state"):
+        state_agenda = load_sync_agenda(state_file)
+    with memprofile.phase("list khal"):
+        khal_agenda = _list(calendar=khal_calendar, start=start, stop=stop)
+    uids: set[str | None] | None = None  # None means: sync all items
+
+    monitor = ChangeMonitor(
+        org_file, Path(khal_calendar.path), debounce, interval
+    )
+    try:
+        while True:
+            if uids is None or uids:
+                if uids:
+                    logging.info(f"Syncing {len(uids)} changed item(s)")
+                # All events of one sync are compared with the same time.
+                khal_calendar.reference_time = get_now()
+                context = SyncContext(
+                    calendar=calendar,
+                    khal_calendar=khal_calendar,
+                    org_agenda=org_agenda,
+                    state_agenda=state_agenda,
+                    khal_agenda=khal_agenda,
+                    dry_run=dry_run,
+                    writer=None if dry_run else EventWriter(khal_calendar),
+                    uids=uids,
+                )
+                failed_uids = _sync(
+                    context=context,
+                    org_file=org_file,
+                    state_file=state_file,
+                    edit_dates=edit_dates,
+                    conflict_resolution=conflict_resolution,
+                    delete_on_sync=delete_on_sync,
+                    khalorg_format=sync_format,
+                    filetags=filetags,
+                )
+                if not dry_run:
+                    # The agendas are built from the items that were written,
+                    # as the org file may have been edited since.
+                    org_agenda = OrgAgendaFile.from_str(
+                        format(context.org_agenda, sync_format)
+                    )
+                    state_agenda = (
+                        load_sync_agenda(state_file)
+                        if failed_uids
+                        else org_agenda.copy()
+                    )
+
+                # Events that were pushed, and items that changed during the
+                # sync, are synced again after the next change.
+                org_changed, khal_changed = monitor.changes()
+                uids = set()
+                if org_changed:
+                    new_org_agenda = load_sync_agenda(org_file)
+                    uids = get_changed_uids(org_agenda, new_org_agenda)
+                    org_agenda = new_org_agenda
+                if khal_changed:
+                    new_khal_agenda = _list(
+                        calendar=khal_calendar, start=start, stop=stop
+                    )
+                    uids |= get_changed_uids(khal_agenda, new_khal_agenda)
+                    khal_agenda = new_khal_agenda
+                monitor.reset()
+
+            org_changed, khal_changed = monitor.wait()
+            if org_changed:
+                new_org_agenda = load_sync_agenda(org_file)
+                uids |= get_changed_uids(org_agenda, new_org_agenda)
+                org_agenda = new_org_agenda
+            if khal_changed:
+                new_khal_agenda = _list(
+                    calendar=khal_calendar, start=start, stop=stop
+                )
+                uids |= get_changed_uids(khal_agenda, new_khal_agenda)
+                khal_agenda = new_khal_agenda
+    except KeyboardInterrupt:
+        logging.info("Stopped watching")
+    finally:
+        monitor.close()
+
+    return ""
@@ -7,7 +7,7 @@ from khal.settings.settings import find_configuration_file, get_config
 from orgparse.date import OrgDate
 
 from khalorg.khal.calendar import CalendarProperties
-from khalorg.khal.helpers import set_tzinfo
+from khalorg.khal.helpers import set_tzinfos
 from khalorg.org.agenda_items import OrgAgendaItem
 from khalorg.rrule import get_recurobject
 
@@ -230,9 +230,10 @@ class EditArgs(KhalArgs):
         """
         timestamp: OrgDate = org_item.first_timestamp
 
-        start: Time = set_tzinfo(timestamp.start, self.timezone)
-        end: Time = set_tzinfo(timestamp.end, self.timezone)
-        until: Time = set_tzinfo(org_item.until.start, self.timezone)
+        start, end, until = set_tzinfos(
+            (timestamp.start, timestamp.end, org_item.until.start),
+            self.timezone,
+        )
 
         repeater: tuple[str, int, str] = (
             org_item.first_timestamp._repeater or tuple()
@@ -1,12 +1,21 @@
 import logging
-from collections.abc import Iterable
-from datetime import date, datetime, timedelta
+import os
+import re
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from datetime import date, datetime, time, timedelta
+from itertools import chain
+from os.path import expanduser
 from typing import Callable, TypedDict, Union
 
+from icalendar.prop import vCategory, vRecur
 from khal.cli import build_collection
-from khal.controllers import Event
+from khal.controllers import Event, start_end_from_daterange
+from khal.exceptions import FatalError
 from khal.khalendar import CalendarCollection
-from khal.khalendar.vdir import NotFoundError
+from khal.khalendar.exceptions import ReadOnlyCalendarError
+from khal.khalendar.vdir import AlreadyExistingError, NotFoundError, Vdir
 from khal.settings.settings import (
     ConfigObj,
     find_configuration_file,
@@ -14,14 +23,24 @@ from khal.settings.settings import (
 )
 
 from khalorg.khal.helpers import (
+    filter_future,
     find_khal_bin,
-    is_future,
+    get_day,
+    get_days,
+    get_now,
     remove_tzinfo,
     subprocess_callback,
 )
 
 Time = date | datetime
 
+MAX_WRITE_WORKERS: int = 8
+MAX_LIST_WORKERS: int = 4
+LIST_CHUNK_DAYS: int = 30
+UID_PATTERN: re.Pattern = re.compile(
+    r"^UID(?:;[^:\r\n]*)?:(.*?)\r?$", flags=re.MULTILINE
+)
+
 
 class CalendarProperties(TypedDict):
     """Properties of a khal Event."""
@@ -38,6 +57,149 @@ class CalendarProperties(TypedDict):
     url: str
 
 
+TEXT_PROPERTIES: tuple[str, ...] = (
+    "url",
+    "summary",
+    "location",
+    "description",
+)
+
+
+def get_changed_properties(
+    event: Event, props: CalendarProperties, edit_dates: bool = False
+) -> list[str]:
+    """
+    Returns the keys of `props` whose value differs from `event`.
+
+    The values are compared in the form in which the `update_*` methods of
+    the event would store them, e.g., attendees are compared in lower case
+    and the end of an all day event is exclusive. The dates and the RRULE are
+    only compared if `edit_dates` is True. The dates are compared with those
+    of the master event, as `event` may be any occurrence of a series. A
+    change of the RRULE is assumed if `event` is a moved occurrence instead
+    of the series itself.
+
+    Args:
+    ----
+        event: the event
+        props: the new properties of the event
+        edit_dates: if True, the start, end, and RRULE are compared as well.
+
+    Returns
+    -------
+        the keys of the changed properties
+    """
+    changed: list[str] = [
+        key
+        for key in TEXT_PROPERTIES
+        if (props[key] or "") != getattr(event, key)
+    ]
+
+    attendees: list[str] = [
+        x.strip().lower() for x in props["attendees"] if x != ""
+    ]
+    if attendees != [x.lower() for x in event.attendees.split(", ") if x]:
+        changed.append("attendees")
+
+    categories: list[str] = [x.strip() for x in props["categories"] if x != ""]
+    if _get_categories_ical(categories) != event.categories:
+        changed.append("categories")
+
+    if edit_dates:
+        end: Time = props["end"]
+        if not isinstance(end, datetime):
+            end = end + timedelta(days=1)  # khal stores an exclusive end
+        start, event_end = _get_start_end(event)
+        if not _is_same_time(props["start"], start):
+            changed.append("start")
+        if not _is_same_time(end, event_end):
+            changed.append("end")
+
+        rrule: dict | None = props["rrule"]
+        rule: bytes = vRecur(rrule).to_ical() if rrule else b""
+        if event.ref != "PROTO" or rule != event.recurobject.to_ical():
+            changed.append("rrule")
+
+    return changed
+
+
+def _get_categories_ical(categories: list[str]) -> str:
+    """
+    Returns `categories` as Event.categories would return them.
+
+    Args:
+    ----
+        categories: the categories
+
+    Returns
+    -------
+        the categories as iCalendar text
+    """
+    return vCategory(categories).to_ical().decode() if categories else ""
+
+
+def _get_start_end(event: Event) -> tuple[Time, Time]:
+    """
+    Returns the DTSTART and the exclusive end of the component of `event`
+    that Event.update_start_end changes, i.e., the master event of a series
+    instead of the occurrence.
+
+    Args:
+    ----
+        event: the event
+
+    Returns
+    -------
+        the start and the end
+    """
+    vevent = event._vevents[event.ref]
+    start: Time = vevent["DTSTART"].dt
+    if "DTEND" in vevent:
+        return start, vevent["DTEND"].dt
+    elif "DURATION" in vevent:
+        return start, start + vevent["DURATION"].dt
+    elif isinstance(start, datetime):
+        return start, start
+    else:
+        return start, start + timedelta(days=1)
+
+
+def _is_same_time(a: Time, b: Time) -> bool:
+    """
+    Returns whether `a` and `b` are the same time with the same UTC offset,
+    e.g., "UTC" and "Etc/UTC" are the same.
+
+    Args:
+    ----
+        a: a date or datetime
+        b: a date or datetime
+
+    Returns
+    -------
+        True if they are equal
+    """
+    if isinstance(a, datetime) and isinstance(b, datetime):
+        return a == b and a.utcoffset() == b.utcoffset()
+    return type(a) is type(b) and a == b
+
+
+def get_ics_uid(ics: str) -> str | None:
+    """
+    Returns the UID of the first component in `ics` that has one, without
+    parsing the whole text.
+
+    Args:
+    ----
+        ics: iCalendar text
+
+    Returns
+    -------
+        the UID, or None if there is no UID.
+    """
+    match: re.Match | None = UID_PATTERN.search(re.sub(r"\r?\n[ \t]", "", ics))
+    return match.group(1) if match else None
+
+
 def get_calendar_collection(name: str) -> CalendarCollection:
     """
     Return the calendar collection for a specific calendar `name`.
@@ -55,6 +217,23 @@ def get_calendar_collection(name: str) -> CalendarCollection:
     return build_collection(config, name)
 
 
+def get_calendar(calendar: "str | Calendar") -> "Calendar":
+    """
+    Returns `calendar` as a Calendar. A new Calendar is only created if the
+    name of a calendar is given, such that an existing Calendar, and its
+    collection, can be shared by several commands.
+
+    Args:
+    ----
+        calendar: name of the khal calendar or a Calendar object
+
+    Returns
+    -------
+        the calendar
+    """
+    return Calendar(calendar) if isinstance(calendar, str) else calendar
+
+
 class Calendar:
     """
     Represents a Khal calendar.
@@ -63,6 +242,8 @@ class Calendar:
     ----------
         name: calendar name
         config: Khal config
+        reference_time: the time that is used as now, such that all events
+            of a command are compared with the same time.
         list: export command (khal list)
         new_item: new command (khal new)
     """
@@ -99,6 +280,8 @@ class Calendar:
 
         self.name: str = name
         self.config: dict = get_config(path_config)
+        self.reference_time: datetime = get_now()
+        self._path_config: str | None = path_config
 
     def new_item(self, khal_new_args: list) -> str:
         """
@@ -132,6 +315,104 @@ class Calendar:
         logging.debug(f"khalorg list args are: {khal_args}")
         return self._list_command(khal_args)
 
+    def split_range(
+        self, start: str, stop: str, days: int = LIST_CHUNK_DAYS
+    ) -> list[tuple[str, str]]:
+        """
+        Splits the date range of `khal list` into chunks of `days` days.
+
+        The range is resolved in the same way as `khal list` does. The chunks
+        are split at midnight, which is where `khal list` starts a new day, so
+        listing the chunks one after another returns the same events as
+        listing the whole range. The range is returned as is if it is not
+        longer than `days`, or if it cannot be resolved, in which case khal
+        reports the error.
+
+        Args:
+        ----
+            start: start of the range, as passed to `khal list`
+            stop: end of the range, as passed to `khal list`
+            days: number of days per chunk
+
+        Returns
+        -------
+            the start and stop of each chunk, formatted for `khal list`.
+        """
+        resolved: tuple[datetime, datetime] | None = self.resolve_range(
+            start, stop
+        )
+        if resolved is None:
+            return [(start, stop)]
+
+        range_start, range_end = resolved
+        chunk: timedelta = timedelta(days=days)
+        if range_end - range_start <= chunk:
+            return [(start, stop)]
+
+        # The khal datetime format has a resolution of minutes.
+        if range_end.second or range_end.microsecond:
+            range_end = range_end.replace(second=0, microsecond=0)
+            range_end += timedelta(minutes=1)
+
+        boundaries: list[datetime] = [range_start]
+        midnight: datetime = datetime.combine(range_start.date(), time.min)
+        while (midnight := midnight + chunk) < range_end:
+            boundaries.append(midnight)
+        boundaries.append(range_end)
+
+        format: str = self.datetime_format
+        return [
+            (x.strftime(format), y.strftime(format))
+            for x, y in zip(boundaries, boundaries[1:])
+        ]
+
+    def resolve_range(
+        self, start: str, stop: str
+    ) -> tuple[datetime, datetime] | None:
+        """
+        Resolves the date range of `khal list` in the same way as khal does.
+
+        Args:
+        ----
+            start: start of the range, as passed to `khal list`
+            stop: end of the range, as passed to `khal list`
+
+        Returns
+        -------
+            the start and end of the range, or None if it cannot be resolved.
+        """
+        timedelta_: timedelta = self.config["default"]["timedelta"]
+        try:
+            return start_end_from_daterange(
+                [x for x in (start, stop) if x],
+                self.config["locale"],
+                default_timedelta_date=timedelta_,
+                default_timedelta_datetime=timedelta_,
+            )
+        except (FatalError, ValueError):
+            return None
+
+    @property
+    def change_tag(self) -> str | None:
+        """
+        A tag that changes whenever an event of the calendar changes.
+
+        The tag consists of the modification times of the vdir and of the
+        khal config. An event is written to the vdir by replacing its file,
+        which changes the modification time of the vdir.
+
+        Returns
+        -------
+            the tag, or None if the vdir or the config cannot be found.
+        """
+        try:
+            return ":".join(
+                str(os.stat(x).st_mtime_ns)
+                for x in (expanduser(self.path), self._path_config)
+            )
+        except (OSError, TypeError):
+            return None
+
     @property
     def date_format(self) -> str:
         """
@@ -154,6 +435,17 @@ class Calendar:
         """
         return self.config["locale"]["longdatetimeformat"]
 
+    @property
+    def path(self) -> str:
+        """
+        The path to the vdir of the calendar.
+
+        Returns
+        -------
+
+        """
+        return self.config["calendars"][self.name]["path"]
+
     @property
     def collection(self) -> CalendarCollection:
         """
@@ -173,7 +465,11 @@ class Calendar:
         return self._collection
 
     def edit(
-        self, props: CalendarProperties, edit_dates: bool = False
+        self,
+        props: CalendarProperties,
+        edit_dates: bool = False,
+        writer: "EventWriter | None" = None,
+        events: list[Event] | None = None,
     ) -> list[Event]:
         """
         Edit an existing event.
@@ -193,27 +489,30 @@ class Calendar:
             props: typed dict containing agenda item properties
             edit_dates: If set to True, the org time stamp and its recurrence
             are also edited.
+            writer: optionally, an EventWriter that writes the event instead
+            of writing it directly.
+            events: the events of the UID in `props`, e.g., from
+            Calendar.get_events_by_uid. By default, they are retrieved from
+            the collection.
 
         Returns
         -------
             the edited events
 
         """
-        events: list[Event]
-
         # khal assumes a length of 1h if the start is a datetime and it's equal to end
         if type(props["start"]) is datetime and props["end"] == props["start"]:
             props["end"] = props["start"] + timedelta(hours=1)
 
-        if props["uid"]:
+        if events is None and props["uid"]:
             events = self.get_events(props["uid"])
-        else:
+        elif events is None:
             events = self.get_events_no_uid(
                 props["summary"], props["start"], props["end"]
             )
 
         logging.debug(f"number of events is {len(events)}")
-        events = [x for x in events if is_future(x.end)]
+        events = filter_future(events, lambda x: x.end, self.reference_time)
 
         if len(events) == 0:
             logging.error(self.MESSAGE_EDIT.format(len(events)))
@@ -222,57 +521,121 @@ class Calendar:
             # Khal updates the master/PROTO event (i.e., the series of events),
             # instead of only the occurrence. Therefore, only 1 event needs to
             # be updated instead of the whole list.
-            self.update_event(events[0], props, edit_dates)
+            self.update_event(events[0], props, edit_dates, writer)
 
         return events
 
     def now(self) -> datetime:
         """
-        Returns datetime.now() for the local_timezone that is specified in
-        the khal config.
+        Returns the reference time in the local_timezone that is specified in
+        the khal config. The time is converted, which does not need the search
+        through the transitions that `localize` does.
 
         Returns
         -------
             now in the local timezone
 
         """
-        return self.config["locale"]["default_timezone"].localize(
-            datetime.now()
+        return self.reference_time.astimezone(
+            self.config["locale"]["default_timezone"]
         )
 
     def update_event(
-        self, event: Event, props: CalendarProperties, edit_dates: bool = False
+        self,
+        event: Event,
+        props: CalendarProperties,
+        edit_dates: bool = False,
+        writer: "EventWriter | None" = None,
     ) -> Event:
         """
         Update an event with `props`.
 
+        Only the properties that differ from the event are updated, see
+        `get_changed_properties`. If nothing changed, the event is neither
+        written nor is its sequence incremented, such that its .ics file and
+        etag are kept.
+
+        If a `writer` is supplied, the event is submitted to it instead of
+        being written directly. The khal db is then updated when the writer is
+        flushed.
+
         Args:
         ----
             event: the event
             props: a typed dict
+            edit_dates: If set to True, the org time stamp and its recurrence
+            are also edited.
+            writer: optionally, an EventWriter
 
         Returns
         -------
             the update version of `event`
 
         """
-        event.update_url(props["url"])
-        event.update_summary(props["summary"])
-        event.update_location(props["location"])
-        event.update_attendees(props["attendees"])
-        event.update_categories(props["categories"])
-        event.update_description(props["description"])
-
-        if edit_dates:
+        changed: list[str] = get_changed_properties(event, props, edit_dates)
+        if not changed:
+            logging.info(f"Event {event.uid} is unchanged, skipping the write")
+            return event
+
+        logging.debug(f"Changed properties of {event.uid}: {changed}")
+        for key in (*TEXT_PROPERTIES, "attendees", "categories"):
+            if key in changed:
+                getattr(event, f"update_{key}")(props[key])
+        if "start" in changed or "end" in changed:
             event.update_start_end(props["start"], props["end"])
+        if "rrule" in changed:
             event.update_rrule(props["rrule"])
 
         event.increment_sequence()
-        self.collection.update(event)
-        self.collection.update_db()
+        if writer is None:
+            self.collection.update(event)
+            self.collection.update_db()
+        else:
+            writer.submit(event)
 
         return event
 
+    def write(self, event: Event) -> None:
+        """
+        Writes `event` to its .ics file without updating the khal db.
+
+        In contrast to `CalendarCollection.update`, this method does not use
+        the sqlite connection of the khal db, so it can be called from another
+        thread. Call `CalendarCollection.update_db` afterwards to reconcile the
+        khal db with the vdir.
+
+        Args:
+        ----
+            event: the event
+        """
+        if event.readonly:
+            raise ReadOnlyCalendarError()
+
+        storage: Vdir = self.collection._storages[event.calendar]
+        event.etag = storage.update(event.href, event, event.etag)
+
+    def insert(self, event: Event) -> None:
+        """
+        Writes the new `event` to an .ics file in the vdir of the calendar
+        without updating the khal db, see Calendar.write. The UID of `event`
+        is preserved. If an event with the same UID exists, it is overwritten,
+        like `khal import --batch` does.
+
+        Args:
+        ----
+            event: the event
+        """
+        if self.collection._calendars[self.name]["readonly"]:
+            raise ReadOnlyCalendarError()
+
+        storage: Vdir = self.collection._storages[self.name]
+        try:
+            storage.upload(event)
+        except AlreadyExistingError as error:
+            href: str = error.existing_href
+            _, etag = storage.get(href)
+            storage.update(href, event, etag)
+
     def get_events(self, uid: str) -> list[Event]:
         """
         Returns events that share the same uid.
@@ -291,8 +654,86 @@ class Calendar:
         events: Iterable[Event] = self.collection.search(uid[-39:])
         return [x for x in events if x.uid == uid or not uid]
 
+    def get_events_by_uid(self, uids: Iterable[str]) -> dict[str, list[Event]]:
+        """
+        Returns the events of each of the `uids`.
+
+        A single UID is looked up by Calendar.get_events. For several UIDs,
+        the khal db is searched once, instead of once per UID. The UID of each
+        row is read from its iCalendar text, such that only the events of
+        `uids` are parsed.
+
+        Args:
+        ----
+            uids: unique identifiers, empty ones are ignored.
+
+        Returns
+        -------
+            the events, using the UID as key.
+        """
+        found: dict[str, list[Event]] = {uid: [] for uid in uids if uid}
+        if len(found) == 1:
+            uid: str = next(iter(found))
+            found[uid] = self.get_events(uid)
+        elif found:
+            collection: CalendarCollection = self.collection
+            for row in collection._backend.search(""):
+                uid = get_ics_uid(row[0])
+                if uid in found:
+                    found[uid].append(collection._construct_event(*row))
+
+        logging.debug(f"Get events of {len(found)} UIDs")
+        return found
+
+    def get_events_by_day(
+        self, days: Iterable[date]
+    ) -> dict[date, list[Event]]:
+        """
+        Returns the events that occur on each of the `days`.
+
+        The collection is queried once for the range that covers all `days`,
+        instead of once per day, after which the events are indexed by the
+        days on which they occur.
+
+        Args:
+        ----
+            days: the days to look up
+
+        Returns
+        -------
+            the events that occur on each day, using the day as key.
+        """
+        snapshot: dict[date, list[Event]] = {day: [] for day in days}
+        if not snapshot:
+            return snapshot
+
+        first: date = min(snapshot)
+        last: date = max(snapshot)
+        start: datetime = datetime.combine(first, time.min)
+        end: datetime = datetime.combine(last, time.max)
+        localize: Callable = self.config["locale"]["local_timezone"].localize
+        events: Iterable[Event] = chain(
+            self.collection.get_localized(localize(start), localize(end)),
+            self.collection.get_floating(start, end),
+        )
+
+        logging.debug(f"Get events between: {first} and {last}")
+        for event in events:
+            days_event = get_days(event.start_local, event.end_local)
+            day: date = max(days_event[0], first)
+            while day <= min(days_event[1], last):
+                if day in snapshot:
+                    snapshot[day].append(event)
+                day += timedelta(days=1)
+
+        return snapshot
+
     def get_events_no_uid(
-        self, summary_wanted: str, start_wanted: Time, end_wanted: Time | None
+        self,
+        summary_wanted: str,
+        start_wanted: Time,
+        end_wanted: Time | None,
+        events: Iterable[Event] | None = None,
     ) -> list[Event]:
         """
         Return events that share the same summary, start time and stop time.
@@ -305,6 +746,9 @@ class Calendar:
             summary_wanted: summary/title of the event
             start_wanted: start time
             end_wanted: end time
+            events: the events on the day of `start_wanted`, e.g., from
+                Calendar.get_events_by_day. By default, they are retrieved
+                from the collection.
 
         Returns
         -------
@@ -323,49 +767,180 @@ class Calendar:
             equal_summary: bool = summary == summary_wanted
             return equal_end and equal_summary
 
-        logging.debug(f"Get events on date: {start_wanted}")
-        return [
-            event
-            for event in self.collection.get_events_on(start_wanted)
-            if exists(event.summary, event.end)
-        ]
+        if events is None:
+            logging.debug(f"Get events on date: {start_wanted}")
+            events = self.collection.get_events_on(get_day(start_wanted))
+
+        return [event for event in events if exists(event.summary, event.end)]
 
     def update(self, event: Event) -> None:
         self.collection.update(event)
 
     def exists(
-        self, summary_wanted: str, start_wanted: Time, end_wanted: Time
+        self,
+        summary_wanted: str,
+        start_wanted: Time,
+        end_wanted: Time,
+        events: Iterable[Event] | None = None,
     ) -> bool:
         """
         Returns True if an item exists at this specific time, with the same
-        title.
+        title. See Calendar.get_events_no_uid for `events`.
         """
-        events: list = self.get_events_no_uid(
-            summary_wanted, start_wanted, end_wanted
+        matches: list = self.get_events_no_uid(
+            summary_wanted, start_wanted, end_wanted, events
         )
-        return len(events) > 0
+        return len(matches) > 0
 
-    def delete(self, props: CalendarProperties) -> str:
+    def delete(
+        self, props: CalendarProperties, events: list[Event] | None = None
+    ) -> list[Event]:
         """Deletes an event from the Calendar.collection. The whole series is
         removed.
 
         Args:
         ----
             props: dictionary representing the event.
+            events: the events of the UID in `props`, see Calendar.edit.
+
+        Returns
+        -------
+            the events of the deleted series, or an empty list if nothing was
+            deleted.
         """
-        events: list = self.get_events(props["uid"])
+        if events is None:
+            events = self.get_events(props["uid"])
 
         if len(events) == 0:
             logging.error(self.MESSAGE_DELETE.format(len(events)))
-        else:
-            # For now, the whole series is repmoved.
-            event = events[0]
-            assert event.href is not None
+            return []
+
+        # For now, the whole series is repmoved.
+        event = events[0]
+        assert event.href is not None
+        try:
+            self.collection.delete(
+                event.href, event.etag, calendar=event.calendar
+            )
+        except NotFoundError as error:
+            logging.error(error)
+            return []
+        return events
+
+    @contextmanager
+    def at_once(self) -> Iterator[None]:
+        """
+        Returns a context manager in which the changes to the khal db are
+        committed once, instead of after each change.
+
+        The changes are also committed if an exception is raised, as the
+        .ics files of the changes that were made are already written or
+        deleted. This way, the khal db stays in line with the vdir.
+
+        Returns
+        -------
+            the context manager
+        """
+        backend = self.collection._backend
+        with backend.at_once():
             try:
-                self.collection.delete(
-                    event.href, event.etag, calendar=event.calendar
-                )
-            except NotFoundError as error:
-                logging.error(error)
+                yield
             finally:
-                return ""
+                backend.conn.commit()
+
+
+class EventWriter:
+    """
+    Writes khal events to their .ics files through a bounded thread pool.
+
+    On network filesystems, writing an .ics file can take a while. By writing
+    the files concurrently, the latency of the writes overlaps instead of
+    adding up. The khal db is not thread safe, so it is updated once from the
+    vdir when EventWriter.flush is called. The writes of events with the same
+    UID do not overlap, such that the last submitted event is the one that is
+    kept.
+
+    Attributes
+    ----------
+        calendar: the calendar to which the events are written.
+    """
+
+    def __init__(
+        self, calendar: Calendar, max_workers: int = MAX_WRITE_WORKERS
+    ):
+        """
+        Init.
+
+        Args:
+        ----
+            calendar: the calendar to which the events are written.
+            max_workers: maximum number of concurrent writes.
+        """
+        self.calendar: Calendar = calendar
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+        self._pending: dict[Future, Event] = {}
+        self._last: dict[str, Future] = {}
+
+        # The collection is created lazily, which must not happen in one of
+        # the worker threads.
+        self.calendar.collection
+
+    def submit(self, event: Event, insert: bool = False) -> None:
+        """
+        Schedules `event` to be written to its .ics file.
+
+        If a write of an event with the same UID is pending, it is waited for
+        first, as the writes would otherwise race for the same .ics file.
+
+        Args:
+        ----
+            event: the event
+            insert: whether `event` is new, see Calendar.insert.
+        """
+        calendar: Calendar = self.calendar
+        write: Callable = calendar.insert if insert else calendar.write
+        previous: Future | None = self._last.get(str(event.uid))
+        if previous is not None:
+            wait([previous])
+
+        future: Future = self._executor.submit(write, event)
+        self._pending[future] = event
+        self._last[str(event.uid)] = future
+
+    def flush(self) -> dict[str, Exception]:
+        """
+        Waits for all scheduled writes, and updates the khal db once.
+
+        An error is logged for each event that could not be written.
+
+        Returns
+        -------
+            the errors of the failed writes, using the event UID as key.
+        """
+        errors: dict[str, Exception] = {}
+        for future, event in self._pending.items():
+            error = future.exception()
+            if error is not None:
+                logging.error(
+                    f"Writing event {event.uid}: {event.summary} failed: "
+                    f"{error!r}"
+                )
+                errors[str(event.uid)] = error
+
+        logging.debug(f"Number of events written: {len(self._pending)}")
+        self._pending.clear()
+        self._last.clear()
+        self.calendar.collection.update_db()
+        return errors
+
+    def close(self) -> dict[str, Exception]:
+        """
+        Flushes the writer and shuts down its thread pool.
+
+        Returns
+        -------
+            see EventWriter.flush
+        """
+        errors: dict[str, Exception] = self.flush()
+        self._executor.shutdown()
+        return errors
@@ -3,9 +3,12 @@ from datetime import date, datetime
 from enum import Enum, auto
 from typing import Callable
 
-from khalorg.khal.calendar import Calendar
+from khal.controllers import Event
+
+from khalorg.khal.calendar import Calendar, get_calendar
+from khalorg.khal.helpers import get_day
 from khalorg.khal.helpers import is_future as is_in_future
-from khalorg.org.agenda_items import OrgAgendaItem
+from khalorg.org.agenda_items import InvalidOrgItemError, OrgAgendaItem
 from khalorg.rrule import get_rrulestr, rrulestr_is_supported
 
 Time = date | datetime
@@ -30,6 +33,7 @@ class EventChecker:
     MESSAGE_FUTURE: str = "Agenda item date not in the future."
     MESSAGE_DUPLICATE: str = "Agenda item already exists."
     MESSAGE_UID: str = "Agenda item its UID property is empty."
+    MESSAGE_DUPLICATE_UID: str = "Agenda item its UID is used more than once."
 
     def __init__(self, checks: list[EventChecks] | None = None):
         """
@@ -39,11 +43,13 @@ class EventChecker:
         ----
             checks: Checks to perform. By default, all EventChecks are done.
         """
-        self._enum_vs_func: dict = {
+        self._enum_vs_func: dict[EventChecks, Callable[..., str]] = {
             EventChecks.DUPLICATE: self.is_duplicate,
-            EventChecks.FUTURE: self.is_future,
-            EventChecks.RRULE: self.valid_rrule,
-            EventChecks.UID: self.has_uid,
+            EventChecks.FUTURE: lambda item, calendar, *_: self.is_future(
+                item, calendar.reference_time
+            ),
+            EventChecks.RRULE: lambda item, *_: self.valid_rrule(item),
+            EventChecks.UID: lambda item, *_: self.has_uid(item),
         }
 
         self.checks: list[EventChecks] = list(checks) if checks is not None else list(EventChecks)
@@ -76,52 +82,102 @@ class EventChecker:
             True if the item is not a duplicate and exists in the future, else
             return False
         """
-        if isinstance(calendar, str):
-            calendar = Calendar(calendar)
+        return self.is_valid_many(calendar, [item])[0]
 
-        messages: list = []
+    def is_valid_many(
+        self, calendar: str | Calendar, items: list[OrgAgendaItem]
+    ) -> list[str]:
+        """
+        Check if each of the `items` can be created in calendar `name`.
+
+        One Calendar is used for all items. For the duplicate check, the
+        events of all days on which the items start are retrieved at once,
+        see Calendar.get_events_by_day. An item that cannot be checked, e.g.,
+        because it has no timestamp, gets the message of the error.
+
+        Args:
+        ----
+            calendar: name of the Khal calendar or a Calendar object
+            items: OrgAgendaItem objects
 
-        kwargs: dict = dict(item=item, calendar=calendar)
+        Returns:
+        -------
+            for each item, an error message or an empty str if it is valid.
+        """
+        calendar = get_calendar(calendar)
+        snapshot: dict[date, list[Event]] = {}
+        if EventChecks.DUPLICATE in self.checks:
+            snapshot = calendar.get_events_by_day(
+                get_day(item.first_timestamp.start)
+                for item in items
+                if item.timestamps
+            )
+
+        return [self._check(calendar, item, snapshot) for item in items]
+
+    def _check(
+        self,
+        calendar: Calendar,
+        item: OrgAgendaItem,
+        snapshot: dict[date, list[Event]],
+    ) -> str:
+        messages: list = []
         for check in self.checks:
-            func: Callable = self._enum_vs_func[check]
-            args = (kwargs.get(x) for x in func.__code__.co_varnames)
-            args = [x for x in args if x is not None]
-            messages.append(func(*args))
+            func: Callable[..., str] = self._enum_vs_func[check]
+            try:
+                messages.append(func(item, calendar, snapshot))
+            except InvalidOrgItemError as error:
+                messages.append(str(error))
+                break
 
         messages = [x for x in messages if x]
         return "\n".join(messages) if messages else ""
 
-    def is_future(self, item: OrgAgendaItem) -> str:
+    def is_future(
+        self, item: OrgAgendaItem, now: datetime | None = None
+    ) -> str:
         """
         Return an error message if the `item` is in the past.
 
         Args:
         ----
             item: OrgAgendaItem object
+            now: the reference time, e.g., Calendar.reference_time. By
+                default, the current time.
 
         Returns:
         -------
             empty str if the `item` is in the future, else a error message is
             returned.
         """
-        future: bool = is_in_future(item.first_timestamp.start)
+        future: bool = is_in_future(item.first_timestamp.start, now)
         return self.MESSAGE_FUTURE if not future else ""
 
-    def is_duplicate(self, item: OrgAgendaItem, calendar: Calendar) -> str:
+    def is_duplicate(
+        self,
+        item: OrgAgendaItem,
+        calendar: Calendar,
+        snapshot: dict[date, list[Event]] | None = None,
+    ) -> str:
         """
         Return an error message if the `item` exists in `calendar`.
 
         Args:
         ----
             item: OrgAgendaItem object
+            calendar: the khal calendar
+            snapshot: the events per day, see Calendar.get_events_by_day. If
+                the day of the `item` is missing, the collection is queried.
 
         Returns:
         -------
             empty str if the `item` exists in `calendar`, else a error message
             is returned.
         """
+        start: Time = item.first_timestamp.start
+        events: list[Event] | None = (snapshot or {}).get(get_day(start))
         is_duplicate: bool = calendar.exists(
-            item.title, item.first_timestamp.start, item.first_timestamp.end
+            item.title, start, item.first_timestamp.end, events
         )
         return self.MESSAGE_DUPLICATE if is_duplicate else ""
 
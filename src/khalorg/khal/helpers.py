@@ -1,14 +1,18 @@
 import logging
 import sys
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
+from functools import lru_cache
 from os.path import dirname, exists, join
+from pathlib import Path
 from subprocess import STDOUT, CalledProcessError, check_output
-from typing import Callable
+from typing import Callable, Iterable, TypeVar
 
 from khalorg import paths
 
 Time = date | datetime
 
+LOCALIZE_CACHE_SIZE: int = 4096
+
 
 def find_khal_bin() -> str:
     """Returns the khal executable.
@@ -41,30 +45,96 @@ def get_khal_format():
         return file_.read()
 
 
-def is_future(timestamp: datetime | date) -> bool:
+def get_now() -> datetime:
+    """
+    Returns the current time in the local timezone. A command takes this
+    time once, and uses it as its reference time, see Calendar.reference_time.
+
+    Returns
+    -------
+        now, including the local timezone
+
+    """
+    return datetime.now().astimezone()
+
+
+def is_future(
+    timestamp: datetime | date, now: datetime | None = None
+) -> bool:
     """
     Whether the `timestamp` is in the future.
 
     Args:
     ----
         timestamp: the time
+        now: the reference time, see `get_now`. By default, the current time.
 
     Returns:
     -------
         True if the `timestamp` is in the future
 
     """
-    logging.debug("Check if timestamp %s is in the future", timestamp)
-    if isinstance(timestamp, datetime):
-        logging.debug(
-            "Timestamp is a datetime object with tzinfo %s", timestamp.tzinfo
-        )
-        now = datetime.now(timestamp.tzinfo)
-    else:
-        now = datetime.now().date()
+    reference: Time = _get_reference(timestamp, now or get_now())
+    if logging.getLogger().isEnabledFor(logging.DEBUG):
+        logging.debug("Check if %s is after %s", timestamp, reference)
+    return timestamp >= reference
 
-    logging.debug("Now is %s", now)
-    return timestamp >= now
+
+T = TypeVar("T")
+
+
+def filter_future(
+    items: Iterable[T], key: Callable[[T], Time], now: datetime
+) -> list[T]:
+    """
+    Returns the `items` of which the time that is returned by `key` is in the
+    future. The reference times are computed once for all items.
+
+    Args:
+    ----
+        items: the items, e.g., khal events
+        key: returns the time of an item, e.g., its end
+        now: the reference time, see `get_now`
+
+    Returns:
+    -------
+        the items in the future
+
+    """
+    aware: datetime = now
+    naive: datetime = now.replace(tzinfo=None)
+    day: date = now.date()
+
+    result: list[T] = []
+    for item in items:
+        timestamp: Time = key(item)
+        if isinstance(timestamp, datetime):
+            reference: Time = aware if timestamp.tzinfo else naive
+        else:
+            reference = day
+        if timestamp >= reference:
+            result.append(item)
+    return result
+
+
+def _get_reference(timestamp: Time, now: datetime) -> Time:
+    """
+    Returns `now` in a form that can be compared with `timestamp`: a date for
+    a date, a naive local time for a naive datetime, or else `now` itself.
+
+    Args:
+    ----
+        timestamp: the time that is compared
+        now: the reference time, see `get_now`
+
+    Returns:
+    -------
+        the reference time
+
+    """
+    if not isinstance(timestamp, datetime):
+        return now.date()
+    return now if timestamp.tzinfo else now.replace(tzinfo=None)
 
 
 def subprocess_callback(cmd: list) -> Callable:
@@ -121,6 +191,9 @@ def set_tzinfo(time: Time, timezone) -> Time:
     """
     Add tzinfo if possible.
 
+    The result is cached for each timezone and naive datetime, as
+    `localize` of pytz searches the transition table of the timezone.
+
     Args:
     ----
         time: a date of a datetime object
@@ -131,4 +204,93 @@ def set_tzinfo(time: Time, timezone) -> Time:
         `time` with an updated tzinfo if possible
 
     """
-    return timezone.localize(time) if isinstance(time, datetime) else time
+    return _localize(timezone, time) if isinstance(time, datetime) else time
+
+
+def set_tzinfos(
+    times: Iterable[Time | None], timezone
+) -> list[Time | None]:
+    """
+    Same as `set_tzinfo`, but for all `times`, e.g., the start, end, and
+    until of an agenda item. A None is returned as is.
+
+    Args:
+    ----
+        times: dates, datetimes, or None
+        timezone: the timezone
+
+    Returns:
+    -------
+        `times` with an updated tzinfo if possible
+
+    """
+    return [set_tzinfo(x, timezone) for x in times]
+
+
+@lru_cache(maxsize=LOCALIZE_CACHE_SIZE)
+def _localize(timezone, time: datetime) -> datetime:
+    return timezone.localize(time)
+
+
+def get_day(time: Time) -> date:
+    """
+    Returns the day of `time`.
+
+    Args:
+    ----
+        time: a date of a datetime object
+
+    Returns:
+    -------
+        the date part of `time`
+
+    """
+    return time.date() if isinstance(time, datetime) else time
+
+
+def get_days(start: Time, end: Time) -> tuple[date, date]:
+    """
+    Returns the first and the last day of an event that runs from `start` to
+    `end`. The end of all day events is inclusive, as it is for khal events.
+    The end of other events is exclusive, so an event that ends at midnight
+    does not occur on the next day.
+
+    Args:
+    ----
+        start: start of the event
+        end: end of the event
+
+    Returns:
+    -------
+        the first and last day on which the event occurs
+
+    """
+    last: Time = end
+    at_midnight: bool = (
+        isinstance(end, datetime) and end.time() == datetime.min.time()
+    )
+    if at_midnight and end > start:
+        last = end - timedelta(days=1)
+    return get_day(start), get_day(last)
+
+
+def find_ics_files(paths: list[Path]) -> list[Path]:
+    """
+    Returns the .ics files in `paths`. A directory is replaced by the .ics
+    files that it contains, sorted by name.
+
+    Args:
+    ----
+        paths: paths to .ics files or directories
+
+    Returns
+    -------
+        the .ics files
+    """
+    files: list[Path] = []
+    for path in paths:
+        if path.is_dir():
+            files.extend(sorted(path.glob("*.ics")))
+        else:
+            files.append(path)
+    return files
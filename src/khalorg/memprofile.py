@@ -0,0 +1,184 @@
+"""Record the memory usage of the phases of a khalorg command."""
+
+import logging
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+from pathlib import Path
+from typing import ContextManager, Generator
+
+TOP_ALLOCATIONS: int = 10
+
+_profiler: "MemoryProfiler | None" = None
+
+
+class MemoryProfiler:
+    """
+    Records the peak memory and the top allocation sites of each phase of a
+    command, using tracemalloc.
+
+    A phase that runs several times, e.g., the sync of `khalorg watch`, is
+    reported once: the run with the highest peak is kept. A phase that is
+    nested in another phase, e.g., the phases of `khalorg new` when it is
+    called by a sync, is not recorded, as each phase resets the peak of
+    tracemalloc. Its memory is part of the outer phase instead.
+
+    Attributes
+    ----------
+        top: the number of allocation sites that is reported per phase
+        phases: the report of each phase, using the phase name as key.
+    """
+
+    def __init__(self, top: int = TOP_ALLOCATIONS):
+        """
+        Init.
+
+        Args:
+        ----
+            top: the number of allocation sites that is reported per phase
+        """
+        self.top: int = top
+        self.phases: dict[str, tuple[int, str]] = {}
+        self._peak: int = 0
+        self._active: bool = False
+
+    def start(self) -> None:
+        """Starts tracing the memory allocations."""
+        tracemalloc.start()
+
+    def stop(self) -> None:
+        """Stops tracing the memory allocations."""
+        tracemalloc.stop()
+
+    @contextmanager
+    def phase(self, name: str) -> Generator[None, None, None]:
+        """
+        Records the memory usage of the code that runs inside the context.
+
+        Args:
+        ----
+            name: name of the phase
+        """
+        if self._active:
+            yield
+            return
+
+        self._active = True
+        before: tracemalloc.Snapshot = tracemalloc.take_snapshot()
+        start, peak = tracemalloc.get_traced_memory()
+        self._peak = max(self._peak, peak)
+        tracemalloc.reset_peak()
+        try:
+            yield
+        finally:
+            self._active = False
+            current, peak = tracemalloc.get_traced_memory()
+            self._peak = max(self._peak, peak)
+            after: tracemalloc.Snapshot = tracemalloc.take_snapshot()
+            stats: list = after.compare_to(before, "lineno")[: self.top]
+            if peak >= self.phases.get(name, (0, ""))[0]:
+                lines: list[str] = [
+                    f"## {name}: peak {_format_size(peak)}, retained "
+                    f"{_format_size(current - start)}"
+                ]
+                lines += [
+                    f"{_format_size(x.size_diff):>12} {x.traceback}"
+                    for x in stats
+                ]
+                self.phases[name] = (peak, "\n".join(lines))
+
+    def report(self, title: str) -> str:
+        """
+        Returns the report of all phases.
+
+        Args:
+        ----
+            title: the title of the report, e.g., the command
+
+        Returns
+        -------
+            the report
+        """
+        peak: int = max(self._peak, tracemalloc.get_traced_memory()[1])
+        lines: list[str] = [f"# {title}: peak {_format_size(peak)}"]
+        lines += [x for _, x in self.phases.values()]
+        return "\n\n".join(lines) + "\n"
+
+
+def _format_size(size: int) -> str:
+    """
+    Returns `size` in MiB or KiB.
+
+    Args:
+    ----
+        size: number of bytes
+
+    Returns
+    -------
+        the formatted size
+    """
+    if abs(size) >= 1024**2:
+        return f"{size / 1024**2:.1f} MiB"
+    return f"{size / 1024:.1f} KiB"
+
+
+def get_report_path(logfile: str) -> Path:
+    """
+    Returns the path of the memory report, which is next to the log file.
+
+    Args:
+    ----
+        logfile: path to the log file
+
+    Returns
+    -------
+        path to the memory report
+    """
+    return Path(logfile).with_suffix(".memprofile")
+
+
+def start(top: int = TOP_ALLOCATIONS) -> None:
+    """
+    Starts profiling, such that the phases of the command are recorded.
+
+    Args:
+    ----
+        top: the number of allocation sites that is reported per phase
+    """
+    global _profiler
+    _profiler = MemoryProfiler(top)
+    _profiler.start()
+
+
+def phase(name: str) -> ContextManager:
+    """
+    Returns a context manager that records the phase `name` if profiling was
+    started, else it does nothing.
+
+    Args:
+    ----
+        name: name of the phase
+
+    Returns
+    -------
+        the context manager
+    """
+    return _profiler.phase(name) if _profiler else nullcontext()
+
+
+def stop(title: str, path: Path) -> None:
+    """
+    Writes the report to `path`, and stops profiling.
+
+    Args:
+    ----
+        title: the title of the report, e.g., the command
+        path: path to the report
+    """
+    global _profiler
+    if _profiler is None:
+        return
+
+    path.write_text(_profiler.report(title))
+    _profiler.stop()
+    _profiler = None
+    logging.info(f"Memory report is written to: {path}")
@@ -1,21 +1,33 @@
 import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from copy import copy
 from datetime import date, datetime
+from itertools import repeat
 from pathlib import Path
-from typing import Generator
+from typing import Generator, Iterator
 
 import orgparse
 from dateutil.rrule import rrule
 from orgparse.date import OrgDate
-from orgparse.node import OrgNode
+from orgparse.node import OrgEnv, OrgNode
 
 from khalorg.helpers import get_khalorg_format
 from khalorg.khal.helpers import remove_tzinfo
 from khalorg.org.helpers import (
+    count_headings,
     get_indent,
+    get_orgdate_key,
+    get_property,
+    iter_headings,
     remove_timestamps,
+    split_headings,
     timestamp_to_orgdate,
 )
 from khalorg.rrule import (
+    get_occurrences,
     rrulestr_is_supported,
     rrulestr_to_rrule,
     set_org_repeater,
@@ -23,6 +35,9 @@ from khalorg.rrule import (
 
 Time = date | datetime
 
+MAX_PARSE_WORKERS: int = os.cpu_count() or 1
+PARALLEL_PARSE_MIN_HEADINGS: int = 1000
+
 
 class InvalidOrgItemError(Exception):
     """Raised for an error in OrgAgendaItem."""
@@ -42,6 +57,10 @@ class OrgAgendaItem:
     property field that can be accessed as dictionaries, and a heading and a
     body.
 
+    To reduce the memory that is used by large agendas, the attributes are
+    stored in slots, and the property keys and calendar names are interned
+    when an item is loaded from an OrgNode.
+
     Attributes
     ----------
         heading: heading of the item.
@@ -50,7 +69,16 @@ class OrgAgendaItem:
         body: all text that is not part of PROPERTIES
     """
 
+    __slots__ = (
+        "_timestamps",
+        "_timestamps_key",
+        "title",
+        "properties",
+        "description",
+    )
+
     MESSAGE_INVALID_NODE: str = "No agenda item was found."
+    INTERNED_VALUES: frozenset[str] = frozenset(("CALENDAR", "STATUS"))
 
     def __init__(
         self,
@@ -69,7 +97,8 @@ class OrgAgendaItem:
             properties: a dict containing the :PROPERTIES:
             body: all text that is not part of PROPERTIES
         """
-        self._timestamps: list[OrgDate] = []
+        self._timestamps: list[OrgDate] | OrgDateRecurrence = []
+        self._timestamps_key: tuple = ()
 
         self.title: str = title.strip()
         self.timestamps = timestamps
@@ -81,32 +110,64 @@ class OrgAgendaItem:
         """
         Returns a list of OrgDate objects that are sorted by start date.
 
+        If the timestamps are stored as an OrgDateRecurrence, its occurrences
+        are expanded into the stored list first, such that changes to the
+        returned list are kept.
+
         Returns
         -------
             list of sorted org dates
 
         """
+        if isinstance(self._timestamps, OrgDateRecurrence):
+            self.timestamps = list(self._timestamps)
         return self._timestamps
 
     @timestamps.setter
-    def timestamps(self, timestamps: list[OrgDate]):
+    def timestamps(self, timestamps: "list[OrgDate] | OrgDateRecurrence"):
         """
         Ensures the timestamps are sorted by start date, and the short range
         notation is disabled.
 
-        It also removes duplicate timestamps
+        It also removes duplicate timestamps, and computes the key that is
+        used to compare the timestamps, see OrgAgendaItem.timestamps_key. An
+        OrgDateRecurrence is stored as is.
 
         Args:
         ----
-            value: list of OrgDate objects
+            value: list of OrgDate objects, or an OrgDateRecurrence
         """
+        if isinstance(timestamps, OrgDateRecurrence):
+            self._timestamps = timestamps
+            self._timestamps_key = ()
+            return
+
         timestamps.sort(key=lambda x: x.start)
         for i, timestamp in enumerate(timestamps):
-            if timestamp.start == timestamp.end and timestamp._repeater is None:
-                timestamps[i] = OrgDate(start=timestamp.start)
-            timestamp._allow_short_range = False
+            timestamps[i] = _normalize_orgdate(timestamp)
 
         self._timestamps = timestamps
+        self._timestamps_key = tuple(get_orgdate_key(x) for x in timestamps)
+
+    @property
+    def timestamps_key(self) -> tuple:
+        """
+        Returns a hashable key of the timestamps, which is computed once when
+        the timestamps are set. Two items have the same key if the `repr` of
+        their timestamps is the same, see `get_orgdate_key`. The timestamps
+        must therefore be replaced instead of changed in place.
+
+        The key of an OrgDateRecurrence is computed when it is needed, such
+        that its occurrences are not kept in memory.
+
+        Returns
+        -------
+            the key
+
+        """
+        if isinstance(self._timestamps, OrgDateRecurrence):
+            return self._timestamps.key
+        return self._timestamps_key
 
     @property
     def first_timestamp(self) -> OrgDate:
@@ -118,6 +179,9 @@ class OrgAgendaItem:
             the OrgDate objects with the first start date.
 
         """
+        if isinstance(self._timestamps, OrgDateRecurrence):
+            return self._timestamps.first
+
         try:
             return self.timestamps[0]
         except IndexError as error:
@@ -159,12 +223,36 @@ class OrgAgendaItem:
         )
 
         self.title = item.heading.strip()
-        self.properties = item.properties
+        self.properties = self._intern_properties(item.properties)
         self.timestamps = item.get_timestamps(**kwargs)
         self.description = remove_timestamps(item.body.strip())
 
         return self
 
+    @classmethod
+    def _intern_properties(cls, properties: dict) -> dict:
+        """
+        Interns the keys of `properties`, and the values of the keys in
+        OrgAgendaItem.INTERNED_VALUES, as they are repeated for every item.
+
+        Args:
+        ----
+            properties: the properties of an OrgNode
+
+        Returns:
+        -------
+            the properties, using interned strings.
+
+        """
+        return {
+            sys.intern(key): (
+                sys.intern(value)
+                if key in cls.INTERNED_VALUES and isinstance(value, str)
+                else value
+            )
+            for key, value in properties.items()
+        }
+
     def get_first_agenda_item(self, node: OrgNode) -> OrgNode:
         """
         The first non-root node is expected to be the agenda item.
@@ -312,8 +400,8 @@ class OrgAgendaItem:
     ) -> bool:
         """Compare attributes other than properties and timestamps."""
         attribute_equal = True
-        for attribute in vars(a):
-            if attribute in {"properties", "_timestamps"}:
+        for attribute in OrgAgendaItem.__slots__:
+            if attribute in {"properties", "_timestamps", "_timestamps_key"}:
                 continue
             if getattr(a, attribute) == getattr(b, attribute):
                 continue
@@ -358,13 +446,13 @@ class OrgAgendaItem:
         a: "OrgAgendaItem",
         b: "OrgAgendaItem",
     ) -> bool:
-        """Compare normalized timestamp representations."""
-        timestamps_equal = str(a.timestamps) == str(b.timestamps)
+        """Compare the keys of the timestamps, see `timestamps_key`."""
+        timestamps_equal = a.timestamps_key == b.timestamps_key
         if not timestamps_equal:
             logging.debug(
                 "The timestamps don't match %s vs %s",
-                a.timestamps,
-                b.timestamps,
+                a.timestamps_key,
+                b.timestamps_key,
             )
         return timestamps_equal
 
@@ -455,11 +543,14 @@ class OrgAgendaItem:
 
         """
         uid: str = str(self.properties.get("UID", ""))
+        timestamps: str = (
+            self.get_timestamps_as_str(spec) if "{timestamps" in spec else ""
+        )
 
         try:
             return spec.format(
                 title=self.title,
-                timestamps=self.get_timestamps_as_str(spec),
+                timestamps=timestamps,
                 attendees=self.properties.get("ATTENDEES", ""),
                 calendar=self.properties.get("CALENDAR", ""),
                 # In some versions of icalendar, the comma that separates CATEGORIES are escaped
@@ -480,6 +571,32 @@ class OrgAgendaItem:
             message: str = "Unsupported key encountered in `spec`"
             raise KeyError(message) from error
 
+    def as_dict(self) -> dict:
+        """
+        Returns the item as a dict that can be serialized to JSON, without
+        using a template. The timestamps are represented by their start and
+        end in the ISO 8601 format.
+
+        Returns
+        -------
+            the title, timestamps, properties, rrule, and description.
+
+        """
+        timestamps: list[dict] = [
+            dict(
+                start=x.start.isoformat(),
+                end=x.end.isoformat() if x.end else None,
+            )
+            for x in self._timestamps
+        ]
+        return dict(
+            title=self.title,
+            timestamps=timestamps,
+            properties=dict(self.properties),
+            rrule=self.properties.get("RRULE", ""),
+            description=self.description,
+        )
+
     def get_timestamps_as_str(self, spec: str) -> str:
         """
         The timestamps are joined with a newline. To ensure a constant
@@ -495,7 +612,7 @@ class OrgAgendaItem:
 
         """
         timestamp_indents: list = get_indent(spec, "{timestamps}")
-        generator: Generator = (str(x) for x in self.timestamps)
+        generator: Generator = (str(x) for x in self._timestamps)
 
         if len(timestamp_indents) > 1:
             logging.warning(
@@ -524,28 +641,93 @@ class OrgAgendaFile:
     formatted string can be returned. This is similar to the `khal list` command
     but for org items.
 
+    The OrgNode tree is only used while constructing the object. If
+    `occurrences` is True, the occurrences that OrgAgendaFile.apply_rrules
+    needs are collected in the same pass that creates the items, such that
+    the tree can be released. Only the agendas of khal need them, so they are
+    not collected by default.
+
     Attributes
     ----------
-        nodes: An OrgNode object representing the parsed org file.
         items: A list of OrgAgendaItem objects representing the agenda items.
     """
 
-    def __init__(self, nodes: OrgNode) -> None:
+    def __init__(self, nodes: OrgNode, occurrences: bool = False) -> None:
         """
         Initializes a new instance of the OrgAgendaFile class.
 
         Args:
         ----
             nodes: An OrgNode object representing the parsed org file.
+            occurrences: collect the occurrences for apply_rrules.
 
         Returns:
         -------
             None.
         """
-        self.nodes: OrgNode = nodes
-        self.items: list[OrgAgendaItem] = [
-            OrgAgendaItem.from_node(x) for x in nodes if not x.is_root()
-        ]
+        self.items: list[OrgAgendaItem] = []
+        self._occurrences: list[tuple[str, OrgDate, str]] | None = (
+            [] if occurrences else None
+        )
+        self._add_nodes(nodes)
+
+    def _add_nodes(self, nodes: OrgNode) -> None:
+        """
+        Adds the items of `nodes`, and their occurrences if they are
+        collected.
+
+        Args:
+        ----
+            nodes: An OrgNode object representing (a part of) an org file.
+        """
+        for node in nodes:
+            if node.is_root():
+                continue
+            self.items.append(OrgAgendaItem.from_node(node))
+            if self._occurrences is None:
+                continue
+            try:
+                self._occurrences.append(OrgDateAgenda._parse_node(node))
+            except IndexError:
+                continue  # an item without a timestamp has no occurrence
+
+    @classmethod
+    def merge(cls, agendas: list["OrgAgendaFile"]) -> "OrgAgendaFile":
+        """
+        Merges agendas that were loaded from consecutive parts of an org
+        file, e.g., by OrgAgendaFile._from_headings.
+
+        The items and their occurrences are concatenated in the order of
+        `agendas`, such that OrgAgendaFile.apply_rrules groups the occurrences
+        of an event that are spread over several agendas by their UID.
+
+        Args:
+        ----
+            agendas: the agendas, sorted by their date range.
+
+        Returns:
+        -------
+            A new instance of the OrgAgendaFile class.
+        """
+        obj: OrgAgendaFile = copy(agendas[0])
+        obj.items = [item for agenda in agendas for item in agenda.items]
+        if obj._occurrences is not None:
+            obj._occurrences = [
+                x for agenda in agendas for x in agenda._occurrences or []
+            ]
+        return obj
+
+    def copy(self) -> "OrgAgendaFile":
+        """
+        Returns a shallow copy that has its own list of items.
+
+        Returns
+        -------
+            A new instance of the OrgAgendaFile class.
+        """
+        obj: OrgAgendaFile = copy(self)
+        obj.items = list(self.items)
+        return obj
 
     def apply_rrules(self) -> "OrgAgendaFile":
         """
@@ -553,23 +735,33 @@ class OrgAgendaFile:
         appropriate OrgDateAgenda objects and applies them to the
         OrgAgendaItems.
 
+        The agenda must be created with `occurrences` set to True, otherwise
+        the items are only deduplicated by their UID.
+
         Returns
         -------
             An instance of the OrgAgendaFile class with updated items.
         """
         uids = set()
         items = []
-        agenda_timestamps = OrgDateAgenda(self.nodes)
+        agenda_timestamps = OrgDateAgenda()
+        for occurrence in self._occurrences or []:
+            agenda_timestamps.add(*occurrence)
 
         for item in self.items:
             uid: str = item.properties["UID"]
-            if uid not in uids:
-                item.timestamps = agenda_timestamps.dates[uid]
+            if uid in uids:
+                continue
+            if uid in agenda_timestamps.dates:
+                item.timestamps = agenda_timestamps.get_timestamps(uid)
                 item.properties["RRULE"] = agenda_timestamps.get_rrulestr(uid)
-                uids.add(uid)
-                items.append(item)
+            uids.add(uid)
+            items.append(item)
 
+        # The occurrences are part of the items now, and are released such
+        # that a compact OrgDateRecurrence is the only copy of them.
         self.items = items
+        self._occurrences = None
         return self
 
     def __format__(self, spec: str) -> str:
@@ -587,26 +779,94 @@ class OrgAgendaFile:
         return "\n".join(format(x, spec) for x in self.items)
 
     @classmethod
-    def from_str(cls, items: str) -> "OrgAgendaFile":
+    def from_str(
+        cls, items: str, occurrences: bool = False
+    ) -> "OrgAgendaFile":
         """
         Creates a new instance of the OrgAgendaFile class from a string
         representation of the org file.
 
         If `items` is an empty str it is replaced by '\n'
 
+        Large org files are split on their top-level headings, and the parts
+        are parsed in a process pool, see OrgAgendaFile._from_headings. Each
+        worker gets at least PARALLEL_PARSE_MIN_HEADINGS headings, so small
+        files are parsed serially. The headings are counted first, such that
+        a file is only split if it is parsed in parallel.
+
         Args:
         ----
             items: A string containing the org file.
+            occurrences: collect the occurrences for apply_rrules.
+
+        Returns:
+        -------
+            An instance of the OrgAgendaFile class.
+        """
+        items = normalize_escapes(items or "\n")
+        headings: int = count_headings(items)
+        workers: int = min(
+            MAX_PARSE_WORKERS, headings // PARALLEL_PARSE_MIN_HEADINGS
+        )
+        if workers > 1:
+            try:
+                return cls._from_headings(
+                    split_headings(items), workers, occurrences
+                )
+            except (BrokenProcessPool, OSError) as error:
+                logging.warning(f"Parsing in parallel failed: {error!r}")
+
+        return cls(orgparse.loads(items), occurrences)
+
+    @classmethod
+    def _from_headings(
+        cls, headings: list[str], workers: int, occurrences: bool = False
+    ) -> "OrgAgendaFile":
+        """
+        Parses the `headings` in `workers` processes, and merges the results
+        in the order of `headings`.
+
+        The TODO keywords that are defined before the first heading are passed
+        to each worker, such that they apply to all chunks. The property keys
+        and calendar names are interned again, as the items are copied from
+        the worker processes.
+
+        Args:
+        ----
+            headings: the result of split_headings
+            workers: the number of processes
+            occurrences: collect the occurrences for apply_rrules.
 
         Returns:
         -------
             An instance of the OrgAgendaFile class.
         """
-        items = items or "\n"
-        # Some versions of icalendar escapes the commas in the CATEGORIES
-        # section which makes similar objects differ.
-        items = items.replace("\\,", ",")
-        return cls(orgparse.loads(items))
+        size: int = -(-len(headings) // workers)
+        chunks: list[str] = [
+            "".join(headings[i : i + size])
+            for i in range(0, len(headings), size)
+        ]
+
+        preamble: OrgNode = orgparse.loads(headings[0] or "\n")
+        todos: list[str] = list(preamble.env.todo_keys)
+        dones: list[str] = list(preamble.env.done_keys)
+
+        logging.debug(f"Parsing {len(chunks)} chunks in parallel")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            agendas: list[OrgAgendaFile] = list(
+                executor.map(
+                    _load_agenda,
+                    chunks,
+                    repeat(todos),
+                    repeat(dones),
+                    repeat(occurrences),
+                )
+            )
+
+        obj: OrgAgendaFile = cls.merge(agendas)
+        for item in obj.items:
+            item.properties = OrgAgendaItem._intern_properties(item.properties)
+        return obj
 
     @classmethod
     def from_path(cls, path: Path) -> "OrgAgendaFile":
@@ -614,6 +874,10 @@ class OrgAgendaFile:
         Creates a new instance of the OrgAgendaFile class from a path
         of an org file.
 
+        The file is memory-mapped and parsed per top-level heading, such that
+        it is never copied as a whole. The TODO keywords that are defined
+        before the first heading apply to all headings.
+
         Args:
         ----
             path: A Path to the org file.
@@ -622,7 +886,21 @@ class OrgAgendaFile:
         -------
             An instance of the OrgAgendaFile class.
         """
-        return cls.from_str(path.read_text())
+        filename: str = str(path)
+        headings: Generator = iter_headings(path)
+        preamble: OrgNode = orgparse.loads(next(headings) or "\n", filename)
+        obj: OrgAgendaFile = cls(preamble)
+
+        for heading in headings:
+            env: OrgEnv = OrgEnv(
+                todos=preamble.env.todo_keys,
+                dones=preamble.env.done_keys,
+                filename=filename,
+            )
+            obj._add_nodes(
+                orgparse.loads(normalize_escapes(heading), filename, env)
+            )
+        return obj
 
     def get_item(self, uid: str | None) -> OrgAgendaItem | None:
         """
@@ -648,6 +926,207 @@ class OrgAgendaFile:
         raise TooManyOrgItems(f"More than one elements found with uid: {uid}")
 
 
+def _load_agenda(
+    text: str, todos: list[str], dones: list[str], occurrences: bool
+) -> OrgAgendaFile:
+    """
+    Parses `text` serially. It is used by OrgAgendaFile._from_headings, in
+    the worker processes.
+
+    Args:
+    ----
+        text: an org document
+        todos: the TODO keywords of the whole document
+        dones: the DONE keywords of the whole document
+        occurrences: collect the occurrences for apply_rrules.
+
+    Returns:
+    -------
+        the agenda
+    """
+    env: OrgEnv = OrgEnv(todos=todos, dones=dones, filename="<string>")
+    return OrgAgendaFile(orgparse.loads(text, env=env), occurrences)
+
+
+def collapse_occurrences(text: str) -> str:
+    """
+    Removes the repeated occurrences of recurring events from the output of
+    `khal list`, before it is parsed.
+
+    `khal list` prints each occurrence of a recurring event. When an RRULE is
+    supported, OrgAgendaFile.apply_rrules only needs its first occurrence, as
+    it becomes an org repeater. The other occurrences, which have the same UID
+    and RRULE, are removed. Occurrences that OrgDateAgenda.add may still need
+    are kept: the ones without an RRULE (e.g., moved occurrences), or with an
+    unsupported RRULE.
+
+    Args:
+    ----
+        text: the output of `khal list` in org format
+
+    Returns:
+    -------
+        `text` without the repeated occurrences.
+
+    """
+    seen: set[tuple[str, str]] = set()
+    supported: dict[str, bool] = {}
+    headings: list[str] = split_headings(text)
+    result: list[str] = []
+    for heading in headings:
+        rule: str = get_property(heading, "RRULE")
+        if rule:
+            key: tuple[str, str] = (get_property(heading, "UID"), rule)
+            if rule not in supported:
+                supported[rule] = rrulestr_is_supported(rule)
+            if supported[rule] and key in seen:
+                continue
+            seen.add(key)
+        result.append(heading)
+
+    logging.debug(f"Occurrences removed: {len(headings) - len(result)}")
+    return "".join(result)
+
+
+def normalize_escapes(text: str) -> str:
+    """
+    Some versions of icalendar escape the commas in the CATEGORIES section,
+    which makes similar objects differ. These commas are unescaped.
+
+    Args:
+    ----
+        text: org text
+
+    Returns:
+    -------
+        the text without escaped commas.
+    """
+    return text.replace("\\,", ",")
+
+
+def _normalize_orgdate(timestamp: OrgDate) -> OrgDate:
+    """
+    Disables the short range notation of `timestamp`, and replaces a range
+    whose start equals its end by a point in time.
+
+    Args:
+    ----
+        timestamp: the timestamp
+
+    Returns:
+    -------
+        the normalized timestamp
+    """
+    if timestamp.start == timestamp.end and timestamp._repeater is None:
+        return OrgDate(start=timestamp.start)
+    timestamp._allow_short_range = False
+    return timestamp
+
+
+class OrgDateRecurrence:
+    """
+    The occurrences of an event with an RRULE that is not supported as an org
+    repeater, e.g., a weekly event on more than 2 weekdays.
+
+    Instead of a list of OrgDate objects, only the first occurrence, the RRULE
+    and the number of occurrences are stored. The occurrences are expanded
+    when they are iterated, e.g., when the `{timestamps}` of the item are
+    formatted. Use OrgDateRecurrence.from_occurrences, which ensures that the
+    expanded occurrences are the same as the original ones.
+
+    Attributes
+    ----------
+        first: the first occurrence
+        rule: the RRULE
+        count: the number of occurrences
+    """
+
+    __slots__ = ("first", "rule", "count")
+
+    def __init__(self, first: OrgDate, rule: str, count: int) -> None:
+        """
+        Init.
+
+        Args:
+        ----
+            first: the first occurrence
+            rule: the RRULE
+            count: the number of occurrences
+        """
+        self.first: OrgDate = _normalize_orgdate(first)
+        self.rule: str = rule
+        self.count: int = count
+
+    @classmethod
+    def from_occurrences(
+        cls, occurrences: list[OrgDate], rule: str
+    ) -> "OrgDateRecurrence | None":
+        """
+        Returns the recurrence of `occurrences`, if their timestamps can be
+        reproduced from the first occurrence and `rule`.
+
+        This is not the case if, e.g., an occurrence was moved or excluded,
+        or if the occurrences have different durations.
+
+        Args:
+        ----
+            occurrences: the occurrences
+            rule: the RRULE of the occurrences
+
+        Returns:
+        -------
+            the recurrence, or None if it would differ from `occurrences`.
+        """
+        if len(occurrences) < 2 or any(x._repeater for x in occurrences):
+            return None
+
+        timestamps: list[OrgDate] = sorted(occurrences, key=lambda x: x.start)
+        obj: OrgDateRecurrence = cls(timestamps[0], rule, len(timestamps))
+        try:
+            key: tuple = obj.key
+        except (ValueError, TypeError) as error:
+            logging.debug(f"Cannot expand the RRULE {rule}: {error}")
+            return None
+
+        expected: tuple = tuple(
+            get_orgdate_key(_normalize_orgdate(x)) for x in timestamps
+        )
+        return obj if key == expected else None
+
+    @property
+    def key(self) -> tuple:
+        """
+        Returns the key of the occurrences, see OrgAgendaItem.timestamps_key.
+
+        Returns
+        -------
+            the key
+        """
+        return tuple(get_orgdate_key(x) for x in self)
+
+    def __iter__(self) -> Iterator[OrgDate]:
+        """
+        Expands the occurrences.
+
+        Returns
+        -------
+            the occurrences, sorted by their start.
+        """
+        start: Time = self.first.start
+        end: Time | None = self.first.end
+        for time in get_occurrences(self.rule, start, self.count):
+            yield _normalize_orgdate(
+                OrgDate(
+                    time,
+                    time + (end - start) if end else None,
+                    self.first._active,
+                )
+            )
+
+    def __len__(self) -> int:
+        return self.count
+
+
 class OrgDateAgenda:
     """
     An object or this class groups all date together based on their UID value,
@@ -756,7 +1235,7 @@ class OrgDateAgenda:
         -------
             None.
         """
-        if uid not in self.uids:
+        if uid not in self.dates:
             self.new(uid)
 
         supported_rule: bool = rrulestr_is_supported(rule)
@@ -783,8 +1262,9 @@ class OrgDateAgenda:
         """
         return list(self.dates.keys())
 
+    @classmethod
     def _parse_node(
-        self, node: OrgNode, allow_short_range: bool = False
+        cls, node: OrgNode, allow_short_range: bool = False
     ) -> tuple:
         """
         Returns the UID, the timestamp, and the RRULE from an OrgNode.
@@ -801,7 +1281,7 @@ class OrgDateAgenda:
         """
         uid: str = str(node.properties.get("UID", ""))
         rule: str = str(node.properties.get("RRULE", ""))
-        timestamp: OrgDate = node.get_timestamps(**self.TIME_STAMPS_TYPES)[0]
+        timestamp: OrgDate = node.get_timestamps(**cls.TIME_STAMPS_TYPES)[0]
         timestamp._allow_short_range = allow_short_range
 
         return uid, timestamp, rule
@@ -820,6 +1300,30 @@ class OrgDateAgenda:
         """
         return "\n".join([str(x) for x in self.dates[uid]])
 
+    def get_timestamps(self, uid: str) -> "list[OrgDate] | OrgDateRecurrence":
+        """
+        Returns the timestamps of `uid`.
+
+        If the only RRULE of `uid` is unsupported, its occurrences are
+        returned as an OrgDateRecurrence, if possible.
+
+        Args:
+        ----
+            uid: the UID
+
+        Returns:
+        -------
+            the timestamps
+        """
+        rules: set[str] = self.unsupported_rrules[uid]
+        if len(rules) == 1 and not self.rrules[uid]:
+            recurrence: OrgDateRecurrence | None = (
+                OrgDateRecurrence.from_occurrences(self.dates[uid], *rules)
+            )
+            if recurrence is not None:
+                return recurrence
+        return self.dates[uid]
+
     def get_rrulestr(self, uid: str) -> str:
         """
         Return the rrule that describes the recurrence of the OrgDateAgenda
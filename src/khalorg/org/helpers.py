@@ -1,8 +1,14 @@
+import mmap
 import re
 from dataclasses import dataclass
+from datetime import date, datetime
+from pathlib import Path
+from typing import Generator
 
 from orgparse.date import OrgDate
 
+Time = date | datetime
+
 
 def remove_timestamps(text: str) -> str:
     """
@@ -40,6 +46,93 @@ def remove_timestamps(text: str) -> str:
     return result
 
 
+def split_headings(text: str) -> list[str]:
+    """
+    Splits an org document on its top-level headings. The text before the
+    first heading is the first element of the list, which may be empty.
+    Joining the result returns `text`.
+
+    Args:
+    ----
+        text: an org document
+
+    Returns:
+    -------
+        the top-level headings, each including its body and sub headings.
+
+    """
+    return re.split(r"^(?=\* )", text, flags=re.MULTILINE)
+
+
+def count_headings(text: str) -> int:
+    """
+    Returns the number of top-level headings of an org document, without
+    splitting it, see split_headings.
+
+    Args:
+    ----
+        text: an org document
+
+    Returns:
+    -------
+        the number of top-level headings
+
+    """
+    return text.count("\n* ") + text.startswith("* ")
+
+
+def iter_headings(path: Path) -> Generator[str, None, None]:
+    """
+    Yields the top-level headings of the org file at `path`, in the same way
+    as split_headings, without reading the whole file.
+
+    The file is memory-mapped, the heading boundaries are searched in the
+    mapped bytes, and only the heading that is yielded is decoded.
+
+    Args:
+    ----
+        path: path to an org file
+
+    Returns:
+    -------
+        the top-level headings, preceded by the text before the first
+        heading.
+
+    """
+    with open(path, "rb") as file:
+        try:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:  # an empty file cannot be mapped
+            yield ""
+            return
+
+    with mapped:
+        start: int = 0
+        for match in re.finditer(rb"^(?=\* )", mapped, flags=re.MULTILINE):
+            yield mapped[start : match.start()].decode()
+            start = match.start()
+        yield mapped[start:].decode()
+
+
+def get_property(text: str, key: str) -> str:
+    """
+    Returns the value of the first property `key` in `text`, without parsing
+    the org document.
+
+    Args:
+    ----
+        text: an org heading
+        key: the property name
+
+    Returns:
+    -------
+        the property value or an empty str if it is not found.
+
+    """
+    match = re.search(rf"^[ \t]*:{key}:(.*)$", text, re.MULTILINE)
+    return match.group(1).strip() if match else ""
+
+
 def get_indent(text: str, piece: str) -> list:
     """
     Returns the indent for a `piece` of `text`. If `piece` is found multiple
@@ -85,3 +178,53 @@ def timestamp_to_orgdate(timestamp: str) -> OrgDate:
     """
     datestr: str = re.sub(r"[\[\<](.*)[\]\>]", r"\1", timestamp)
     return OrgDate.from_str(datestr)
+
+
+def get_orgdate_key(orgdate: OrgDate) -> tuple:
+    """
+    Returns a hashable key of `orgdate` that is equal for two OrgDate objects
+    if, and only if, their `repr` is equal. The times are represented as in
+    the `repr`: up to the second and without their tzinfo.
+
+    Args:
+    ----
+        orgdate: the timestamp
+
+    Returns:
+    -------
+        the key: the type, start, end, active, repeater, and warning.
+    """
+    start: Time = orgdate.start
+    end: Time | None = orgdate.end if orgdate.has_end() else None
+    return (
+        type(orgdate).__name__,
+        _get_time_key(start),
+        None if end is None else _get_time_key(end),
+        orgdate._active,
+        orgdate._repeater,
+        orgdate._warning,
+    )
+
+
+def _get_time_key(time: Time) -> tuple[int, ...]:
+    """
+    Returns the fields of `time` that are part of the `repr` of an OrgDate.
+
+    Args:
+    ----
+        time: a date or datetime
+
+    Returns:
+    -------
+        the year up to the day for a date, or up to the second for a datetime
+    """
+    if isinstance(time, datetime):
+        return (
+            time.year,
+            time.month,
+            time.day,
+            time.hour,
+            time.minute,
+            time.second,
+        )
+    return (time.year, time.month, time.day)
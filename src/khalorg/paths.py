@@ -7,6 +7,7 @@ root: str = dirname(__file__)
 log_file: str = expanduser("~/.local/state/khalorg.log")
 config_dir: str = expanduser("~/.config/khalorg")
 state_dir: str = expanduser("~/.local/share/khalorg")
+list_cache_dir: str = join(state_dir, "list_cache")
 static_dir: str = dirname(getfile(static))
 
 format: str = join(config_dir, "khalorg_format.txt")
@@ -0,0 +1,138 @@
+"""Routes between khal calendars and org files, see `khalorg sync-routes`."""
+
+import hashlib
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+
+from khal.settings.settings import ConfigObj, ConfigObjError
+
+from khalorg.org.agenda_items import OrgAgendaItem
+
+
+@dataclass(frozen=True)
+class Route:
+    """
+    A calendar whose events are synced with an org file.
+
+    If `filetags` is not empty, only the events that have one of the
+    `filetags` as category take this route.
+    """
+
+    calendar: str
+    org_file: Path
+    filetags: tuple[str, ...] = ()
+
+
+def load_routes(path: Path) -> list[Route]:
+    """
+    Load the routes from a config file, where each section is a route.
+
+    For example:
+
+        [work]
+        calendar = work
+        org_file = ~/org/work.org
+
+        [project]
+        calendar = team
+        org_file = ~/org/project.org
+        filetags = project,
+
+    Raises
+    ------
+        ValueError: if the config is invalid.
+    """
+    try:
+        config = ConfigObj(str(path), file_error=True)
+    except (OSError, ConfigObjError) as error:
+        raise ValueError(f"The routes in {path} cannot be read") from error
+
+    routes: list[Route] = []
+    for name in config.sections:
+        section = config[name]
+        try:
+            calendar = str(section["calendar"])
+            org_file = Path(str(section["org_file"])).expanduser()
+        except KeyError as error:
+            raise ValueError(
+                f"The route {name} in {path} misses the key {error}"
+            ) from error
+        filetags = section.as_list("filetags") if "filetags" in section else []
+        routes.append(Route(calendar, org_file, tuple(filetags)))
+
+    if not routes:
+        raise ValueError(f"No routes are defined in {path}")
+    return routes
+
+
+class Router:
+    """
+    Decide for each item which calendar and org file it is synced with.
+
+    A khal event takes the first route of its calendar with a filetag that
+    is one of its categories, or else the first route of its calendar
+    without filetags. An org item takes the route of its org file whose
+    calendar is the CALENDAR property of the item. An item without CALENDAR
+    takes the first route of its org file. Note that `khalorg sync-routes`
+    keeps an event in the org file that already contains it.
+    """
+
+    def __init__(self, routes: list[Route]) -> None:
+        """Initialize a router."""
+        self.routes = routes
+        self.calendars: list[str] = list(
+            dict.fromkeys(x.calendar for x in routes)
+        )
+        self.org_files: list[Path] = list(
+            dict.fromkeys(x.org_file for x in routes)
+        )
+        self.pairs: list[tuple[str, Path]] = list(
+            dict.fromkeys((x.calendar, x.org_file) for x in routes)
+        )
+
+    def get_org_file(self, item: OrgAgendaItem, calendar: str) -> Path | None:
+        """Return the org file of a khal event of `calendar`, if any."""
+        categories = {
+            x.strip() for x in item.split_property("CATEGORIES", ",")
+        }
+        routes = [x for x in self.routes if x.calendar == calendar]
+        for route in routes:
+            if categories.intersection(route.filetags):
+                return route.org_file
+        for route in routes:
+            if not route.filetags:
+                return route.org_file
+        return None
+
+    def get_calendar(self, item: OrgAgendaItem, org_file: Path) -> str | None:
+        """Return the calendar of an item of `org_file`, if any."""
+        calendars = [x for x, y in self.pairs if y == org_file]
+        calendar = item.properties.get("CALENDAR", "")
+        if not calendar:
+            return calendars[0]
+        if calendar in calendars:
+            return calendar
+
+        logging.warning(
+            f"The calendar {calendar} of {item.uid}: {item.title} has no "
+            f"route to {org_file}. Skipping this element."
+        )
+        return None
+
+    def get_filetags(self, org_file: Path) -> list[str]:
+        """Return the filetags of all routes to `org_file`."""
+        return list(
+            dict.fromkeys(
+                tag
+                for route in self.routes
+                if route.org_file == org_file
+                for tag in route.filetags
+            )
+        )
+
+
+def get_route_state_file(state_dir: Path, org_file: Path) -> Path:
+    """Return the state file of an org file that is synced through routes."""
+    digest = hashlib.sha1(str(org_file.resolve()).encode()).hexdigest()
+    return state_dir / "routes" / f"{org_file.stem}-{digest[:8]}.org"
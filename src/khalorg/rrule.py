@@ -295,6 +295,73 @@ def rrulestr_is_supported(value: str) -> bool:
         return rrule_is_supported(obj)
 
 
+def ical_rrule_is_supported(value: str, dtstart: Time) -> bool:
+    """
+    Check if the RRULE of an iCalendar event is supported.
+
+    In contrast to `rrulestr_is_supported`, the rule is parsed relative to the
+    DTSTART of the event, such that an UNTIL value with a timezone is accepted
+    if DTSTART also has one. A rule that cannot be parsed is not supported.
+
+    Args:
+    ----
+        value: the RRULE of the event, without the "RRULE:" prefix.
+        dtstart: the start of the event.
+
+    Returns:
+    -------
+        bool: True if the recurrence rule is supported, False otherwise.
+    """
+    if not value:
+        return True  # empty rrule is supported
+
+    try:
+        obj: rrule | rruleset = rrulestr(value, dtstart=dtstart)
+    except ValueError:
+        return False
+    return isinstance(obj, rrule) and rrule_is_supported(obj)
+
+
+def get_occurrences(value: str, dtstart: Time, count: int) -> list[Time]:
+    """
+    Returns the first `count` starts of a recurrence rule.
+
+    As in iCalendar, `dtstart` is the first start, even if it does not match
+    the rule. If `dtstart` has no timezone, the timezone of an UNTIL value is
+    ignored, as the times in the output of `khal list` are local.
+
+    Args:
+    ----
+        value: the RRULE, without the "RRULE:" prefix.
+        dtstart: the first start.
+        count: the maximum number of starts.
+
+    Returns:
+    -------
+        the starts, which are dates if `dtstart` is a date.
+
+    Raises:
+    ------
+        ValueError: if the rule cannot be parsed.
+    """
+    all_day: bool = not isinstance(dtstart, datetime)
+    start: datetime = (
+        datetime.combine(dtstart, datetime.min.time()) if all_day else dtstart
+    )
+    obj: rrule | rruleset = rrulestr(
+        value, dtstart=start, ignoretz=start.tzinfo is None
+    )
+
+    result: list[datetime] = [start]
+    for time in obj:
+        if len(result) >= count:
+            break
+        elif time > start:
+            result.append(time)
+
+    return [x.date() for x in result] if all_day else list(result)
+
+
 def rrule_is_supported(
     rule: rrule,
     max_days: int = MAX_WEEKDAYS,
@@ -0,0 +1,151 @@
+"""Sharded, compressed storage of the sync state of a calendar."""
+
+import gzip
+import hashlib
+from collections import defaultdict
+from collections.abc import Iterable
+from pathlib import Path
+
+from khalorg.org.agenda_items import OrgAgendaFile, OrgAgendaItem
+
+SHARD_PREFIX_LENGTH: int = 2
+SHARD_SUFFIX: str = ".org.gz"
+
+
+def get_shard_name(uid: str) -> str:
+    """
+    Returns the name of the shard that stores the item with `uid`.
+
+    The name is a prefix of the hash of the UID, such that the items are
+    spread evenly over at most 16 ** SHARD_PREFIX_LENGTH shards.
+
+    Args:
+    ----
+        uid: the UID of the item
+
+    Returns
+    -------
+        the name of the shard
+    """
+    return hashlib.sha1(uid.encode()).hexdigest()[:SHARD_PREFIX_LENGTH]
+
+
+class ShardedState:
+    """
+    Stores the sync state of a calendar as gzip compressed shards.
+
+    Each item is stored in the shard that belongs to its UID, see
+    `get_shard_name`. The text of the shards that were loaded or written is
+    remembered, such that a write only rewrites the shards whose items
+    changed. Items without a UID are not stored, as they are new org items
+    that are not synced yet.
+
+    Attributes
+    ----------
+        directory: the directory that contains the shards
+    """
+
+    def __init__(self, directory: Path):
+        """
+        Init.
+
+        Args:
+        ----
+            directory: the directory that contains the shards
+        """
+        self.directory: Path = directory
+        self._texts: dict[str, str] = {}
+
+    def load(
+        self, uids: Iterable[str | None] | None = None
+    ) -> OrgAgendaFile:
+        """
+        Loads the items of the state.
+
+        Args:
+        ----
+            uids: only the shards of these UIDs are loaded. All shards are
+                loaded if None.
+
+        Returns
+        -------
+            the items as an agenda
+        """
+        if uids is None:
+            names: list[str] = sorted(
+                x.name.removesuffix(SHARD_SUFFIX)
+                for x in self.directory.glob(f"*{SHARD_SUFFIX}")
+            )
+        else:
+            names = sorted({get_shard_name(x) for x in uids if x is not None})
+
+        texts: list[str] = [self._read(x) for x in names]
+        return OrgAgendaFile.from_str("\n".join(x for x in texts if x))
+
+    def write(
+        self, items: Iterable[OrgAgendaItem], khalorg_format: str
+    ) -> None:
+        """
+        Writes `items`, rewriting only the shards whose text changed.
+
+        Shards that no longer contain items are removed, provided that they
+        were loaded or written before.
+
+        Args:
+        ----
+            items: all items of the state
+            khalorg_format: the format of the items
+        """
+        shards: dict[str, list[str]] = defaultdict(list)
+        for item in items:
+            if item.uid is not None:
+                name: str = get_shard_name(item.uid)
+                shards[name].append(format(item, khalorg_format))
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for name in sorted(shards.keys() | self._texts.keys()):
+            text: str = "\n".join(shards.get(name, []))
+            if text == self._read(name):
+                continue
+
+            path: Path = self._get_path(name)
+            if text:
+                path.write_bytes(gzip.compress(text.encode(), mtime=0))
+            else:
+                path.unlink(missing_ok=True)
+            self._texts[name] = text
+
+    def _read(self, name: str) -> str:
+        """
+        Returns the text of the shard `name`, reading it only once.
+
+        Args:
+        ----
+            name: the name of the shard
+
+        Returns
+        -------
+            the text, or an empty string if the shard does not exist
+        """
+        if name not in self._texts:
+            path: Path = self._get_path(name)
+            self._texts[name] = (
+                gzip.decompress(path.read_bytes()).decode()
+                if path.exists()
+                else ""
+            )
+        return self._texts[name]
+
+    def _get_path(self, name: str) -> Path:
+        """
+        Returns the path of the shard `name`.
+
+        Args:
+        ----
+            name: the name of the shard
+
+        Returns
+        -------
+            the path
+        """
+        return self.directory / f"{name}{SHARD_SUFFIX}"
@@ -1,13 +1,20 @@
 """Implementation helpers for synchronizing org files with khal calendars."""
 
+import hashlib
+import json
 import logging
-from collections.abc import Callable
+from collections.abc import Callable, Iterable, Iterator
 from dataclasses import dataclass
 from enum import Enum
 from pathlib import Path
 
-from khalorg.khal.calendar import Calendar
-from khalorg.org.agenda_items import OrgAgendaFile, OrgAgendaItem
+from khalorg.khal.calendar import Calendar, EventWriter
+from khalorg.org.agenda_items import (
+    OrgAgendaFile,
+    OrgAgendaItem,
+    TooManyOrgItems,
+)
+from khalorg.state import ShardedState
 
 SyncCommand = Callable[..., str]
 
@@ -19,6 +26,13 @@ class ConflictResolution(str, Enum):
     ORG = "org"
 
 
+class StateLayout(str, Enum):
+    """How the sync state of a calendar is stored, see `get_sync_state`."""
+
+    FILE = "file"
+    SHARDED = "sharded"
+
+
 @dataclass(frozen=True)
 class SyncContext:
     """Shared state used throughout a synchronization run."""
@@ -29,104 +43,340 @@ class SyncContext:
     state_agenda: OrgAgendaFile
     khal_agenda: OrgAgendaFile
     dry_run: bool
+    writer: EventWriter | None = None
+    uids: set[str | None] | None = None
+
+    def includes(self, uid: str | None) -> bool:
+        """Whether the item with `uid` takes part in this run."""
+        return self.uids is None or uid in self.uids
+
 
+def get_sync_state(
+    state_dir: Path,
+    calendar: str,
+    layout: StateLayout,
+) -> Path | ShardedState:
+    """
+    Return where the sync state of `calendar` is stored.
 
-def load_sync_agenda(path: Path) -> OrgAgendaFile:
+    The file layout stores the state as `<state_dir>/<calendar>.org`. The
+    sharded layout stores it as compressed shards in `<state_dir>/<calendar>`.
+    """
+    if layout is StateLayout.SHARDED:
+        return ShardedState(state_dir / calendar)
+    return state_dir / f"{calendar}.org"
+
+
+def get_fingerprint_path(state_dir: Path, calendar: str) -> Path:
+    """Return the path of the fingerprint of the last no-op sync."""
+    return state_dir / f"{calendar}.fingerprint"
+
+
+def get_sync_fingerprint(
+    org_file: Path,
+    state_file: Path | ShardedState,
+    khal_calendar: Calendar,
+    start: str,
+    stop: str,
+    settings: dict,
+) -> str | None:
+    """
+    Return a digest of everything that determines the result of a sync.
+
+    The digest covers the content of the org file, the change tag of the
+    calendar, the resolved date range, and the `settings` of the run. None
+    is returned if one of them is unknown, or if the state is missing.
+    """
+    state_path = (
+        state_file.directory
+        if isinstance(state_file, ShardedState)
+        else state_file
+    )
+    tag = khal_calendar.change_tag
+    resolved = khal_calendar.resolve_range(start, stop)
+    if (
+        tag is None
+        or resolved is None
+        or not org_file.exists()
+        or not state_path.exists()
+    ):
+        return None
+
+    inputs = [
+        hashlib.sha256(org_file.read_bytes()).hexdigest(),
+        tag,
+        [x.isoformat() for x in resolved],
+        settings,
+    ]
+    encoded = json.dumps(inputs, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def load_sync_agenda(path: Path | ShardedState) -> OrgAgendaFile:
     """Load an org agenda without creating a missing file."""
+    if isinstance(path, ShardedState):
+        return path.load()
     if path.exists():
         return OrgAgendaFile.from_path(path)
     return OrgAgendaFile.from_str("")
 
 
-def push_org_changes(
+class SyncState(str, Enum):
+    """Classification of one UID by comparing org, khal, and the state."""
+
+    UNCHANGED = "unchanged"
+    ORG_CHANGED = "org changed"
+    KHAL_CHANGED = "khal changed"
+    CONFLICT = "conflict"
+    ORG_NEW = "org new"
+    KHAL_NEW = "khal new"
+    ORG_DELETED = "org deleted"
+    KHAL_DELETED = "khal deleted"
+    REMOVED = "removed"
+
+
+MergedItems = tuple[
+    str,
+    OrgAgendaItem | None,
+    OrgAgendaItem | None,
+    OrgAgendaItem | None,
+]
+
+
+def sort_by_uid(items: Iterable[OrgAgendaItem]) -> list[OrgAgendaItem]:
+    """Return the items that have a UID, sorted by UID."""
+    return sorted((x for x in items if x.uid is not None), key=_get_uid)
+
+
+def _get_uid(item: OrgAgendaItem) -> str:
+    """Return the UID of `item`, which must be set."""
+    return str(item.uid)
+
+
+def merge_by_uid(
+    org_items: Iterable[OrgAgendaItem],
+    state_items: Iterable[OrgAgendaItem],
+    khal_items: Iterable[OrgAgendaItem],
+) -> Iterator[MergedItems]:
+    """
+    Merge three streams of items that are sorted by UID.
+
+    For each UID, a tuple of the UID and the org, state, and khal item is
+    yielded, where an item is None if its stream does not contain the UID.
+    Only the current item of each stream is kept in memory, so the streams
+    can be read lazily, e.g., from `sort_by_uid` or from a file.
+
+    Raises
+    ------
+        TooManyOrgItems: if a stream contains a UID more than once
+        ValueError: if a stream is not sorted by UID
+    """
+    streams = [
+        _iter_sorted_uids(x) for x in (org_items, state_items, khal_items)
+    ]
+    heads = [next(x, None) for x in streams]
+    while any(x is not None for x in heads):
+        uid = min(_get_uid(x) for x in heads if x is not None)
+        current: list[OrgAgendaItem | None] = [None, None, None]
+        for index, head in enumerate(heads):
+            if head is not None and head.uid == uid:
+                current[index] = head
+                heads[index] = next(streams[index], None)
+        yield uid, current[0], current[1], current[2]
+
+
+def _iter_sorted_uids(
+    items: Iterable[OrgAgendaItem],
+) -> Iterator[OrgAgendaItem]:
+    """Yield the items with a UID, checking that the UIDs are sorted."""
+    previous: str | None = None
+    for item in items:
+        if item.uid is None:
+            continue
+        uid = _get_uid(item)
+        if uid == previous:
+            raise TooManyOrgItems(
+                f"More than one elements found with uid: {uid}"
+            )
+        if previous is not None and uid < previous:
+            raise ValueError(f"Items are not sorted by uid at: {uid}")
+        previous = uid
+        yield item
+
+
+def classify_sync_state(
+    org_item: OrgAgendaItem | None,
+    state_item: OrgAgendaItem | None,
+    khal_item: OrgAgendaItem | None,
+) -> SyncState:
+    """
+    Classify one UID using its org, state, and khal item.
+
+    Raises
+    ------
+        NotImplementedError: for a combination without defined behavior
+    """
+    if org_item is None:
+        if khal_item is None:
+            return SyncState.REMOVED
+        if khal_item.similar(state_item):
+            return SyncState.ORG_DELETED
+        return SyncState.KHAL_NEW
+    if org_item == state_item and org_item.similar(khal_item):
+        return SyncState.UNCHANGED
+    if khal_item is None:
+        if org_item == state_item:
+            return SyncState.KHAL_DELETED
+        return SyncState.ORG_NEW
+    if org_item == state_item:
+        return SyncState.KHAL_CHANGED
+    if state_item is not None and state_item.similar(khal_item):
+        return SyncState.ORG_CHANGED
+    if not org_item.similar(khal_item):
+        return SyncState.CONFLICT
+
+    logging.info(f"Error syncing item {org_item}")
+    logging.info(f"khal_item is: {khal_item}")
+    logging.info(f"state_item is: {state_item}")
+    raise NotImplementedError
+
+
+def sync_items(
     context: SyncContext,
     edit_dates: bool,
     conflict_resolution: ConflictResolution,
+    delete_on_sync: bool,
     new_command: SyncCommand,
     edit_command: SyncCommand,
-) -> set[str | None]:
-    """Push local changes to khal and apply remote updates locally."""
-    processed_uids: set[str | None] = set()
-    synchronizer = _OrgItemSynchronizer(
+    delete_command: SyncCommand,
+) -> None:
+    """
+    Synchronize the org, state, and khal agendas of `context`.
+
+    All UIDs are classified in one pass over the agendas sorted by UID, see
+    `merge_by_uid` and `classify_sync_state`. Next, the changes are pushed to
+    khal or applied to the org agenda. Org items without a UID are pushed as
+    new events.
+    """
+    synchronizer = _ItemSynchronizer(
         context,
         edit_dates,
         conflict_resolution,
+        delete_on_sync,
         new_command,
         edit_command,
+        delete_command,
     )
-
-    for index, item in enumerate(context.org_agenda.items):
-        state_item = context.state_agenda.get_item(item.uid)
-        khal_item = context.khal_agenda.get_item(item.uid)
-        item_processed = synchronizer.sync(
-            index,
-            item,
-            state_item,
-            khal_item,
-        )
-        if item_processed:
-            processed_uids.add(item.uid)
-
-    return processed_uids
+    synchronizer.sync()
 
 
-class _OrgItemSynchronizer:
-    """Synchronize individual org items using one run's settings."""
+class _ItemSynchronizer:
+    """Synchronize the items of one run using its settings."""
 
     def __init__(
         self,
         context: SyncContext,
         edit_dates: bool,
         conflict_resolution: ConflictResolution,
+        delete_on_sync: bool,
         new_command: SyncCommand,
         edit_command: SyncCommand,
+        delete_command: SyncCommand,
     ) -> None:
         """Initialize an item synchronizer."""
         self.context = context
         self.edit_dates = edit_dates
         self.conflict_resolution = conflict_resolution
+        self.delete_on_sync = delete_on_sync
         self.new_command = new_command
         self.edit_command = edit_command
+        self.delete_command = delete_command
+        self._org_index: dict[int, int] = {}
+        self._new_items: list[tuple[int, OrgAgendaItem]] = []
+        self._removed_items: set[int] = set()
+
+    def sync(self) -> None:
+        """Classify and synchronize all items."""
+        context = self.context
+        org_items = context.org_agenda.items
+        khal_items = context.khal_agenda.items
+        self._org_index = {id(x): i for i, x in enumerate(org_items)}
+        khal_index = {id(x): i for i, x in enumerate(khal_items)}
+
+        for uid, org_item, state_item, khal_item in merge_by_uid(
+            sort_by_uid(org_items),
+            sort_by_uid(context.state_agenda.items),
+            sort_by_uid(khal_items),
+        ):
+            if not context.includes(uid):
+                continue
+            state = classify_sync_state(org_item, state_item, khal_item)
+            if state is SyncState.KHAL_NEW and khal_item is not None:
+                self._new_items.append((khal_index[id(khal_item)], khal_item))
+            else:
+                self._sync_item(state, org_item, state_item, khal_item)
+
+        if context.includes(None):
+            for item in [x for x in org_items if x.uid is None]:
+                self._push_new_item(item)
+
+        # Items are removed and appended afterwards, such that the indices
+        # of the org items stay valid during the pass.
+        context.org_agenda.items[:] = [
+            x for x in org_items if id(x) not in self._removed_items
+        ]
+        for _, item in sorted(self._new_items, key=lambda x: x[0]):
+            logging.info(
+                f"[khal {context.calendar} -> org] Pushing new event "
+                f"{item.uid}: {item.title}"
+            )
+            context.org_agenda.items.append(item)
 
-    def sync(
+    def _sync_item(
         self,
-        index: int,
-        item: OrgAgendaItem,
+        state: SyncState,
+        org_item: OrgAgendaItem | None,
         state_item: OrgAgendaItem | None,
         khal_item: OrgAgendaItem | None,
-    ) -> bool:
-        """Synchronize one org item and report whether it was processed."""
-        if item == state_item and item.similar(khal_item):
-            return True
-        if khal_item is None:
-            if item != state_item:
-                return self._push_new_item(index, item)
-            # The element was removed remotely. Deletion is handled later.
-            return False
-        if item == state_item:
-            self._pull_updated_khal_item(index, item, khal_item)
-        elif state_item is not None and state_item.similar(khal_item):
-            self._push_updated_org_item(item)
-        elif not item.similar(khal_item):
-            self._resolve_edit_conflict(index, item, khal_item)
-        else:
-            self._raise_unhandled_sync_state(item, state_item, khal_item)
-        return True
-
-    def _push_new_item(
-        self,
-        index: int,
-        item: OrgAgendaItem,
-    ) -> bool:
+    ) -> None:
+        """Apply the action that belongs to `state`."""
+        if state is SyncState.ORG_NEW and org_item is not None:
+            self._push_new_item(org_item)
+        elif state is SyncState.ORG_CHANGED and org_item is not None:
+            self._push_updated_org_item(org_item)
+        elif (
+            state is SyncState.KHAL_CHANGED
+            and org_item is not None
+            and khal_item is not None
+        ):
+            self._pull_updated_khal_item(org_item, khal_item)
+        elif (
+            state is SyncState.CONFLICT
+            and org_item is not None
+            and khal_item is not None
+        ):
+            self._resolve_edit_conflict(org_item, khal_item)
+        elif not self.delete_on_sync:
+            return
+        elif state is SyncState.ORG_DELETED and state_item is not None:
+            self._delete_khal_item(state_item)
+        elif state is SyncState.KHAL_DELETED and org_item is not None:
+            self._delete_org_item(org_item)
+
+    def _push_new_item(self, item: OrgAgendaItem) -> None:
         """Create a new khal event for an org item."""
         logging.info(
             f"[org -> khal {self.context.calendar}] Pushing new event "
             f"{item.uid}: {item.title}"
         )
         if self.context.dry_run:
-            return True
+            return
 
-        self.new_command(calendar=self.context.calendar, org=str(item))
+        self.new_command(
+            calendar=self.context.khal_calendar,
+            org=str(item),
+            writer=self.context.writer,
+        )
         try:
             new_item_uid = str(
                 self.context.khal_calendar.get_events_no_uid(
@@ -141,17 +391,14 @@ class _OrgItemSynchronizer:
                 f"{item.title}, start: {item.timestamps[0].start}, "
                 f"end: {item.timestamps[0].end}. Skipping this element."
             )
-            return False
+            return
 
         logging.info(f"The new event uid is {new_item_uid}")
         item.properties["UID"] = new_item_uid
         item.properties["CALENDAR"] = self.context.calendar
-        self.context.org_agenda.items[index] = item
-        return True
 
     def _pull_updated_khal_item(
         self,
-        index: int,
         item: OrgAgendaItem,
         khal_item: OrgAgendaItem,
     ) -> None:
@@ -160,7 +407,7 @@ class _OrgItemSynchronizer:
             f"[khal {self.context.calendar} -> org] Updating event "
             f"{item.uid}: {item.title}"
         )
-        self.context.org_agenda.items[index] = khal_item
+        self._replace_org_item(item, khal_item)
 
     def _push_updated_org_item(self, item: OrgAgendaItem) -> None:
         """Update khal from an org item changed only in the org file."""
@@ -170,14 +417,14 @@ class _OrgItemSynchronizer:
         )
         if not self.context.dry_run:
             self.edit_command(
-                calendar=self.context.calendar,
+                calendar=self.context.khal_calendar,
                 edit_dates=self.edit_dates,
                 org=str(item),
+                writer=self.context.writer,
             )
 
     def _resolve_edit_conflict(
         self,
-        index: int,
         item: OrgAgendaItem,
         khal_item: OrgAgendaItem,
     ) -> None:
@@ -188,7 +435,7 @@ class _OrgItemSynchronizer:
                 f"event {item.uid}: {item.title} following "
                 f"conflict_resolution {self.conflict_resolution.value}"
             )
-            self.context.org_agenda.items[index] = khal_item
+            self._replace_org_item(item, khal_item)
             return
 
         logging.info(
@@ -198,83 +445,105 @@ class _OrgItemSynchronizer:
         )
         if not self.context.dry_run:
             self.edit_command(
-                calendar=self.context.calendar,
+                calendar=self.context.khal_calendar,
                 edit_dates=self.edit_dates,
                 org=str(item),
+                writer=self.context.writer,
+            )
+
+    def _delete_khal_item(self, state_item: OrgAgendaItem) -> None:
+        """Delete the khal event of an item that was removed from org."""
+        logging.info(
+            f"[org -> khal {self.context.calendar}] Removing deleted event "
+            f"{state_item.uid}: {state_item.title}"
+        )
+        if not self.context.dry_run:
+            self.delete_command(
+                self.context.khal_calendar, org=str(state_item)
             )
 
-    @staticmethod
-    def _raise_unhandled_sync_state(
+    def _delete_org_item(self, item: OrgAgendaItem) -> None:
+        """Remove an org item whose khal event was deleted."""
+        logging.info(
+            f"[khal {self.context.calendar} -> org] Removing deleted event "
+            f"{item.uid}: {item.title}"
+        )
+        self._removed_items.add(id(item))
+
+    def _replace_org_item(
+        self,
         item: OrgAgendaItem,
-        state_item: OrgAgendaItem | None,
-        khal_item: OrgAgendaItem,
+        new_item: OrgAgendaItem,
     ) -> None:
-        """Log and raise for a sync state without defined behavior."""
-        logging.info(f"Error syncing item {item}")
-        logging.info(f"khal_item is: {khal_item}")
-        logging.info(f"state_item is: {state_item}")
-        raise NotImplementedError
+        """Replace `item` in the org agenda by `new_item`."""
+        self.context.org_agenda.items[self._org_index[id(item)]] = new_item
 
 
-def pull_khal_changes(
-    context: SyncContext,
-    processed_uids: set[str | None],
-) -> None:
-    """Add previously unseen khal events to the local agenda."""
-    for item in context.khal_agenda.items:
-        if item.uid in processed_uids:
-            continue
-        org_item = context.org_agenda.get_item(item.uid)
-        state_item = context.state_agenda.get_item(item.uid)
-
-        if org_item is None and not item.similar(state_item):
-            logging.info(
-                f"[khal {context.calendar} -> org] Pushing new event "
-                f"{item.uid}: {item.title}"
-            )
-            context.org_agenda.items.append(item)
+def get_changed_uids(
+    old: OrgAgendaFile,
+    new: OrgAgendaFile,
+) -> set[str | None]:
+    """
+    Return the UIDs of the items that were added, changed, or removed.
+
+    Items without a UID are new org items, so None is included when `new`
+    contains such an item.
+    """
+    old_items = {x.uid: x for x in old.items if x.uid is not None}
+    new_items = {x.uid: x for x in new.items if x.uid is not None}
+    changed: set[str | None] = set(old_items.keys() ^ new_items.keys())
+    changed.update(
+        uid
+        for uid in old_items.keys() & new_items.keys()
+        if old_items[uid] != new_items[uid]
+    )
+    if any(x.uid is None for x in new.items):
+        changed.add(None)
+    return changed
 
 
-def remove_deleted_items(
+def get_state_items(
     context: SyncContext,
-    processed_uids: set[str | None],
-    delete_command: SyncCommand,
-) -> None:
-    """Propagate events deleted from either sync target."""
-    for item in context.state_agenda.items:
-        if item.uid in processed_uids:
+    failed_uids: set[str],
+) -> list[OrgAgendaItem]:
+    """Return the org items, keeping the old state of failed khal writes."""
+    items: list[OrgAgendaItem] = []
+    for item in context.org_agenda.items:
+        if item.uid not in failed_uids:
+            items.append(item)
             continue
-
-        khal_item = context.khal_agenda.get_item(item.uid)
-        org_item = context.org_agenda.get_item(item.uid)
-        if item.similar(khal_item) and org_item is None:
-            logging.info(
-                f"[org -> khal {context.calendar}] Removing deleted event "
-                f"{item.uid}: {item.title}"
-            )
-            if not context.dry_run:
-                delete_command(context.calendar, org=str(item))
-        elif item == org_item and khal_item is None:
-            logging.info(
-                f"[khal {context.calendar} -> org] Removing deleted event "
-                f"{item.uid}: {item.title}"
-            )
-            context.org_agenda.items.remove(item)
+        state_item = context.state_agenda.get_item(item.uid)
+        if state_item is not None:
+            items.append(state_item)
+    return items
 
 
 def write_sync_files(
     org_file: Path,
-    state_file: Path,
+    state_file: Path | ShardedState,
     org_agenda: OrgAgendaFile,
     khalorg_format: str,
     filetags: list[str],
+    state_items: list[OrgAgendaItem] | None = None,
 ) -> None:
     """Persist the synchronized agenda and its state snapshot."""
-    state_file.parent.mkdir(parents=True, exist_ok=True)
     if filetags:
-        content = f"#+FILETAGS: :{':'.join(filetags)}:\n"
+        header = f"#+FILETAGS: :{':'.join(filetags)}:\n"
     else:
-        content = ""
-    content += format(org_agenda, khalorg_format)
+        header = ""
+    content = header + format(org_agenda, khalorg_format)
     org_file.write_text(content)
-    state_file.write_text(content)
+    if isinstance(state_file, ShardedState):
+        state_file.write(
+            org_agenda.items if state_items is None else state_items,
+            khalorg_format,
+        )
+        return
+
+    state_file.parent.mkdir(parents=True, exist_ok=True)
+    if state_items is None:
+        state_file.write_text(content)
+    else:
+        state_file.write_text(
+            header + "\n".join(format(x, khalorg_format) for x in state_items)
+        )
@@ -0,0 +1,296 @@
+"""Detect changes of an org file and the vdir of a khal calendar."""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import time
+from pathlib import Path
+
+IN_MODIFY: int = 0x002
+IN_CLOSE_WRITE: int = 0x008
+IN_MOVED_FROM: int = 0x040
+IN_MOVED_TO: int = 0x080
+IN_CREATE: int = 0x100
+IN_DELETE: int = 0x200
+IN_MASK: int = (
+    IN_MODIFY
+    | IN_CLOSE_WRITE
+    | IN_MOVED_FROM
+    | IN_MOVED_TO
+    | IN_CREATE
+    | IN_DELETE
+)
+
+Signature = tuple[int, int] | None
+
+
+def get_file_signature(path: Path) -> Signature:
+    """
+    Returns the modification time and size of the file at `path`.
+
+    Args:
+    ----
+        path: path to a file
+
+    Returns:
+    -------
+        the signature or None if the file does not exist
+
+    """
+    try:
+        stat: os.stat_result = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def get_dir_signature(path: Path, suffix: str = ".ics") -> dict[str, Signature]:
+    """
+    Returns the signatures of the files in the directory `path` that end with
+    `suffix`.
+
+    Args:
+    ----
+        path: path to a directory, e.g., a vdir
+        suffix: file extension of the files that are included
+
+    Returns:
+    -------
+        the signatures, using the file names as key.
+
+    """
+    signatures: dict[str, Signature] = {}
+    try:
+        entries = os.scandir(path)
+    except FileNotFoundError:
+        return signatures
+
+    with entries:
+        for entry in entries:
+            if entry.name.endswith(suffix):
+                stat: os.stat_result = entry.stat()
+                signatures[entry.name] = (stat.st_mtime_ns, stat.st_size)
+    return signatures
+
+
+class PollingWatcher:
+    """
+    Wakes up every `interval` seconds. It is used when inotify is not
+    available.
+
+    Attributes
+    ----------
+        paths: the watched directories
+        interval: the polling interval in seconds
+    """
+
+    def __init__(self, paths: list[Path], interval: float = 5.0):
+        """
+        Init.
+
+        Args:
+        ----
+            paths: the directories to watch
+            interval: the polling interval in seconds
+        """
+        self.paths: list[Path] = paths
+        self.interval: float = interval
+
+    def wait(self, timeout: float | None = None) -> None:
+        """
+        Blocks until something may have changed, or until `timeout` seconds
+        have passed.
+
+        Args:
+        ----
+            timeout: maximum number of seconds to wait
+        """
+        interval: float = self.interval
+        time.sleep(interval if timeout is None else min(timeout, interval))
+
+    def close(self) -> None:
+        """Releases the resources of the watcher."""
+
+    def __enter__(self) -> "PollingWatcher":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
+class InotifyWatcher(PollingWatcher):
+    """Wakes up when a file in one of the watched directories changes."""
+
+    def __init__(self, paths: list[Path], interval: float = 5.0):
+        """
+        Init.
+
+        Directories are watched instead of files, as many editors replace a
+        file when saving it, which removes the inotify watch of that file.
+
+        Args:
+        ----
+            paths: the directories to watch
+            interval: unused, but kept for compatibility with PollingWatcher
+
+        Raises:
+        ------
+            OSError: when inotify is not available.
+        """
+        super().__init__(paths, interval)
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd: int = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        for path in paths:
+            if libc.inotify_add_watch(self._fd, os.fsencode(path), IN_MASK) < 0:
+                errno: int = ctypes.get_errno()
+                os.close(self._fd)
+                raise OSError(errno, f"Cannot watch {path}")
+
+    def wait(self, timeout: float | None = None) -> None:
+        """
+        Blocks until an inotify event is received, or until `timeout`
+        seconds have passed. All pending events are consumed.
+
+        Args:
+        ----
+            timeout: maximum number of seconds to wait
+        """
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        while ready:
+            try:
+                os.read(self._fd, 4096)
+            except BlockingIOError:
+                break
+
+    def close(self) -> None:
+        """Closes the inotify file descriptor."""
+        os.close(self._fd)
+
+
+def get_watcher(paths: list[Path], interval: float = 5.0) -> PollingWatcher:
+    """
+    Returns an InotifyWatcher, or a PollingWatcher if inotify is not
+    available.
+
+    Args:
+    ----
+        paths: the directories to watch
+        interval: the polling interval in seconds
+
+    Returns:
+    -------
+        a watcher
+
+    """
+    try:
+        return InotifyWatcher(paths, interval)
+    except (AttributeError, OSError) as error:
+        logging.info(f"Inotify is not available, using polling: {error}")
+        return PollingWatcher(paths, interval)
+
+
+class ChangeMonitor:
+    """
+    Monitors an org file and the vdir of a khal calendar for changes.
+
+    The monitor compares the signatures of the files with the ones that were
+    recorded by the last call to ChangeMonitor.reset. The watcher is only used
+    to avoid comparing the signatures when nothing happened.
+
+    Attributes
+    ----------
+        org_file: path to the org file
+        vdir: path to the vdir of the khal calendar
+        debounce: number of seconds without changes that is waited for
+    """
+
+    def __init__(
+        self,
+        org_file: Path,
+        vdir: Path,
+        debounce: float = 1.0,
+        interval: float = 5.0,
+    ):
+        """
+        Init.
+
+        Args:
+        ----
+            org_file: path to the org file
+            vdir: path to the vdir of the khal calendar
+            debounce: number of seconds without changes that is waited for
+            interval: the polling interval, if inotify is not available
+        """
+        self.org_file: Path = org_file
+        self.vdir: Path = vdir
+        self.debounce: float = debounce
+        self._watcher: PollingWatcher = get_watcher(
+            [org_file.parent, vdir], interval
+        )
+        self._org_signature: Signature
+        self._vdir_signature: dict[str, Signature]
+        self.reset()
+
+    def reset(self) -> None:
+        """Records the current signatures of the org file and the vdir."""
+        self._org_signature = get_file_signature(self.org_file)
+        self._vdir_signature = get_dir_signature(self.vdir)
+
+    def changes(self) -> tuple[bool, bool]:
+        """
+        Whether the org file and the vdir changed since the last reset.
+
+        Returns
+        -------
+            True for the org file and the vdir, if they changed.
+
+        """
+        return (
+            get_file_signature(self.org_file) != self._org_signature,
+            get_dir_signature(self.vdir) != self._vdir_signature,
+        )
+
+    def wait(self) -> tuple[bool, bool]:
+        """
+        Blocks until the org file or the vdir changed, and no new changes are
+        detected for ChangeMonitor.debounce seconds. Afterwards, the monitor
+        is reset.
+
+        Returns
+        -------
+            see ChangeMonitor.changes
+
+        """
+        while not any(self.changes()):
+            self._watcher.wait()
+
+        signature = self._signature()
+        while True:
+            time.sleep(self.debounce)
+            self._watcher.wait(0)  # consume the events of the debounced changes
+            latest = self._signature()
+            if latest == signature:
+                break
+            signature = latest
+
+        changes: tuple[bool, bool] = self.changes()
+        self.reset()
+        return changes
+
+    def _signature(self) -> tuple[Signature, dict[str, Signature]]:
+        return get_file_signature(self.org_file), get_dir_signature(self.vdir)
+
+    def close(self) -> None:
+        """Stops watching the files."""
+        self._watcher.close()
+
+    def __enter__(self) -> "ChangeMonitor":
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
@@ -451,3 +451,30 @@ def get_module_path(module: ModuleType) -> str:
 
     """
     return dirname(getfile(module))
+
+
+def count_calls(monkeypatch, cls: type, name: str) -> list[tuple]:
+    """
+    Replaces the method `name` of `cls` by a wrapper that records the
+    arguments of each call, except for `self`, before calling the method.
+
+    Args:
+    ----
+        monkeypatch: build-in pytest fixture for patching.
+        cls: the class
+        name: the name of the method
+
+    Returns
+    -------
+        the recorded arguments, to which each call is appended.
+
+    """
+    calls: list[tuple] = []
+    method: Callable = getattr(cls, name)
+
+    def wrapper(self, *args, **kwargs):
+        calls.append(args)
+        return method(self, *args, **kwargs)
+
+    monkeypatch.setattr(cls, name, wrapper)
+    return calls
@@ -0,0 +1,32 @@
+import os
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from khalorg.cache import ListCache, get_cache_key
+
+
+class TestListCache(TestCase):
+    def test_get(self):
+        """A stored entry is returned, and a missing entry is None."""
+        with TemporaryDirectory() as directory:
+            cache: ListCache = ListCache(Path(directory) / "cache")
+            key: str = get_cache_key("one", "today", "1d")
+            self.assertIsNone(cache.get(key))
+            cache.put(key, "* event")
+            self.assertEqual(cache.get(key), "* event")
+            self.assertNotEqual(key, get_cache_key("one", "today", "2d"))
+
+    def test_evict(self):
+        """The least recently used entries are evicted."""
+        with TemporaryDirectory() as directory:
+            cache: ListCache = ListCache(Path(directory), size=2)
+            for index, key in enumerate(("a", "b")):
+                cache.put(key, key)
+                os.utime(Path(directory) / f"{key}.txt", ns=(index, index))
+
+            self.assertEqual(cache.get("a"), "a")
+            cache.put("c", "c")
+            self.assertIsNone(cache.get("b"))
+            self.assertEqual(cache.get("a"), "a")
+            self.assertEqual(cache.get("c"), "c")
@@ -38,7 +38,9 @@ class TestNew(TestCase):
         ]
         actual = khalorg_tester(args)
         expected: str = (
-            "'loglevel': 'CRITICAL', 'logfile': 'foo', 'calendar': 'calendar'"
+            "'loglevel': 'CRITICAL', 'logfile': 'foo', 'memprofile': False, "
+            "'calendar': 'calendar', "
+            "'output': 'text'"
         )
         self.assertTrue(expected in actual)
 
@@ -62,8 +64,10 @@ class TestEdit(TestCase):
         expected: str = (
             "'loglevel': 'CRITICAL', "
             "'logfile': 'foo', "
+            "'memprofile': False, "
             "'edit_dates': True, "
-            "'calendar': 'calendar'"
+            "'calendar': 'calendar', "
+            "'output': 'text'"
         )
         self.assertTrue(expected in actual)
 
@@ -84,8 +88,10 @@ class TestEdit(TestCase):
         expected: str = (
             "'loglevel': 'CRITICAL', "
             "'logfile': 'foo', "
+            "'memprofile': False, "
             "'edit_dates': False, "
-            "'calendar': 'calendar'"
+            "'calendar': 'calendar', "
+            "'output': 'text'"
         )
         self.assertTrue(expected in actual)
 
@@ -113,10 +119,13 @@ class TestList(TestCase):
         expected: str = (
             "'loglevel': 'CRITICAL', "
             "'logfile': 'foo', "
+            "'memprofile': False, "
             f"'format': {repr(default_format)}, "
             "'calendar': 'calendar', "
             "'start': 'today', "
-            "'stop': '2d'"
+            "'stop': '2d', "
+            "'output': 'text', "
+            "'cache': False"
         )
         self.assertTrue(expected in actual, msg=actual)
 
@@ -134,10 +143,13 @@ class TestList(TestCase):
         expected: str = (
             "'loglevel': 'INFO', "
             f"'logfile': '{paths.log_file}', "
+            "'memprofile': False, "
             f"'format': {repr(default_format)}, "
             "'calendar': 'calendar', "
             "'start': 'today', "
-            "'stop': '1d'"
+            "'stop': '1d', "
+            "'output': 'text', "
+            "'cache': False"
         )
         self.assertTrue(expected in actual, msg=actual)
 
@@ -158,11 +170,29 @@ class TestDelete(TestCase):
         ]
         actual = khalorg_tester(args)
         expected: str = (
-            "'loglevel': 'CRITICAL', 'logfile': 'foo', 'calendar': 'calendar'"
+            "'loglevel': 'CRITICAL', 'logfile': 'foo', 'memprofile': False, "
+            "'calendar': 'calendar', "
+            "'output': 'text'"
         )
         self.assertTrue(expected in actual)
 
 
+class TestImport(TestCase):
+    def test(self):
+        """
+        When feeding a set of command line args, an expected set of
+        function arguments for khalorg.cli.import_command is expected.
+        """
+        args: list = ["import", "calendar", "a.ics", "dir"]
+        actual = khalorg_tester(args)
+        expected: str = (
+            "'calendar': 'calendar', "
+            "'paths': [PosixPath('a.ics'), PosixPath('dir')], "
+            "'output': 'text'"
+        )
+        self.assertTrue(expected in actual, msg=actual)
+
+
 class TestSync(TestCase):
     def test(self):
         """
@@ -185,10 +215,13 @@ class TestSync(TestCase):
             "--edit-dates",
             "--state-dir",
             "new_state_dir",
+            "--state-layout",
+            "sharded",
             "--conflict-resolution",
             "org",
             "--delete-on-sync",
             "--dry-run",
+            "--force",
             "--filetags",
             "one",
             "--filetags",
@@ -200,15 +233,18 @@ class TestSync(TestCase):
         expected: str = (
             "'loglevel': 'CRITICAL', "
             "'logfile': 'foo', "
+            "'memprofile': False, "
             f"'format': {repr(default_format)}, "
             "'start': 'today', "
             "'stop': '2d', "
             "'edit_dates': True, "
             "'state_dir': PosixPath('new_state_dir'), "
+            "'state_layout': 'sharded', "
             "'conflict_resolution': 'org', "
             "'delete_on_sync': True, "
             "'filetags': ['one', 'two'], "
             "'dry_run': True, "
+            "'force': True, "
             "'calendar': 'calendar', "
             "'org_file': PosixPath('file.org'), "
         )
@@ -229,15 +265,65 @@ class TestSync(TestCase):
         expected: str = (
             "'loglevel': 'INFO', "
             f"'logfile': '{paths.log_file}', "
+            "'memprofile': False, "
             f"'format': {repr(default_format)}, "
             "'start': 'today', "
             "'stop': '90d', "
             "'edit_dates': False, "
             f"'state_dir': PosixPath('{paths.state_dir}'), "
+            "'state_layout': 'file', "
             "'conflict_resolution': 'khal', "
             "'delete_on_sync': False, "
             "'filetags': None, "
             "'dry_run': False, "
+            "'force': False, "
+            "'calendar': 'calendar', "
+            "'org_file': PosixPath('file.org'), "
+        )
+        self.assertTrue(expected in actual, msg=actual)
+
+
+class TestSyncRoutes(TestCase):
+    def test(self):
+        """
+        When feeding a set of command line args, an expected set of
+        function arguments for khalorg.cli.sync_routes is expected.
+        """
+        args: list = ["sync-routes", "--delete-on-sync", "routes.conf"]
+        actual = khalorg_tester(args)
+        expected: str = (
+            "'start': 'today', "
+            "'stop': '90d', "
+            "'edit_dates': False, "
+            f"'state_dir': PosixPath('{paths.state_dir}'), "
+            "'conflict_resolution': 'khal', "
+            "'delete_on_sync': True, "
+            "'dry_run': False, "
+            "'config': PosixPath('routes.conf')"
+        )
+        self.assertTrue(expected in actual, msg=actual)
+
+
+class TestWatch(TestCase):
+    def test(self):
+        """
+        When feeding a set of command line args, an expected set of
+        function arguments for khalorg.cli.watch is expected.
+        """
+        args: list = [
+            "watch",
+            "--debounce",
+            "0.5",
+            "--interval",
+            "2",
+            "calendar",
+            "file.org",
+        ]
+        actual = khalorg_tester(args)
+        expected: str = (
+            "'dry_run': False, "
+            "'debounce': 0.5, "
+            "'interval': 2.0, "
             "'calendar': 'calendar', "
             "'org_file': PosixPath('file.org'), "
         )
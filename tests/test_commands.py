@@ -1,7 +1,10 @@
 from datetime import date, datetime, timedelta
 from pathlib import Path
 import copy
+import gzip
+import json
 import logging
+import threading
 from datetime import date, datetime, timedelta
 from os.path import join
 from tests import static
@@ -9,6 +12,7 @@ from tests.helpers import (
     assert_event_created,
     assert_event_deleted,
     assert_event_edited,
+    count_calls,
     get_module_path,
     get_org_item,
     get_start_end,
@@ -20,17 +24,24 @@ import pytest
 from khal.cli import main_khal
 from orgparse.date import OrgDate
 
+from khalorg import commands, memprofile, paths
 from khalorg.commands import (
     _delete,
     _edit,
     _new,
     delete,
+    edit,
+    import_command,
     list_command,
     new,
     sync,
+    sync_routes,
+    watch,
 )
 from khalorg.khal.calendar import Calendar
+from khalorg.khal.checker import EventChecker
 from khalorg.org.agenda_items import OrgAgendaItem
+from khalorg.watcher import ChangeMonitor
 from tests import static
 from tests.helpers import (
     assert_event_created,
@@ -56,7 +67,8 @@ def runner(get_cli_runner, monkeypatch) -> Generator:
     Returns a test runner that is created by CliRunner.
 
     The Calendar.new_item is monkeypatched to enable using the temporarily
-    created calendar.
+    created calendar. As CliRunner replaces sys.stdout, the invocations are
+    serialized, because _list can call `khal list` from several threads.
 
     Args:
     ----
@@ -68,15 +80,18 @@ def runner(get_cli_runner, monkeypatch) -> Generator:
         test runner
     """
     runner = get_cli_runner()
+    lock = threading.Lock()
 
     def khal_new(_, args: list) -> str:
-        result = runner.invoke(main_khal, ["new"] + args)
+        with lock:
+            result = runner.invoke(main_khal, ["new"] + args)
         if result.exit_code:
             raise result.exception
         return result.output
 
     def khal_list(_, args: list):
-        result = runner.invoke(main_khal, ["list", "-df", ""] + args)
+        with lock:
+            result = runner.invoke(main_khal, ["list", "-df", ""] + args)
         if result.exit_code:
             raise result.exception
         return result.output
@@ -146,6 +161,60 @@ def test_list_allday_recurring(runner):
     _list_test(runner, expected)
 
 
+def test_list_jsonl(runner):
+    """Each listed item is streamed as a JSON object."""
+    expected: OrgAgendaItem = get_org_item()
+    new("one", org=str(expected))
+
+    lines: list[str] = list(list_command("one", output="jsonl"))
+
+    assert len(lines) == 1
+    actual: dict = json.loads(lines[0])
+    assert actual["title"] == expected.title
+    assert actual["description"] == expected.description
+    assert actual["properties"]["LOCATION"] == expected.properties["LOCATION"]
+    assert actual["timestamps"][0]["start"] == (
+        expected.first_timestamp.start.isoformat()
+    )
+
+
+def test_list_cache(runner, monkeypatch, tmp_path: Path):
+    """The khal output is reused until the calendar changes."""
+    cache_dir: Path = tmp_path / "cache"
+    monkeypatch.setattr(paths, "list_cache_dir", str(cache_dir))
+    new("one", org=str(get_org_item()))
+    calls: list[tuple] = count_calls(monkeypatch, Calendar, "list_command")
+
+    expected: str = list_command("one", cache=True)
+    assert list_command("one", cache=True) == expected
+    assert len(calls) == 1
+    assert len(list(cache_dir.iterdir())) == 1
+
+    new("one", org=str(get_org_item(all_day=True)))
+    calls.clear()
+    assert list_command("one", cache=True) != expected
+    assert len(calls) == 1
+
+
+def test_list_in_chunks(runner, monkeypatch):
+    """
+    Listing a large range in chunks returns the same agenda as listing it at
+    once, also for events that span the boundary of a chunk.
+    """
+    spanning: OrgAgendaItem = get_org_item(all_day=True)
+    start: date = date.today() + timedelta(days=29)
+    spanning.timestamps = [OrgDate(start, start + timedelta(days=3))]
+    new("one", org=str(spanning))
+    new("one", org=str(get_org_item(repeater=("+", 1, "w"))))
+
+    assert len(Calendar("one").split_range("today", "90d")) > 1
+    chunked: str = list_command("one", start="today", stop="90d")
+
+    monkeypatch.setattr(Calendar, "split_range", lambda _, *x: [x])
+    assert chunked == list_command("one", start="today", stop="90d")
+    assert chunked.count("* ") == 2
+
+
 def test_edit(runner):
     """
     Test khalorg.commands._new and khalorg.commands._edit.
@@ -270,6 +339,58 @@ def test_edit_all_day_recurring_twice(runner):
     assert_event_edited(runner, "one", org_item, count=days)
 
 
+def test_new_many(runner):
+    """
+    All items of an org document are created, and a duplicate within the
+    document is skipped.
+    """
+    first: OrgAgendaItem = get_org_item()
+    second: OrgAgendaItem = get_org_item(delta=timedelta(hours=2))
+    second.title = "Second"
+    org: str = "\n".join(str(x) for x in (first, second, first))
+
+    results: list[dict] = [
+        json.loads(x) for x in new("one", org=org, output="jsonl").splitlines()
+    ]
+
+    assert [x["status"] for x in results] == ["created", "created", "skipped"]
+    assert results[2]["errors"] == [EventChecker.MESSAGE_DUPLICATE]
+    for item, result in zip((first, second), results):
+        events = assert_event_created("one", item)
+        assert len(events) == 1
+        assert result["uid"] == events[0].uid
+        assert events[0].location == item.properties["LOCATION"]
+
+
+def test_new_nested_heading(runner):
+    """A sub-heading is part of its top-level heading, not a new item."""
+    first: OrgAgendaItem = get_org_item()
+    nested: OrgAgendaItem = get_org_item(delta=timedelta(hours=2))
+    nested.title = "Nested"
+    org: str = str(first) + "\n*" + str(nested)
+
+    results: list[dict] = [
+        json.loads(x) for x in new("one", org=org, output="jsonl").splitlines()
+    ]
+
+    assert [x["status"] for x in results] == ["created"]
+    assert len(assert_event_created("one", first)) == 1
+    assert list(Calendar("one").collection.search("Nested")) == []
+
+
+def test_new_not_found(runner, monkeypatch):
+    """An item whose event is not found after `khal new` has failed."""
+    monkeypatch.setattr(commands, "_edit_events", lambda *_, **__: [])
+    results: list[dict] = [
+        json.loads(x)
+        for x in new("one", org=str(get_org_item()), output="jsonl").split("\n")
+    ]
+
+    assert [x["status"] for x in results] == ["failed"]
+    assert results[0]["uid"] is None
+    assert results[0]["errors"] == [Calendar.MESSAGE_EDIT.format(0)]
+
+
 def test_delete(runner):
     """After creating an event, the `delete` command should delete it."""
     expected: OrgAgendaItem = get_org_item()
@@ -280,6 +401,208 @@ def test_delete(runner):
     assert_event_deleted("one", expected)
 
 
+def test_edit_many(runner):
+    """All items are edited, and an item without a UID is skipped."""
+    items: list[OrgAgendaItem] = [
+        copy.deepcopy(get_org_item()),
+        copy.deepcopy(get_org_item(delta=timedelta(hours=2))),
+    ]
+    items[1].title = "Second"
+    new("one", org="\n".join(str(x) for x in items))
+    for item in items:
+        events = assert_event_created("one", item)
+        item.properties["UID"] = str(events[0].uid)
+        item.properties["LOCATION"] = "Edited"
+    missing: OrgAgendaItem = copy.deepcopy(get_org_item())
+    missing.properties["UID"] = ""
+
+    org: str = "\n".join(str(x) for x in items + [missing])
+    results: list[dict] = [
+        json.loads(x)
+        for x in edit("one", org=org, output="jsonl").splitlines()
+    ]
+
+    assert [x["status"] for x in results] == ["edited", "edited", "skipped"]
+    assert results[2]["errors"] == [EventChecker.MESSAGE_UID]
+    for item in items:
+        assert_event_edited(runner, "one", item)
+
+
+def test_edit_duplicate_uid(runner):
+    """An item whose UID was already edited in the batch is skipped."""
+    item: OrgAgendaItem = copy.deepcopy(get_org_item())
+    new("one", org=str(item))
+    item.properties["UID"] = str(assert_event_created("one", item)[0].uid)
+    item.properties["LOCATION"] = "Edited"
+    duplicate: OrgAgendaItem = copy.deepcopy(item)
+    duplicate.properties["LOCATION"] = "Duplicate"
+
+    org: str = "\n".join(str(x) for x in (item, duplicate))
+    results: list[dict] = [
+        json.loads(x)
+        for x in edit("one", org=org, output="jsonl").splitlines()
+    ]
+
+    assert [x["status"] for x in results] == ["edited", "skipped"]
+    assert results[1]["errors"] == [EventChecker.MESSAGE_DUPLICATE_UID]
+    assert_event_edited(runner, "one", item)
+
+
+def test_delete_many(runner):
+    """All items are deleted, and an unknown UID is reported as failed."""
+    items: list[OrgAgendaItem] = [
+        copy.deepcopy(get_org_item()),
+        copy.deepcopy(get_org_item(delta=timedelta(hours=2))),
+    ]
+    items[1].title = "Second"
+    new("one", org="\n".join(str(x) for x in items))
+    for item in items:
+        events = assert_event_created("one", item)
+        item.properties["UID"] = str(events[0].uid)
+    unknown: OrgAgendaItem = copy.deepcopy(get_org_item())
+    unknown.properties["UID"] = "unknown"
+
+    org: str = "\n".join(str(x) for x in items + [unknown])
+    results: list[dict] = [
+        json.loads(x)
+        for x in delete("one", org=org, output="jsonl").splitlines()
+    ]
+
+    assert [x["status"] for x in results] == ["deleted", "deleted", "failed"]
+    for item in items:
+        assert_event_deleted("one", item)
+
+
+ICS: str = """BEGIN:VCALENDAR
+VERSION:2.0
+PRODID:-//khalorg//test//EN
+BEGIN:VEVENT
+UID:{uid}
+SUMMARY:{summary}
+DTSTART:{start:%Y%m%dT%H%M%S}
+DTEND:{end:%Y%m%dT%H%M%S}
+{rrule}END:VEVENT
+END:VCALENDAR
+"""
+
+
+def test_import(runner, tmp_path):
+    """
+    The events of .ics files and directories are imported with their UID,
+    and an event with an unsupported RRULE is skipped.
+    """
+    start: datetime = datetime.now().replace(microsecond=0) + timedelta(days=1)
+    end: datetime = start + timedelta(hours=1)
+    directory: Path = tmp_path / "ics"
+    directory.mkdir()
+    files: dict[Path, tuple[str, str]] = {
+        tmp_path / "first.ics": ("first", ""),
+        directory / "second.ics": ("second", "RRULE:FREQ=WEEKLY\n"),
+        directory / "third.ics": ("third", "RRULE:FREQ=MONTHLY;BYDAY=1MO\n"),
+    }
+    for path, (uid, rrule) in files.items():
+        ics: str = ICS.format(
+            uid=uid, summary=uid, start=start, end=end, rrule=rrule
+        )
+        path.write_text(ics)
+
+    output: str = import_command(
+        "one", [tmp_path / "first.ics", directory], output="jsonl"
+    )
+    results: list[dict] = [json.loads(x) for x in output.splitlines()]
+
+    assert [x["uid"] for x in results] == ["first", "second", "third"]
+    assert [x["status"] for x in results] == ["imported", "imported", "skipped"]
+    calendar: Calendar = Calendar("one")
+    assert calendar.get_events("first")[0].summary == "first"
+    assert calendar.get_events("second")[0].recurring
+    assert calendar.get_events("third") == []
+
+    import_command("one", [tmp_path / "first.ics"])
+    assert len(calendar.get_events("first")) == 1
+
+
+def test_import_broken_event(runner, tmp_path):
+    """
+    An event that cannot be parsed fails, while the other events of its
+    .ics file are imported.
+    """
+    start: datetime = datetime.now().replace(microsecond=0) + timedelta(days=1)
+    end: str = f"DTEND:{start + timedelta(hours=1):%Y%m%dT%H%M%S}"
+    vevents: str = "".join(
+        f"BEGIN:VEVENT\nUID:{uid}\nSUMMARY:{uid}\n"
+        f"DTSTART:{start:%Y%m%dT%H%M%S}\n{duration}\nEND:VEVENT\n"
+        for uid, duration in (
+            ("first", end),
+            ("broken", "DURATION:broken"),
+            ("second", end),
+        )
+    )
+    path: Path = tmp_path / "events.ics"
+    path.write_text(f"BEGIN:VCALENDAR\nVERSION:2.0\n{vevents}END:VCALENDAR\n")
+
+    output: str = import_command("one", [path], output="jsonl")
+    results: list[dict] = [json.loads(x) for x in output.splitlines()]
+
+    statuses: dict = {x["uid"]: x["status"] for x in results}
+    assert statuses == {
+        "first": "imported",
+        "second": "imported",
+        None: "failed",
+    }
+    assert [x for x in results if x["uid"] is None][0]["errors"]
+    calendar: Calendar = Calendar("one")
+    assert calendar.get_events("second")[0].summary == "second"
+    assert calendar.get_events("broken") == []
+
+
+def _get_profiled_phases(
+    path: Path, command: Callable, *args, **kwargs
+) -> list[str]:
+    memprofile.start()
+    try:
+        command(*args, **kwargs)
+    finally:
+        memprofile.stop("khalorg test", path)
+    return [
+        x[3:].split(":")[0]
+        for x in path.read_text().splitlines()
+        if x.startswith("## ")
+    ]
+
+
+def test_memprofile_phases(runner, tmp_path):
+    """
+    The phases of new, edit, delete, and import are profiled. When a sync
+    runs these commands, their phases are part of the sync phase.
+    """
+    path: Path = tmp_path / "khalorg.memprofile"
+    item: OrgAgendaItem = get_org_item()
+    phases: list[str] = _get_profiled_phases(path, new, "one", org=str(item))
+    assert phases == ["load org", "check", "new", "write"]
+
+    item.properties["UID"] = str(assert_event_created("one", item)[0].uid)
+    phases = _get_profiled_phases(path, edit, "one", org=str(item))
+    assert phases == ["load org", "check", "find events", "edit", "write"]
+    phases = _get_profiled_phases(path, delete, "one", org=str(item))
+    assert phases == ["load org", "check", "find events", "delete"]
+
+    start: datetime = datetime.now().replace(microsecond=0) + timedelta(days=1)
+    ics: Path = tmp_path / "event.ics"
+    ics.write_text(
+        ICS.format(uid="1", summary="1", start=start, end=start, rrule="")
+    )
+    phases = _get_profiled_phases(path, import_command, "one", [ics])
+    assert phases == ["import", "write"]
+
+    org_file: Path = tmp_path / "file.org"
+    org_file.write_text(f"* new event\n  {OrgDate(start)}\n")
+    phases = _get_profiled_phases(path, sync, "one", org_file, tmp_path)
+    assert "sync" in phases
+    assert "new" not in phases
+    assert "UID" in org_file.read_text()
+
+
 def _sync_test_local(org_file: Path, expected: OrgAgendaItem) -> None:
     assert org_file.exists()
     actual: OrgAgendaItem = OrgAgendaItem()
@@ -350,6 +673,80 @@ def test_sync_pushes_new_events_with_start_and_end(runner, tmp_path: Path):
     _sync_test_remote(expected)
 
 
+def test_sync_shares_one_calendar(runner, tmp_path: Path, monkeypatch):
+    """A sync that pushes a new event creates only one Calendar."""
+    org_file = tmp_path / "file.org"
+    state_dir = tmp_path / "state"
+    start, end = get_start_end()
+    org_file.write_text(f"* new event\n  {OrgDate(start, end)}\n")
+
+    names: list[tuple] = count_calls(monkeypatch, Calendar, "__init__")
+    sync("one", org_file, state_dir)
+
+    assert names == [("one",)]
+    assert "UID" in org_file.read_text()
+
+
+def test_sync_skips_unchanged(runner, tmp_path: Path, monkeypatch):
+    """A sync is skipped if nothing changed since a sync that did nothing."""
+    org_file = tmp_path / "file.org"
+    state_dir = tmp_path / "state"
+    new("one", org=str(get_org_item()))
+    sync("one", org_file, state_dir)
+    assert not (state_dir / "one.fingerprint").exists()
+    sync("one", org_file, state_dir)
+    assert (state_dir / "one.fingerprint").exists()
+
+    calls: list[tuple] = count_calls(monkeypatch, Calendar, "list_command")
+    sync("one", org_file, state_dir)
+    assert calls == []
+
+    sync("one", org_file, state_dir, force=True)
+    assert calls
+    calls.clear()
+
+    org_file.write_text(org_file.read_text().replace("summary", "edited"))
+    sync("one", org_file, state_dir)
+    assert calls
+    assert not (state_dir / "one.fingerprint").exists()
+
+
+def test_sync_routes(runner, tmp_path: Path, monkeypatch):
+    """Calendars are routed to org files by category and CALENDAR."""
+    project_file = tmp_path / "project.org"
+    other_file = tmp_path / "other.org"
+    config = tmp_path / "routes.conf"
+    config.write_text(
+        f"[project]\ncalendar = one\norg_file = {project_file}\n"
+        "filetags = category1,\n"
+        f"[one]\ncalendar = one\norg_file = {other_file}\n"
+        f"[two]\ncalendar = two\norg_file = {other_file}\n"
+    )
+    new("one", org=str(get_org_item()))
+    start, end = get_start_end()
+    other_file.write_text(
+        f"* meeting\n  {OrgDate(start, end)}\n"
+        "  :PROPERTIES:\n  :CALENDAR: two\n  :END:\n"
+    )
+
+    names: list[tuple] = count_calls(monkeypatch, Calendar, "__init__")
+    sync_routes(config, tmp_path / "state")
+    assert names == [("one",), ("two",)]
+
+    project: str = project_file.read_text()
+    assert project.startswith("#+FILETAGS: :category1:")
+    assert "* summary" in project
+    other: str = other_file.read_text()
+    assert "* summary" not in other
+    assert ":CALENDAR: two" in other
+    assert ":UID:" in other
+    assert len(Calendar("two").get_events_no_uid("meeting", start, end)) == 1
+
+    sync_routes(config, tmp_path / "state")
+    assert project_file.read_text() == project
+    assert other_file.read_text() == other
+
+
 def test_sync_pushes_new_events_with_only_start(runner, tmp_path: Path):
     """Sync will push org new events to khal."""
     org_file = tmp_path / "file.org"
@@ -442,6 +839,34 @@ def test_sync_pushes_local_edits(runner, tmp_path: Path, dry_run: bool):
     _sync_test_remote(initial if dry_run else expected)
 
 
+def test_sync_sharded_state(runner, tmp_path: Path):
+    """The sharded state is compressed, and only changed shards are written."""
+    org_file = tmp_path / "file.org"
+    state_dir = tmp_path / "state"
+    initial: OrgAgendaItem = get_org_item()
+    new("one", org=str(initial))
+    sync("one", org_file, state_dir, state_layout="sharded")
+
+    shards: list[Path] = list((state_dir / "one").glob("*.org.gz"))
+    assert len(shards) == 1
+    assert not (state_dir / "one.org").exists()
+    assert "summary" in gzip.decompress(shards[0].read_bytes()).decode()
+
+    mtime: int = shards[0].stat().st_mtime_ns
+    sync("one", org_file, state_dir, state_layout="sharded")
+    assert shards[0].stat().st_mtime_ns == mtime
+
+    expected = copy.deepcopy(initial)
+    expected.title = "edited summary"
+    content = org_file.read_text().replace("summary", expected.title)
+    org_file.write_text(content)
+    sync("one", org_file, state_dir, state_layout="sharded")
+
+    _sync_test_local(org_file, expected)
+    _sync_test_remote(expected)
+    assert "edited" in gzip.decompress(shards[0].read_bytes()).decode()
+
+
 def test_sync_pushes_removed_local_properties(runner, tmp_path: Path):
     """Removing an org property must clear its value in khal."""
     org_file = tmp_path / "file.org"
@@ -758,3 +1183,67 @@ def test_sync_adds_filetags(runner, tmp_path: Path):
     sync("one", org_file, state_dir, filetags=["one", "two"])
 
     assert "#+FILETAGS: :one:two:" in org_file.read_text()
+
+
+def test_watch_syncs_changed_items(runner, tmp_path: Path, monkeypatch):
+    """After the org file changes, watch pushes the edited item to khal."""
+    org_file = tmp_path / "file.org"
+    state_dir = tmp_path / "state"
+    initial: OrgAgendaItem = get_org_item()
+    new("one", org=str(initial))
+    expected = copy.deepcopy(initial)
+    expected.title = "edited summary"
+
+    changes = iter([True])
+
+    def wait(monitor: ChangeMonitor) -> tuple[bool, bool]:
+        try:
+            next(changes)
+        except StopIteration:
+            raise KeyboardInterrupt
+        content = org_file.read_text().replace("summary", expected.title)
+        org_file.write_text(content)
+        return True, False
+
+    monkeypatch.setattr(ChangeMonitor, "wait", wait)
+    watch("one", org_file, state_dir)
+
+    _sync_test_local(org_file, expected)
+    _sync_test_remote(expected)
+
+
+def test_watch_keeps_edit_during_sync(runner, tmp_path: Path, monkeypatch):
+    """
+    An edit that is saved while syncing, after the org file was written, is
+    pushed to khal by the next sync.
+    """
+    org_file = tmp_path / "file.org"
+    state_dir = tmp_path / "state"
+    initial: OrgAgendaItem = get_org_item()
+    new("one", org=str(initial))
+    expected = copy.deepcopy(initial)
+    expected.title = "edited summary"
+
+    write_sync_files = commands.write_sync_files
+    edits = iter([expected.title])
+
+    def write_and_edit(org_file: Path, **kwargs) -> None:
+        write_sync_files(org_file=org_file, **kwargs)
+        for title in edits:
+            content = org_file.read_text().replace("summary", title)
+            org_file.write_text(content)
+
+    waits = iter([(False, False)])
+
+    def wait(monitor: ChangeMonitor) -> tuple[bool, bool]:
+        try:
+            return next(waits)
+        except StopIteration:
+            raise KeyboardInterrupt
+
+    monkeypatch.setattr(commands, "write_sync_files", write_and_edit)
+    monkeypatch.setattr(ChangeMonitor, "wait", wait)
+    watch("one", org_file, state_dir)
+
+    _sync_test_local(org_file, expected)
+    _sync_test_remote(expected)
@@ -1,9 +1,15 @@
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from unittest import TestCase
 
 import pytz
 
-from khalorg.khal.helpers import set_tzinfo
+from khalorg.khal.helpers import (
+    _localize,
+    filter_future,
+    is_future,
+    set_tzinfo,
+    set_tzinfos,
+)
 
 
 class TestAddTzinfo(TestCase):
@@ -25,3 +31,51 @@ class TestAddTzinfo(TestCase):
     def test_europe_berlin(self):
         """When trying to add a timezone to a date, nothing changes."""
         assert set_tzinfo(self.date, self.timezone) == self.date
+
+    def test_set_tzinfos(self):
+        """
+        All times are converted at once, using the DST offset of each time,
+        and a repeated time is looked up in the cache.
+        """
+        summer: datetime = datetime(2023, 7, 1, 12, 0)
+        _localize.cache_clear()
+        actual: list = set_tzinfos(
+            (self.time, summer, self.date, None, summer), self.timezone
+        )
+
+        assert actual[0].utcoffset() == timedelta(hours=1)
+        assert actual[1].utcoffset() == timedelta(hours=2)
+        assert actual[2:4] == [self.date, None]
+        assert actual[4] == actual[1]
+        assert _localize.cache_info().hits == 1
+
+
+class TestIsFuture(TestCase):
+    def setUp(self) -> None:
+        self.now: datetime = datetime(2023, 1, 1, 12, 0).astimezone()
+        self.timezone = pytz.timezone("Europe/Berlin")
+
+    def test_is_future(self):
+        """Dates, naive, and aware datetimes are compared with `now`."""
+        hour: timedelta = timedelta(hours=1)
+        naive: datetime = self.now.replace(tzinfo=None)
+        aware: datetime = self.now.astimezone(self.timezone)
+        assert is_future(naive + hour, self.now)
+        assert not is_future(naive - hour, self.now)
+        assert is_future(aware + hour, self.now)
+        assert not is_future(aware - hour, self.now)
+        assert is_future(self.now.date(), self.now)
+        assert not is_future(self.now.date() - timedelta(days=1), self.now)
+
+    def test_filter_future(self):
+        """Filtering a list gives the same result as `is_future`."""
+        times: list = [
+            self.now - timedelta(hours=1),
+            self.now.replace(tzinfo=None) + timedelta(hours=1),
+            self.now.date(),
+            self.now.date() - timedelta(days=1),
+        ]
+        expected: list = [x for x in times if is_future(x, self.now)]
+        actual: list = filter_future(times, lambda x: x, self.now)
+        assert actual == expected
+        assert len(actual) == 2
@@ -1,3 +1,5 @@
+import time
+from datetime import date, timedelta
 from typing import Callable
 from unittest import TestCase
 from unittest.mock import patch
@@ -5,8 +7,21 @@ from unittest.mock import patch
 import pytest
 from khal.controllers import CalendarCollection
 
-from khalorg.khal.calendar import get_calendar_collection
-from tests.helpers import get_test_config, khal_runner
+from khalorg.khal.args import EditArgs
+from khalorg.khal.calendar import (
+    Calendar,
+    CalendarProperties,
+    EventWriter,
+    get_calendar_collection,
+    get_changed_properties,
+)
+from tests.helpers import (
+    assert_event_created,
+    create_event,
+    get_org_item,
+    get_test_config,
+    khal_runner,
+)
 from tests.test_khal.helpers import Mixin
 
 
@@ -36,6 +51,193 @@ def test_get_calendar_collection_no_config(get_cli_runner):
     assert isinstance(collection, CalendarCollection)
 
 
+def test_event_writer(get_cli_runner):
+    """
+    Events submitted to an EventWriter are written to the vdir, and the khal
+    db is updated once they are flushed.
+    """
+    runner = get_cli_runner()
+    org_item = get_org_item()
+    create_event(runner, org_item)
+    event = assert_event_created("one", org_item)[0]
+
+    calendar: Calendar = Calendar("one")
+    writer: EventWriter = EventWriter(calendar)
+    event.update_summary("written")
+    writer.submit(event)
+    assert writer.close() == {}
+
+    assert Calendar("one").get_events(event.uid)[0].summary == "written"
+
+
+def test_event_writer_same_uid(get_cli_runner):
+    """The writes of one UID are done in order, so the last one is kept."""
+    runner = get_cli_runner()
+    org_item = get_org_item()
+    create_event(runner, org_item)
+    uid: str = str(assert_event_created("one", org_item)[0].uid)
+
+    calendar: Calendar = Calendar("one")
+    insert: Callable = calendar.insert
+
+    def slow_insert(event) -> None:
+        if event.summary == "first":
+            time.sleep(0.2)
+        insert(event)
+
+    writer: EventWriter = EventWriter(calendar)
+    with patch.object(calendar, "insert", side_effect=slow_insert):
+        for summary in ("first", "second"):
+            event = calendar.get_events(uid)[0]
+            event.update_summary(summary)
+            writer.submit(event, insert=True)
+        assert writer.close() == {}
+
+    assert Calendar("one").get_events(uid)[0].summary == "second"
+
+
+def test_event_writer_reports_errors(get_cli_runner):
+    """An event that cannot be written is reported by its UID."""
+    runner = get_cli_runner()
+    org_item = get_org_item()
+    create_event(runner, org_item)
+    event = assert_event_created("one", org_item)[0]
+    event.readonly = True
+
+    writer: EventWriter = EventWriter(Calendar("one"))
+    writer.submit(event)
+    errors: dict = writer.close()
+
+    assert list(errors) == [event.uid]
+
+
+def test_update_event_unchanged(get_cli_runner):
+    """
+    An event is only written if one of its properties changed, and only the
+    changed properties are reported.
+    """
+    runner = get_cli_runner()
+    org_item = get_org_item()
+    create_event(runner, org_item)
+    event = assert_event_created("one", org_item)[0]
+    org_item.properties["UID"] = str(event.uid)
+
+    args: EditArgs = EditArgs()
+    args.load_from_org(org_item)
+    props: CalendarProperties = CalendarProperties(**args)
+    calendar: Calendar = Calendar("one")
+    calendar.update_event(event, props, edit_dates=True)
+
+    event = Calendar("one").get_events(event.uid)[0]
+    sequence: str = event.raw.split("SEQUENCE:")[1].split()[0]
+    assert get_changed_properties(event, props, edit_dates=True) == []
+    with patch.object(calendar, "write") as write:
+        calendar.update_event(event, props, edit_dates=True)
+        writer: EventWriter = EventWriter(calendar)
+        calendar.update_event(event, props, True, writer)
+        writer.close()
+    write.assert_not_called()
+    assert f"SEQUENCE:{sequence}" in event.raw
+
+    props["location"] = "Elsewhere"
+    assert get_changed_properties(event, props, True) == ["location"]
+    calendar.update_event(event, props, edit_dates=True)
+    actual = Calendar("one").get_events(event.uid)[0]
+    assert actual.location == "Elsewhere"
+    assert f"SEQUENCE:{int(sequence) + 1}" in actual.raw
+
+
+def test_get_events_by_day(get_cli_runner):
+    """An event is indexed on each day on which it occurs."""
+    runner = get_cli_runner()
+    org_item = get_org_item(delta=timedelta(days=1, hours=1))
+    create_event(runner, org_item)
+    first: date = org_item.first_timestamp.start.date()
+    days: list[date] = [first + timedelta(days=x) for x in range(3)]
+
+    snapshot: dict = Calendar("one").get_events_by_day(days)
+
+    assert [len(snapshot[x]) for x in days] == [1, 1, 0]
+
+
+@pytest.mark.parametrize("all_day", [False, True])
+def test_update_event_unchanged_recurring(get_cli_runner, all_day):
+    """
+    The dates of a series are compared with those of its master event, such
+    that no occurrence of an unchanged series is reported as changed.
+    """
+    runner = get_cli_runner()
+    org_item = get_org_item(all_day=all_day, repeater=("+", 1, "w"))
+    create_event(runner, org_item)
+    event = assert_event_created("one", org_item, recurring=True)[0]
+    org_item.properties["UID"] = str(event.uid)
+
+    args: EditArgs = EditArgs()
+    args.load_from_org(org_item)
+    props: CalendarProperties = CalendarProperties(**args)
+    Calendar("one").update_event(event, props, edit_dates=True)
+
+    events: list = Calendar("one").get_events(event.uid)
+    assert len(events) > 1
+    for occurrence in events[:3]:
+        assert get_changed_properties(occurrence, props, True) == []
+
+
+def test_get_events_by_uid(get_cli_runner):
+    """Several UIDs are found at once, also when an UID is unknown."""
+    runner = get_cli_runner()
+    items: list = [get_org_item(), get_org_item(delta=timedelta(hours=3))]
+    items[1].title = "Other"
+    uids: list[str] = []
+    for item in items:
+        create_event(runner, item)
+        uids.append(str(assert_event_created("one", item)[0].uid))
+
+    calendar: Calendar = Calendar("one")
+    actual: dict = calendar.get_events_by_uid(uids + ["unknown", ""])
+
+    assert list(actual) == uids + ["unknown"]
+    assert [len(actual[x]) for x in uids] == [1, 1]
+    assert actual["unknown"] == []
+    assert calendar.get_events_by_uid(uids[:1])[uids[0]][0].uid == uids[0]
+
+
+def test_get_events_by_uid_parses_matches(get_cli_runner):
+    """Only the events of the requested UIDs are parsed."""
+    runner = get_cli_runner()
+    uids: list[str] = []
+    for index in range(3):
+        item = get_org_item(delta=timedelta(hours=index + 1))
+        item.title = f"Event {index}"
+        create_event(runner, item)
+        uids.append(str(assert_event_created("one", item)[0].uid))
+
+    calendar: Calendar = Calendar("one")
+    collection: CalendarCollection = calendar.collection
+    with patch.object(
+        collection, "_construct_event", wraps=collection._construct_event
+    ) as construct:
+        actual: dict = calendar.get_events_by_uid(uids[:2])
+
+    assert [x[0].uid for x in actual.values()] == uids[:2]
+    assert construct.call_count == 2
+
+
+def test_at_once_commits_on_error(get_cli_runner):
+    """The deletes are committed to the khal db if an exception is raised."""
+    runner = get_cli_runner()
+    item = get_org_item()
+    create_event(runner, item)
+    uid: str = str(assert_event_created("one", item)[0].uid)
+
+    calendar: Calendar = Calendar("one")
+    with pytest.raises(RuntimeError), calendar.at_once():
+        calendar.delete(dict(uid=uid))
+        raise RuntimeError
+
+    assert Calendar("one").get_events(uid) == []
+
+
 class TestCalendar(Mixin, TestCase):
     module: str = "khalorg.khal.calendar.find_configuration_file"
 
@@ -43,3 +245,23 @@ class TestCalendar(Mixin, TestCase):
     def test_datetime_format(self, _):
         """The `datetime_format` must coincide."""
         self.assertEqual(self.calendar.datetime_format, "%Y-%m-%d %a %H:%M")
+
+    @patch(module, return_value=get_test_config())
+    def test_split_range(self, _):
+        """A range is split at midnight into chunks of `days` days."""
+        expected: list = [
+            ("2023-01-01 Sun 12:00", "2023-01-31 Tue 00:00"),
+            ("2023-01-31 Tue 00:00", "2023-03-02 Thu 00:00"),
+            ("2023-03-02 Thu 00:00", "2023-03-05 Sun 12:00"),
+        ]
+        actual: list = self.calendar.split_range(
+            "2023-01-01 Sun 12:00", "2023-03-05 Sun 12:00", days=30
+        )
+        self.assertEqual(actual, expected)
+
+    @patch(module, return_value=get_test_config())
+    def test_split_range_short(self, _):
+        """Short or invalid ranges are returned as is."""
+        for start, stop in (("today", "1d"), ("foo", "bar")):
+            actual: list = self.calendar.split_range(start, stop, days=30)
+            self.assertEqual(actual, [(start, stop)])
@@ -1,11 +1,13 @@
+from datetime import timedelta
 from typing import Callable, Generator
 
 import pytest
 from khal.cli import main_khal
+from orgparse.date import OrgDate
 
 from khalorg.commands import new
 from khalorg.khal.calendar import Calendar
-from khalorg.khal.checker import EventChecker
+from khalorg.khal.checker import EventChecker, EventChecks
 from khalorg.org.agenda_items import OrgAgendaItem
 from tests.helpers import (
     assert_event_created,
@@ -76,3 +78,28 @@ def test_new_max_weeks(runner, caplog):
     expected: OrgAgendaItem = get_org_item(repeater=("+", 53, "w"))
     new("one", org=str(expected))
     assert EventChecker.MESSAGE_RRULE in caplog.text
+
+
+def test_is_valid_many(runner):
+    """A message is returned for each item, using one Calendar."""
+    existing: OrgAgendaItem = get_org_item()
+    new("one", org=str(existing))
+    assert_event_created("one", existing)
+
+    later: OrgAgendaItem = get_org_item()
+    later.title = "Later"
+    later.timestamps = [
+        OrgDate(x.start + timedelta(days=3), x.end + timedelta(days=3))
+        for x in later.timestamps
+    ]
+    past: OrgAgendaItem = OrgAgendaItem().load_from_str(
+        read_org_test_file("past.org")
+    )
+
+    checker = EventChecker([EventChecks.FUTURE, EventChecks.DUPLICATE])
+    messages: list[str] = checker.is_valid_many("one", [existing, later, past])
+    assert messages == [
+        EventChecker.MESSAGE_DUPLICATE,
+        "",
+        EventChecker.MESSAGE_FUTURE,
+    ]
@@ -0,0 +1,70 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from khalorg import memprofile
+from khalorg.memprofile import MemoryProfiler, get_report_path
+
+
+class TestMemoryProfiler(TestCase):
+    def setUp(self):
+        self.profiler: MemoryProfiler = MemoryProfiler(top=3)
+        self.profiler.start()
+
+    def tearDown(self):
+        self.profiler.stop()
+
+    def test_phase(self):
+        """The peak and the allocation site of a phase are reported."""
+        with self.profiler.phase("allocate"):
+            data: bytes = bytes(4 * 1024**2)
+
+        report: str = self.profiler.report("khalorg test")
+        self.assertIn("# khalorg test: peak 4.", report)
+        self.assertIn("## allocate: peak 4.", report)
+        self.assertIn("test_memprofile.py", report)
+        del data
+
+    def test_repeated_phase(self):
+        """A repeated phase is reported once, using its highest peak."""
+        for size in (1, 3, 2):
+            with self.profiler.phase("allocate"):
+                bytes(size * 1024**2)
+
+        report: str = self.profiler.report("khalorg test")
+        self.assertEqual(report.count("## allocate"), 1)
+        self.assertIn("## allocate: peak 3.", report)
+
+    def test_nested_phase(self):
+        """A nested phase is not recorded, but is part of the outer phase."""
+        with self.profiler.phase("outer"):
+            with self.profiler.phase("inner"):
+                data: bytes = bytes(4 * 1024**2)
+
+        report: str = self.profiler.report("khalorg test")
+        self.assertNotIn("## inner", report)
+        self.assertIn("## outer: peak 4.", report)
+        del data
+
+
+class TestModule(TestCase):
+    def test_not_started(self):
+        """Without profiling, phases do nothing and no report is written."""
+        with TemporaryDirectory() as directory:
+            path: Path = Path(directory) / "khalorg.memprofile"
+            with memprofile.phase("nothing"):
+                pass
+            memprofile.stop("khalorg test", path)
+            self.assertFalse(path.exists())
+
+    def test_report(self):
+        """The report is written next to the log file."""
+        with TemporaryDirectory() as directory:
+            path: Path = get_report_path(str(Path(directory) / "khalorg.log"))
+            self.assertEqual(path, Path(directory) / "khalorg.memprofile")
+
+            memprofile.start()
+            with memprofile.phase("list khal"):
+                pass
+            memprofile.stop("khalorg list", path)
+            self.assertIn("## list khal", path.read_text())
@@ -1,4 +1,6 @@
 import datetime
+from pathlib import Path
+from tempfile import TemporaryDirectory
 from tests.agenda_items import (
     AllDay,
     AllDayRecurring,
@@ -15,6 +17,7 @@ from tests.helpers import (
     read_org_test_file,
 )
 from unittest import TestCase
+from unittest.mock import patch
 
 from orgparse import loads
 from orgparse.date import OrgDate
@@ -26,8 +29,10 @@ from khalorg.org.agenda_items import (
     OrgAgendaFile,
     OrgAgendaItem,
     OrgDateAgenda,
+    OrgDateRecurrence,
+    collapse_occurrences,
 )
-from khalorg.org.helpers import remove_timestamps
+from khalorg.org.helpers import remove_timestamps, split_headings
 from tests.agenda_items import (
     AllDay,
     AllDayRecurring,
@@ -138,8 +143,8 @@ class TestOrgAgendaItem(TestCase):
 
         message: str = (
             f"\nFor org file: {org_file} an error is found:"
-            f"\n\nActual is:\n{actual.__dict__}"
-            f"\n\nExpected is:\n{expected.__dict__}"
+            f"\n\nActual is:\n{actual}"
+            f"\n\nExpected is:\n{expected}"
         )
         return actual == expected, message
 
@@ -243,6 +248,55 @@ class TestOrgAgendaItem(TestCase):
             )
         ]
 
+    def test_as_dict(self):
+        """The timestamps are ISO strings, and the dict is JSON compatible."""
+        start = datetime.datetime(2023, 1, 2, 10)
+        end = datetime.datetime(2023, 1, 2, 11)
+        item: OrgAgendaItem = OrgAgendaItem(
+            title="event",
+            timestamps=[OrgDate(start, end), OrgDate(end)],
+            properties={"UID": "123", "RRULE": "FREQ=DAILY"},
+            description="body",
+        )
+        expected: dict = {
+            "title": "event",
+            "timestamps": [
+                {"start": "2023-01-02T10:00:00", "end": "2023-01-02T11:00:00"},
+                {"start": "2023-01-02T11:00:00", "end": None},
+            ],
+            "properties": {"UID": "123", "RRULE": "FREQ=DAILY"},
+            "rrule": "FREQ=DAILY",
+            "description": "body",
+        }
+        self.assertEqual(item.as_dict(), expected)
+
+
+    def test_timestamps_key(self):
+        """The key matches the repr of the timestamps, ignoring tzinfo."""
+        start = datetime.datetime(2023, 1, 2, 10)
+        end = datetime.datetime(2023, 1, 2, 11)
+        utc = datetime.timezone.utc
+        cases: list = [
+            [OrgDate(start, end)],
+            [OrgDate(start.replace(tzinfo=utc), end)],
+            [OrgDate(start, end, repeater=("+", 1, "w"))],
+            [OrgDate(start, end, active=False)],
+            [OrgDate(start.replace(second=1), end)],
+            [OrgDate(start.date())],
+            [OrgDate(start), OrgDate(end)],
+        ]
+        for a in cases:
+            for b in cases:
+                with self.subTest(a=a, b=b):
+                    key_equal: bool = (
+                        OrgAgendaItem(timestamps=list(a)).timestamps_key
+                        == OrgAgendaItem(timestamps=list(b)).timestamps_key
+                    )
+                    self.assertEqual(key_equal, repr(a) == repr(b))
+
+        item: OrgAgendaItem = OrgAgendaItem(timestamps=[OrgDate(start)])
+        item.timestamps = [OrgDate(end)]
+        self.assertNotEqual(item, OrgAgendaItem(timestamps=[OrgDate(start)]))
 
 class TestAgendaOrgDates(TestCase):
     """Test if duplicated items are removed."""
@@ -294,7 +348,9 @@ class TestOrgAgendaFile(TestCase):
 
         for org, expected_org in orgs:
             item: str = read_org_test_file(org)
-            agenda: OrgAgendaFile = OrgAgendaFile.from_str(item)
+            agenda: OrgAgendaFile = OrgAgendaFile.from_str(
+                item, occurrences=True
+            )
             agenda.apply_rrules()
             actual: str = format(agenda, khalorg_format)
             expected: str = read_org_test_file(expected_org)
@@ -305,6 +361,159 @@ class TestOrgAgendaFile(TestCase):
             )
             self.assertEqual(actual, expected, msg=message)
 
+    def test_merge(self):
+        """
+        Merging the agendas of parts of an org file gives the same result as
+        loading the whole file.
+        """
+        item: str = read_org_test_file("rrule_recurring_duplicates.org")
+        headings: list[str] = split_headings(item)
+        half: int = len(headings) // 2
+        agendas: list[OrgAgendaFile] = [
+            OrgAgendaFile.from_str("".join(headings[:half]), occurrences=True),
+            OrgAgendaFile.from_str("".join(headings[half:]), occurrences=True),
+        ]
+        actual = OrgAgendaFile.merge(agendas).apply_rrules()
+        expected = OrgAgendaFile.from_str(item, occurrences=True).apply_rrules()
+        self.assertEqual(
+            format(actual, "{timestamps}"), format(expected, "{timestamps}")
+        )
+        self.assertEqual(actual.items, expected.items)
+
+    def test_occurrences_not_collected(self):
+        """
+        The occurrences are only kept if they are needed for apply_rrules.
+        """
+        item: str = read_org_test_file("rrule_recurring_and_non_recurring.org")
+        agenda: OrgAgendaFile = OrgAgendaFile.from_str(item)
+        self.assertIsNone(agenda._occurrences)
+        self.assertIsNone(OrgAgendaFile.merge([agenda, agenda])._occurrences)
+
+        agenda = OrgAgendaFile.from_str(item, occurrences=True)
+        self.assertTrue(agenda._occurrences)
+        self.assertIsNone(agenda.apply_rrules()._occurrences)
+
+    def test_from_str_parallel(self):
+        """
+        Parsing a large org file in a process pool gives the same result as
+        parsing it serially.
+        """
+        item: str = read_org_test_file("rrule_recurring_and_non_recurring.org")
+        items: str = "".join(
+            item.replace(":UID: ", f":UID: {i}") for i in range(10)
+        )
+        expected = OrgAgendaFile.from_str(items, occurrences=True)
+        with (
+            patch("khalorg.org.agenda_items.MAX_PARSE_WORKERS", 3),
+            patch("khalorg.org.agenda_items.PARALLEL_PARSE_MIN_HEADINGS", 2),
+        ):
+            actual = OrgAgendaFile.from_str(items, occurrences=True)
+
+        self.assertEqual(actual.items, expected.items)
+        self.assertEqual(actual._occurrences, expected._occurrences)
+        self.assertEqual(
+            format(actual.apply_rrules(), "{timestamps}"),
+            format(expected.apply_rrules(), "{timestamps}"),
+        )
+
+    def test_from_str_parallel_todo_keywords(self):
+        """
+        The TODO keywords that are defined before the first heading apply to
+        all chunks that are parsed in parallel.
+        """
+        item: str = read_org_test_file("rrule_recurring_and_non_recurring.org")
+        item = item.replace("* Meeting", "* WAIT Meeting")
+        items: str = "#+TODO: WAIT | FINISHED\n" + "".join(
+            item.replace(":UID: ", f":UID: {i}") for i in range(10)
+        )
+        expected = OrgAgendaFile.from_str(items)
+        with (
+            patch("khalorg.org.agenda_items.MAX_PARSE_WORKERS", 3),
+            patch("khalorg.org.agenda_items.PARALLEL_PARSE_MIN_HEADINGS", 2),
+        ):
+            actual = OrgAgendaFile.from_str(items)
+
+        self.assertEqual({x.title for x in actual.items}, {"Meeting"})
+        self.assertEqual(actual.items, expected.items)
+
+    def test_from_path(self):
+        """
+        Loading an org file from a path gives the same result as loading it
+        from a str, also when TODO keywords are defined in the file.
+        """
+        keywords: str = "#+TODO: WAIT | FINISHED\n"
+        item: str = read_org_test_file("rrule_recurring_and_non_recurring.org")
+        item = keywords + item.replace("* Meeting", "* WAIT Meeting", 1)
+        with TemporaryDirectory() as directory:
+            path: Path = Path(directory) / "test.org"
+            path.write_text(item)
+            actual: OrgAgendaFile = OrgAgendaFile.from_path(path)
+
+        expected: OrgAgendaFile = OrgAgendaFile.from_str(item)
+        self.assertEqual(actual.items, expected.items)
+        self.assertEqual(actual.items[0].title, "Meeting")
+
+    def test_no_node_tree(self):
+        """The OrgNode tree is not kept, and items without a timestamp load."""
+        item: str = read_org_test_file("no_time_stamp.org")
+        agenda: OrgAgendaFile = OrgAgendaFile.from_str(item)
+        self.assertFalse(hasattr(agenda, "nodes"))
+        self.assertEqual(len(agenda.items), 1)
+
+
+class TestCompactOrgAgendaItem(TestCase):
+    def test_slots(self):
+        """An OrgAgendaItem has no instance dict."""
+        self.assertFalse(hasattr(OrgAgendaItem(), "__dict__"))
+
+    def test_interned_properties(self):
+        """Property keys and calendar names are shared between items."""
+        item: str = read_org_test_file("rrule_recurring_and_non_recurring.org")
+        a, b, *_ = OrgAgendaFile.from_str(item).items
+        for key_a, key_b in zip(a.properties, b.properties):
+            self.assertIs(key_a, key_b)
+        self.assertIs(a.properties["CALENDAR"], b.properties["CALENDAR"])
+        self.assertIs(a.properties["STATUS"], b.properties["STATUS"])
+
+
+class TestCollapseOccurrences(TestCase):
+    def test(self):
+        """
+        Collapsing the occurrences must not change the result of
+        OrgAgendaFile.apply_rrules.
+        """
+        orgs: tuple = (
+            "rrule_recurring.org",
+            "rrule_recurring_monthly.org",
+            "rrule_recurring_allday.org",
+            "rrule_recurring_duplicates.org",
+            "rrule_recurring_not_supported.org",
+            "rrule_recurring_1th.org",
+            "rrule_recurring_and_non_recurring.org",
+        )
+        for org in orgs:
+            item: str = read_org_test_file(org)
+            expected = OrgAgendaFile.from_str(item, occurrences=True)
+            expected.apply_rrules()
+            actual = OrgAgendaFile.from_str(
+                collapse_occurrences(item), occurrences=True
+            )
+            actual.apply_rrules()
+            self.assertEqual(
+                format(actual, "{timestamps}"),
+                format(expected, "{timestamps}"),
+                msg=org,
+            )
+            self.assertEqual(actual.items, expected.items, msg=org)
+
+    def test_removes_repeated_occurrences(self):
+        """Only the first occurrence of a supported RRULE is kept."""
+        item: str = read_org_test_file("rrule_recurring_duplicates.org")
+        self.assertLess(
+            len(collapse_occurrences(item).splitlines()),
+            len(item.splitlines()),
+        )
+
 
 class TestOrgDateAgenda(TestCase):
     def test_get_rrulestr_supported(self):
@@ -330,3 +539,83 @@ class TestOrgDateAgenda(TestCase):
         """
         org_file: str = read_org_test_file("rrule_recurring_not_supported.org")
         self._test_get_rrulestr(org_file)
+
+
+class TestOrgDateRecurrence(TestCase):
+    RULE: str = "FREQ=WEEKLY;UNTIL=20230120T235959Z;BYDAY=MO,WE,FR"
+
+    def setUp(self):
+        days: tuple = (2, 4, 6, 9, 11, 13, 16, 18, 20)
+        self.occurrences: list[OrgDate] = [
+            OrgDate(
+                datetime.datetime(2023, 1, x, 10),
+                datetime.datetime(2023, 1, x, 11),
+            )
+            for x in days
+        ]
+
+    def test_from_occurrences(self):
+        """The recurrence expands to the same timestamps as the original."""
+        recurrence = OrgDateRecurrence.from_occurrences(
+            self.occurrences, self.RULE
+        )
+        assert recurrence is not None
+        expected = OrgAgendaItem(timestamps=list(self.occurrences))
+        actual = OrgAgendaItem(timestamps=recurrence)
+        self.assertEqual(len(recurrence), 9)
+        self.assertEqual(actual.timestamps_key, expected.timestamps_key)
+        self.assertEqual(
+            format(actual, "{timestamps}"), format(expected, "{timestamps}")
+        )
+        self.assertIs(actual.first_timestamp, recurrence.first)
+
+    def test_timestamps_expanded(self):
+        """Changes to the timestamps of a recurrence are kept."""
+        recurrence = OrgDateRecurrence.from_occurrences(
+            self.occurrences, self.RULE
+        )
+        item = OrgAgendaItem(timestamps=recurrence)
+        extra = OrgDate(datetime.datetime(2023, 1, 23, 10))
+        item.timestamps.append(extra)
+        self.assertIsInstance(item._timestamps, list)
+        self.assertEqual(len(item.timestamps), 10)
+        self.assertIs(item.timestamps[-1], extra)
+
+    def test_compare_not_expanded(self):
+        """Comparing the timestamps does not expand a recurrence."""
+        recurrence = OrgDateRecurrence.from_occurrences(
+            self.occurrences, self.RULE
+        )
+        item = OrgAgendaItem(timestamps=recurrence)
+        other = OrgAgendaItem(timestamps=self.occurrences[:1])
+        with self.assertLogs(level="DEBUG"):
+            self.assertNotEqual(item, other)
+        self.assertIs(item._timestamps, recurrence)
+
+    def test_not_reproducible(self):
+        """Moved or excluded occurrences are not stored as a recurrence."""
+        excluded: list[OrgDate] = self.occurrences[:3] + self.occurrences[4:]
+        moved: list[OrgDate] = self.occurrences[:-1] + [
+            OrgDate(datetime.datetime(2023, 1, 21, 10))
+        ]
+        for occurrences in (excluded, moved, self.occurrences[:1]):
+            self.assertIsNone(
+                OrgDateRecurrence.from_occurrences(occurrences, self.RULE)
+            )
+
+    def test_apply_rrules(self):
+        """An unsupported RRULE is applied as a recurrence."""
+        text: str = "".join(
+            f"* Meeting\n  {x}\n  :PROPERTIES:\n  :UID: 123\n"
+            f"  :RRULE: {self.RULE}\n  :END:\n"
+            for x in self.occurrences
+        )
+        agenda: OrgAgendaFile = OrgAgendaFile.from_str(text, occurrences=True)
+        agenda.apply_rrules()
+        item: OrgAgendaItem = agenda.items[0]
+        self.assertIsInstance(item._timestamps, OrgDateRecurrence)
+        self.assertEqual(item.properties["RRULE"], self.RULE)
+        expected = OrgAgendaItem(timestamps=list(self.occurrences))
+        self.assertEqual(
+            format(agenda, "{timestamps}"), format(expected, "{timestamps}")
+        )
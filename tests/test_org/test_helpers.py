@@ -1,8 +1,16 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
 from unittest import TestCase
 
 from orgparse.date import OrgDate
 
-from khalorg.org.helpers import timestamp_to_orgdate
+from khalorg.org.helpers import (
+    count_headings,
+    get_property,
+    iter_headings,
+    split_headings,
+    timestamp_to_orgdate,
+)
 
 
 class TestTimestampToOrgdate(TestCase):
@@ -22,3 +30,35 @@ class TestTimestampToOrgdate(TestCase):
     def test_normal(self):
         """Supports normal date."""
         assert self.EXPECTED == timestamp_to_orgdate(self.DATE)
+
+
+class TestSplitHeadings(TestCase):
+    TEXT: str = "#+TITLE: foo\n* one\n  body\n** child\n* two\n  :UID: 2\n"
+
+    def test_split(self):
+        """Only top-level headings are split, and nothing is lost."""
+        actual: list = split_headings(self.TEXT)
+        self.assertEqual(len(actual), 3)
+        self.assertEqual("".join(actual), self.TEXT)
+
+    def test_count_headings(self):
+        """The headings are counted as split_headings splits them."""
+        for text in (self.TEXT, self.TEXT[13:], "", "no heading\n"):
+            expected: int = len(split_headings(text)) - 1
+            self.assertEqual(count_headings(text), expected)
+
+    def test_get_property(self):
+        """A property is found without parsing the heading."""
+        self.assertEqual(get_property(self.TEXT, "UID"), "2")
+        self.assertEqual(get_property(self.TEXT, "RRULE"), "")
+
+    def test_iter_headings(self):
+        """Reading the headings from a file gives the same result."""
+        with TemporaryDirectory() as directory:
+            path: Path = Path(directory) / "test.org"
+            path.write_text(self.TEXT)
+            actual: list = list(iter_headings(path))
+            self.assertEqual(actual, split_headings(self.TEXT))
+
+            path.write_text("")
+            self.assertEqual(list(iter_headings(path)), [""])
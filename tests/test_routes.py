@@ -0,0 +1,86 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from khalorg.org.agenda_items import OrgAgendaItem
+from khalorg.routes import Route, Router, load_routes
+
+CONFIG: str = """
+[project]
+calendar = team
+org_file = /org/project.org
+filetags = project, planning
+
+[team]
+calendar = team
+org_file = /org/team.org
+
+[personal]
+calendar = personal
+org_file = /org/team.org
+"""
+
+
+class TestLoadRoutes(TestCase):
+    def test_load(self):
+        """Each section is a route, with optional filetags."""
+        with TemporaryDirectory() as directory:
+            path: Path = Path(directory) / "routes.conf"
+            path.write_text(CONFIG)
+            expected: list = [
+                Route(
+                    "team", Path("/org/project.org"), ("project", "planning")
+                ),
+                Route("team", Path("/org/team.org")),
+                Route("personal", Path("/org/team.org")),
+            ]
+            self.assertEqual(load_routes(path), expected)
+
+    def test_invalid(self):
+        """A missing file, key, or route raises a ValueError."""
+        with TemporaryDirectory() as directory:
+            path: Path = Path(directory) / "routes.conf"
+            with self.assertRaises(ValueError):
+                load_routes(path)
+            path.write_text("[team]\ncalendar = team\n")
+            with self.assertRaises(ValueError):
+                load_routes(path)
+            path.write_text("")
+            with self.assertRaises(ValueError):
+                load_routes(path)
+
+
+class TestRouter(TestCase):
+    def setUp(self):
+        with TemporaryDirectory() as directory:
+            path: Path = Path(directory) / "routes.conf"
+            path.write_text(CONFIG)
+            self.router: Router = Router(load_routes(path))
+
+    def test_get_org_file(self):
+        """Events are routed by category, or else to the default route."""
+        project = OrgAgendaItem(properties={"CATEGORIES": "work, planning"})
+        other = OrgAgendaItem(properties={"CATEGORIES": "work"})
+        get_org_file = self.router.get_org_file
+        self.assertEqual(get_org_file(project, "team").name, "project.org")
+        self.assertEqual(get_org_file(other, "team").name, "team.org")
+        self.assertIsNone(get_org_file(other, "unknown"))
+
+    def test_get_calendar(self):
+        """Org items are routed by CALENDAR, or else to the first route."""
+        team: Path = Path("/org/team.org")
+        get_calendar = self.router.get_calendar
+        personal = OrgAgendaItem(properties={"CALENDAR": "personal"})
+        unknown = OrgAgendaItem(properties={"CALENDAR": "unknown"})
+        other = OrgAgendaItem(properties={})
+        self.assertEqual(get_calendar(personal, team), "personal")
+        self.assertEqual(get_calendar(other, team), "team")
+        self.assertIsNone(get_calendar(unknown, team))
+
+    def test_get_filetags(self):
+        """The filetags of all routes of an org file are combined."""
+        project: Path = Path("/org/project.org")
+        self.assertEqual(
+            self.router.get_filetags(project), ["project", "planning"]
+        )
+        self.assertEqual(self.router.get_filetags(Path("/org/team.org")), [])
@@ -1,10 +1,12 @@
-from datetime import datetime
+from datetime import date, datetime, timezone
 from unittest import TestCase
 
 from dateutil.rrule import rrule
 
 from khalorg.rrule import (
+    get_occurrences,
     get_rrulestr,
+    ical_rrule_is_supported,
     rrule_is_supported,
     rrulestr_to_org,
     rrulestr_to_rrule,
@@ -43,6 +45,22 @@ class TestRrulestrToOrg(TestCase):
         self.assertIsNone(repeater)
 
 
+class TestIcalRruleIsSupported(TestCase):
+    def test_supported(self):
+        """The UNTIL value may have a timezone if DTSTART has one."""
+        start: datetime = datetime(2023, 1, 2, 10, tzinfo=timezone.utc)
+        rule: str = "FREQ=WEEKLY;UNTIL=20230904T113000Z;BYDAY=MO"
+        self.assertTrue(ical_rrule_is_supported(rule, start))
+        self.assertTrue(ical_rrule_is_supported("FREQ=DAILY", start.date()))
+        self.assertTrue(ical_rrule_is_supported("", start.date()))
+
+    def test_not_supported(self):
+        """Unsupported or invalid rules are not supported."""
+        start: date = date(2023, 1, 2)
+        for rule in ("FREQ=MONTHLY;BYDAY=1MO", "FREQ=FOO"):
+            self.assertFalse(ical_rrule_is_supported(rule, start))
+
+
 class TestGetRrule(TestCase):
     def test_not_recurring(self):
         result: str = get_rrulestr(datetime.now(), tuple())
@@ -59,3 +77,22 @@ class TestGetRrule(TestCase):
     def test_monthly(self):
         result: str = get_rrulestr(datetime.now(), ("+", 3, "m"), clip=True)
         self.assertEqual("FREQ=MONTHLY;INTERVAL=3", str(result))
+
+
+class TestGetOccurrences(TestCase):
+    def test_dtstart_first(self):
+        """DTSTART is the first occurrence, even if it does not match."""
+        start: datetime = datetime(2023, 1, 1, 10)
+        rule: str = "FREQ=WEEKLY;BYDAY=MO,WE,FR"
+        result: list = get_occurrences(rule, start, 3)
+        self.assertEqual(
+            result, [start, datetime(2023, 1, 2, 10), datetime(2023, 1, 4, 10)]
+        )
+
+    def test_all_day(self):
+        """All day occurrences are dates, and UNTIL limits the occurrences."""
+        rule: str = "FREQ=DAILY;UNTIL=20230103T000000Z"
+        result: list = get_occurrences(rule, date(2023, 1, 1), 10)
+        self.assertEqual(
+            result, [date(2023, 1, 1), date(2023, 1, 2), date(2023, 1, 3)]
+        )
@@ -0,0 +1,53 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from khalorg.helpers import get_khalorg_format
+from khalorg.org.agenda_items import OrgAgendaFile
+from khalorg.state import ShardedState, get_shard_name
+
+UIDS: list[str] = ["a", "b", "c"]
+
+
+class TestShardedState(TestCase):
+    def setUp(self):
+        self.directory = TemporaryDirectory()
+        self.path: Path = Path(self.directory.name) / "one"
+        self.format: str = get_khalorg_format()
+        self.agenda: OrgAgendaFile = OrgAgendaFile.from_str(
+            "".join(
+                f"* {x}\n:PROPERTIES:\n:UID: {x}\n:END:\n" for x in UIDS
+            )
+            + "* no uid\n"
+        )
+        ShardedState(self.path).write(self.agenda.items, self.format)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_load(self):
+        """All items with a UID are loaded, or only the shards of `uids`."""
+        state: ShardedState = ShardedState(self.path)
+        actual: list = sorted(x.uid for x in state.load().items)
+        self.assertEqual(actual, UIDS)
+
+        actual = [x.uid for x in ShardedState(self.path).load(["b"]).items]
+        self.assertIn("b", actual)
+        self.assertTrue(
+            all(get_shard_name(x) == get_shard_name("b") for x in actual)
+        )
+
+    def test_write(self):
+        """Only changed shards are written, and empty shards are removed."""
+        state: ShardedState = ShardedState(self.path)
+        items: list = state.load().items
+        unchanged: Path = self.path / f"{get_shard_name('c')}.org.gz"
+        mtime: int = unchanged.stat().st_mtime_ns
+
+        state.write([x for x in items if x.uid != "a"], self.format)
+        self.assertEqual(unchanged.stat().st_mtime_ns, mtime)
+        actual: list = sorted(x.uid for x in state.load().items)
+        self.assertEqual(actual, ["b", "c"])
+
+        state.write([], self.format)
+        self.assertEqual(list(self.path.iterdir()), [])
@@ -0,0 +1,87 @@
+from unittest import TestCase
+
+from khalorg.org.agenda_items import OrgAgendaFile, TooManyOrgItems
+from khalorg.synchronization import (
+    SyncState,
+    classify_sync_state,
+    get_changed_uids,
+    merge_by_uid,
+    sort_by_uid,
+)
+
+
+def _get_agenda(*items: tuple[str, str]) -> OrgAgendaFile:
+    return OrgAgendaFile.from_str(
+        "".join(
+            f"* {title}\n:PROPERTIES:\n:UID: {uid}\n:END:\n"
+            for uid, title in items
+        )
+    )
+
+
+class TestGetChangedUids(TestCase):
+    def test(self):
+        """Added, changed, and removed items are returned by their UID."""
+        old: OrgAgendaFile = OrgAgendaFile.from_str(
+            "* same\n:PROPERTIES:\n:UID: 1\n:END:\n"
+            "* changed\n:PROPERTIES:\n:UID: 2\n:END:\n"
+            "* removed\n:PROPERTIES:\n:UID: 3\n:END:\n"
+        )
+        new: OrgAgendaFile = OrgAgendaFile.from_str(
+            "* same\n:PROPERTIES:\n:UID: 1\n:END:\n"
+            "* changed!\n:PROPERTIES:\n:UID: 2\n:END:\n"
+            "* added\n:PROPERTIES:\n:UID: 4\n:END:\n"
+            "* new org item\n"
+        )
+        self.assertEqual(get_changed_uids(old, new), {"2", "3", "4", None})
+
+
+class TestMergeByUid(TestCase):
+    def test_merge(self):
+        """Each UID is yielded once, with the item of each stream."""
+        org: OrgAgendaFile = _get_agenda(("3", "c"), ("1", "a"))
+        state: OrgAgendaFile = _get_agenda(("1", "a"), ("2", "b"))
+        khal: OrgAgendaFile = _get_agenda(("2", "b"), ("3", "c"))
+        actual: list = [
+            (uid, *(x and x.title for x in items))
+            for uid, *items in merge_by_uid(
+                sort_by_uid(org.items),
+                sort_by_uid(state.items),
+                iter(sort_by_uid(khal.items)),
+            )
+        ]
+        expected: list = [
+            ("1", "a", "a", None),
+            ("2", None, "b", "b"),
+            ("3", "c", None, "c"),
+        ]
+        self.assertEqual(actual, expected)
+
+    def test_invalid(self):
+        """Duplicate UIDs and unsorted streams are not accepted."""
+        duplicate: OrgAgendaFile = _get_agenda(("1", "a"), ("1", "b"))
+        unsorted: OrgAgendaFile = _get_agenda(("2", "a"), ("1", "b"))
+        with self.assertRaises(TooManyOrgItems):
+            list(merge_by_uid(duplicate.items, [], []))
+        with self.assertRaises(ValueError):
+            list(merge_by_uid([], unsorted.items, []))
+
+
+class TestClassifySyncState(TestCase):
+    def test(self):
+        """Every combination of the org, state, and khal item is classified."""
+        a, b, c = _get_agenda(("1", "a"), ("1", "b"), ("1", "c")).items
+        cases: list = [
+            ((a, a, a), SyncState.UNCHANGED),
+            ((b, a, a), SyncState.ORG_CHANGED),
+            ((a, a, b), SyncState.KHAL_CHANGED),
+            ((b, a, c), SyncState.CONFLICT),
+            ((a, None, None), SyncState.ORG_NEW),
+            ((None, None, a), SyncState.KHAL_NEW),
+            ((None, a, a), SyncState.ORG_DELETED),
+            ((a, a, None), SyncState.KHAL_DELETED),
+            ((None, a, None), SyncState.REMOVED),
+        ]
+        for items, expected in cases:
+            with self.subTest(expected=expected):
+                self.assertEqual(classify_sync_state(*items), expected)
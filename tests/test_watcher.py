@@ -0,0 +1,44 @@
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import TestCase
+
+from khalorg.watcher import ChangeMonitor, PollingWatcher, get_watcher
+
+
+class TestChangeMonitor(TestCase):
+    def setUp(self) -> None:
+        self.directory = TemporaryDirectory()
+        root: Path = Path(self.directory.name)
+        self.org_file: Path = root / "file.org"
+        self.vdir: Path = root / "vdir"
+        self.vdir.mkdir()
+        self.org_file.write_text("* foo")
+        self.monitor = ChangeMonitor(self.org_file, self.vdir, debounce=0.01)
+
+    def tearDown(self) -> None:
+        self.monitor.close()
+        self.directory.cleanup()
+
+    def test_no_changes(self):
+        """Nothing changed after the monitor was created."""
+        self.assertEqual(self.monitor.changes(), (False, False))
+
+    def test_org_changed(self):
+        """A change of the org file must be detected."""
+        self.org_file.write_text("* bar, which is longer")
+        self.assertEqual(self.monitor.wait(), (True, False))
+        self.assertEqual(self.monitor.changes(), (False, False))
+
+    def test_vdir_changed(self):
+        """A new .ics file in the vdir must be detected, others are not."""
+        (self.vdir / "foo.txt").write_text("foo")
+        self.assertEqual(self.monitor.changes(), (False, False))
+        (self.vdir / "foo.ics").write_text("foo")
+        self.assertEqual(self.monitor.wait(), (False, True))
+
+
+class TestGetWatcher(TestCase):
+    def test_fallback(self):
+        """If a directory cannot be watched, polling is used instead."""
+        watcher = get_watcher([Path("/non/existing/dir")], interval=0.01)
+        self.assertIs(type(watcher), PollingWatcher)